@@ -29,6 +29,18 @@ from tests.unit.TestTypechecker import TypecheckerTestCase
 from tests.unit.TestSemanticFusion import SemanticFusionTestCase
 from tests.unit.TestTypeAwareOpMutation import TypeAwareOpMutationTestCase
 from tests.unit.TestGenTypeAwareMutation import GenTypeAwareMutationTestCase
+from tests.unit.TestPatternMatcher import PatternMatcherTestCase
+from tests.unit.TestPrinter import PrinterTestCase
+from tests.unit.TestSeedCache import SeedCacheTestCase
+from tests.unit.TestFastParser import FastParserTestCase
+from tests.unit.TestSeedIndex import SeedIndexTestCase
+from tests.unit.TestParseService import ParseServiceTestCase
+from tests.unit.TestTraversal import TraversalTestCase
+from tests.unit.TestLazyParser import LazyParserTestCase
+from tests.unit.TestMmapStream import MmapStreamTestCase
+from tests.unit.TestSolver import SolverTestCase
+from tests.unit.TestSolverSession import SolverSessionTestCase
+from tests.unit.TestFuzzerUtil import FuzzerUtilTestCase
 
 sys.path.append("../")
 
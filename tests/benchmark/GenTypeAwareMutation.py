@@ -0,0 +1,212 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Benchmark of GenTypeAwareMutation.get_replacee, which looks the candidate
+operators of a hole up by its type and picks the arguments from per-type
+pools, against the previous implementation, which checked the argument
+types of every operator in the configuration file for each hole and
+filtered the expressions of the hole's type for local compatibility. A
+QF_SLIA seed with a quantified assert is generated unless seed files are
+given. Also reports the time of mutate, with the holes of the seed
+collected anew for each mutant as before and with the hole index. Each
+mutant is rolled back before the next one, as with --mutation-mode=fresh.
+
+Usage: python tests/benchmark/GenTypeAwareMutation.py [seed_file ...]
+       (default: generated QF_SLIA seed with 300 asserts)
+"""
+
+import sys
+import copy
+import time
+import random
+
+sys.path.append(".")
+
+from yinyang.src.mutators.GenTypeAwareMutation.GenTypeAwareMutation import (
+    GenTypeAwareMutation
+)
+from yinyang.src.mutators.GenTypeAwareMutation.Util import (
+    type2num, get_all_subterms, get_unique_subterms, local_compatible
+)
+from yinyang.src.parsing.Ast import Expr
+from yinyang.src.parsing.Parse import parse_file, parse_str
+from yinyang.src.parsing.Typechecker import typecheck
+from yinyang.src.parsing.Types import ALL
+
+
+class Args:
+    config = "yinyang/config/typefuzz_config.txt"
+
+
+class ScanMutation(GenTypeAwareMutation):
+    """
+    The previous candidate selection.
+    """
+
+    def has_types(self, types):
+        for t in set(types):
+            if t == ALL:
+                continue
+            type_id = type2num[t]
+            if len(self.unique_expr[type_id]) == 0:
+                return False
+        return True
+
+    def get_candidate_ops(self, term):
+        candidate_ops = []
+        for op in self.operators:
+            if op.rtype != ALL and op.rtype != term.type:
+                continue
+            if self.has_types(op.arg_types):
+                candidate_ops.append(op)
+        return candidate_ops
+
+    def get_replacee(self, term):
+        candidate_ops = self.get_candidate_ops(term)
+        if len(candidate_ops) == 0:
+            return None
+
+        op = random.choice(candidate_ops)
+        if op.name == "id":
+            typ_id = type2num[term.type]
+            choices = [
+                t for t in self.unique_expr[typ_id]
+                if t != term and local_compatible(term, t)
+            ]
+            if len(choices) == 0:
+                return None
+            return random.choice(choices)
+
+        args = []
+        for t in op.arg_types:
+            choices = [e for e in self.unique_expr[type2num[t]]]
+            if len(choices) == 0:
+                return None
+            args.append(random.choice(choices))
+        exp = Expr(op=op.name, subterms=args)
+        exp.type = op.rtype
+        return exp
+
+
+class RescanMutation(GenTypeAwareMutation):
+    """
+    The previous hole selection.
+    """
+
+    def mutate(self):
+        success = False
+        av_expr, _ = get_all_subterms(self.formula)
+        all_holes = av_expr
+        for _ in range(len(av_expr)):
+            t1 = random.choice(all_holes)
+            t2 = self.get_replacee(t1)
+            if t2 and self.substitute(t1, t2):
+                success = True
+                break
+            all_holes.remove(t1)
+        return self.formula, success, False
+
+
+def slia_seed(n, rng):
+    lines = ["(set-logic QF_SLIA)"]
+    lines += ["(declare-fun s%d () String)" % i for i in range(20)]
+    lines += ["(declare-fun i%d () Int)" % i for i in range(20)]
+
+    def string(depth):
+        if depth == 0:
+            return "s%d" % rng.randrange(20)
+        return rng.choice([
+            "(str.++ %s %s)" % (string(depth - 1), string(depth - 1)),
+            "(str.substr %s %s 1)" % (string(depth - 1), integer(0)),
+        ])
+
+    def integer(depth):
+        if depth == 0:
+            return rng.choice(["i%d" % rng.randrange(20), "1"])
+        return rng.choice([
+            "(+ %s %s)" % (integer(depth - 1), integer(depth - 1)),
+            "(str.len %s)" % string(depth - 1),
+        ])
+
+    lines.append("(assert (forall ((k Int)) (>= (str.len s0) k)))")
+    for _ in range(n):
+        lines.append("(assert (or (= %s %s) (< %s %s)))" % (
+            string(2), string(2), integer(2), integer(2)
+        ))
+    return "\n".join(lines + ["(check-sat)"])
+
+
+def mutate_time(mutator, mutants=200):
+    random.seed(0)
+    start = time.perf_counter()
+    for _ in range(mutants):
+        mutator.mutate()
+        mutator.undo_log.rollback()
+    return (time.perf_counter() - start) / mutants
+
+
+def replacee_time(mutator, holes):
+    random.seed(0)
+    start = time.perf_counter()
+    for hole in holes:
+        mutator.get_replacee(hole)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    if sys.argv[1:]:
+        seeds = [
+            (seed, parse_file(seed, silent=True)) for seed in sys.argv[1:]
+        ]
+    else:
+        seeds = [("QF_SLIA", parse_str(slia_seed(300, rng)))]
+    for name, (script, glob) in seeds:
+        if not script:
+            print("%s: not parsed" % name)
+            continue
+        typecheck(script, glob)
+        unique_expr = get_unique_subterms(copy.deepcopy(script))
+        holes = get_all_subterms(script)[0]
+        holes = [rng.choice(holes) for _ in range(2000)]
+        print("%s: %d unique expressions" % (
+            name, sum(len(pool) for pool in unique_expr)
+        ))
+        for label, mutator_class in [
+            ("scan", ScanMutation), ("cache", GenTypeAwareMutation)
+        ]:
+            start = time.perf_counter()
+            mutator = mutator_class(script, Args(), unique_expr)
+            setup = time.perf_counter() - start
+            total = replacee_time(mutator, holes)
+            print("  %-5s setup %6.1f ms, get_replacee %7.1f us/hole" % (
+                label, setup * 1000, total / len(holes) * 1e6
+            ))
+        ctxt = typecheck(script, glob)
+        for label, mutator_class in [
+            ("rescan", RescanMutation), ("index", GenTypeAwareMutation)
+        ]:
+            mutator = mutator_class(script, Args(), unique_expr, ctxt)
+            print("  %-6s mutate %7.1f us/mutant" % (
+                label, mutate_time(mutator) * 1e6
+            ))
@@ -0,0 +1,159 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Benchmark of TypeAwareOpMutation.mutate, which picks among the precomputed
+operator occurrences with replacements and looks their replacements up in
+an index, against the previous implementation, which picked random
+occurrences until one had a replacement and searched the operator classes
+for each pick. Seeds with many operators without replacements (e.g.,
+applications of declared functions) are generated unless seed files are
+given. Each mutant is rolled back before the next one, as with
+--mutation-mode=fresh.
+
+Usage: python tests/benchmark/OpMutation.py [seed_file ...]
+       (default: generated QF_UFLIA seeds with 10% and 50% replaceable
+       operators)
+"""
+
+import sys
+import time
+import random
+
+sys.path.append(".")
+
+from yinyang.src.mutators.TypeAwareOpMutation import TypeAwareOpMutation
+from yinyang.src.parsing.Parse import parse_file, parse_str
+
+CONFIG = "yinyang/config/operator_mutations.txt"
+
+
+class Args:
+    config = CONFIG
+    modulo = 2
+
+
+class ScanOpMutation(TypeAwareOpMutation):
+    """
+    The previous operator selection.
+    """
+
+    def get_replacee(self, op_occ):
+        for arity, op_class in self.bidirectional:
+            if self.arities_mismatch(arity, len(op_occ.subterms)):
+                continue
+
+            if op_occ.op in op_class:
+                diff = op_class.copy()
+                diff.remove(op_occ.op)
+                return random.choice(diff)
+
+            if op_occ.quantifier in op_class:
+                diff = op_class.copy()
+                diff.remove(op_occ.quantifier)
+                return random.choice(diff)
+
+        for arity, op, replacee in self.unidirectional:
+            if op_occ.op != op or op_occ.quantifier != op:
+                continue
+            if self.arities_mismatch(arity, len(op_occ.subterms)):
+                continue
+            return replacee
+        return None
+
+    def mutate(self):
+        success = False
+        for _ in range(self.args.modulo):
+            max_choices = len(self.formula.op_occs)
+            for _ in range(max_choices):
+                op_occ = random.choice(self.formula.op_occs)
+                replacee = self.get_replacee(op_occ)
+                if replacee:
+                    success = True
+                    attr = self.operator_attr(op_occ)
+                    self.undo_log.set(op_occ, attr, replacee)
+                    break
+        return self.formula, success, False
+
+
+def uf_seed(n, ratio, rng):
+    lines = ["(set-logic QF_UFLIA)", "(declare-fun f (Int Int) Int)"]
+    lines += ["(declare-fun x%d () Int)" % i for i in range(20)]
+
+    def term(depth):
+        if depth == 0:
+            return "x%d" % rng.randrange(20)
+        if rng.random() < ratio:
+            op = rng.choice(["+", "-", "*"])
+        else:
+            op = "f"
+        return "(%s %s %s)" % (op, term(depth - 1), term(depth - 1))
+
+    for _ in range(n):
+        lines.append("(assert (distinct %s %s))" % (term(3), term(3)))
+    return "\n".join(lines + ["(check-sat)"])
+
+
+def mutate_time(mutator_class, script, mutants):
+    random.seed(0)
+    start = time.perf_counter()
+    mutator = mutator_class(script, Args())
+    setup = time.perf_counter() - start
+    successes = 0
+    start = time.perf_counter()
+    for _ in range(mutants):
+        _, success, _ = mutator.mutate()
+        successes += success
+        mutator.undo_log.rollback()
+    return setup, time.perf_counter() - start, successes
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    if sys.argv[1:]:
+        seeds = [
+            (seed, parse_file(seed, silent=True)) for seed in sys.argv[1:]
+        ]
+    else:
+        seeds = [
+            ("QF_UFLIA 10%", parse_str(uf_seed(500, 0.1, rng))),
+            ("QF_UFLIA 50%", parse_str(uf_seed(500, 0.5, rng))),
+        ]
+    mutants = 2000
+    for name, (script, glob) in seeds:
+        if not script:
+            print("%s: not parsed" % name)
+            continue
+        print("%s: %d operator occurrences" % (name, len(script.op_occs)))
+        for label, mutator_class in [
+            ("scan", ScanOpMutation), ("index", TypeAwareOpMutation)
+        ]:
+            setup, total, successes = mutate_time(
+                mutator_class, script, mutants
+            )
+            print(
+                "  %-5s setup %6.1f ms, mutate %7.1f us/mutant,"
+                " %d/%d successful" % (
+                    label, setup * 1000, total / mutants * 1e6, successes,
+                    mutants
+                )
+            )
@@ -0,0 +1,114 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Benchmark of removing the output-producing commands from seeds
+(Parse.prepare_seed) against the previous implementation, which printed
+each command up to ten times to search it for the names of the removed
+commands. Also lists the commands on which both disagree, e.g., asserts
+mentioning a variable echo_x, which the previous implementation removed.
+
+Usage: python tests/benchmark/PrepareSeed.py [seed_file ...]
+       (default: the seeds in tests/regression, tests/res and
+       tests/integration, seeds the hand-written parser does not handle
+       are skipped)
+"""
+
+import sys
+import glob
+import time
+
+sys.path.append(".")
+
+from yinyang.src.parsing.Parse import prepare_seed, generate_ast_fast
+
+
+KEYWORDS = [
+    "set-info", "set-logic", "get-model", "get-assertions", "get-proof",
+    "get-unsat-assumptions", "get-unsat-core", "get-value", "echo",
+    "simplify",
+]
+
+
+def prepare_seed_by_substrings(formula):
+    """
+    The previous implementation of prepare_seed.
+    """
+    new_cmds = []
+    for cmd in formula.commands:
+        if any(keyword in cmd.__str__() for keyword in KEYWORDS):
+            continue
+        new_cmds.append(cmd)
+    formula.commands = new_cmds
+    return formula
+
+
+def prepare_time(prepare, scripts, repetitions=5):
+    times = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        for script, cmds in scripts:
+            script.commands = cmds
+            prepare(script)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    seeds = sys.argv[1:] or sorted(
+        glob.glob("tests/regression/*.smt2")
+        + glob.glob("tests/res/*.smt2")
+        + glob.glob("tests/integration/**/*.smt2", recursive=True)
+    )
+    scripts = []
+    for seed in seeds:
+        with open(seed) as f:
+            try:
+                script, _ = generate_ast_fast(f.read(), prep_seed=False)
+            except Exception:
+                continue
+        scripts.append((script, list(script.commands)))
+    if not scripts:
+        print("no seeds parsed")
+        exit(1)
+
+    differences = 0
+    for script, cmds in scripts:
+        script.commands = cmds
+        new = set(map(id, prepare_seed(script).commands))
+        script.commands = cmds
+        old = set(map(id, prepare_seed_by_substrings(script).commands))
+        for cmd in cmds:
+            if (id(cmd) in new) != (id(cmd) in old):
+                differences += 1
+                print("kept only by %s: %s" % (
+                    "prepare_seed" if id(cmd) in new else "substrings",
+                    cmd.__str__()[:70]
+                ))
+
+    n = sum(len(cmds) for _, cmds in scripts)
+    print("%d seeds, %d commands, %d differences"
+          % (len(scripts), n, differences))
+    print("prepare [ms]:  %8.2f (substrings) %8.2f (dispatch)" % (
+        prepare_time(prepare_seed_by_substrings, scripts) * 1000,
+        prepare_time(prepare_seed, scripts) * 1000,
+    ))
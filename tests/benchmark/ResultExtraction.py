@@ -0,0 +1,101 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Benchmark of extracting the solver query results from a solver's stdout
+(FuzzerUtil.grep_result) against the previous implementation, which checked
+stdout for a valid result with three regex searches and then ran up to three
+regex searches per line. The outputs mimic incremental benchmarks with many
+check-sat answers.
+
+Usage: python tests/benchmark/ResultExtraction.py
+"""
+
+import re
+import sys
+import time
+import random
+
+sys.path.append(".")
+
+from yinyang.src.core.Solver import SolverResult, SolverQueryResult
+from yinyang.src.core.FuzzerUtil import grep_result
+
+
+def legacy_grep_result(stdout):
+    if (
+        not re.search("^unsat$", stdout, flags=re.MULTILINE)
+        and not re.search("^sat$", stdout, flags=re.MULTILINE)
+        and not re.search("^unknown$", stdout, flags=re.MULTILINE)
+    ):
+        return None
+    return legacy_grep_lines(stdout)
+
+
+def legacy_grep_lines(stdout):
+    """
+    The previous grep_result, which the validity check above preceded.
+    """
+    result = SolverResult()
+    for line in stdout.splitlines():
+        if re.search("^unsat$", line, flags=re.MULTILINE):
+            result.append(SolverQueryResult.UNSAT)
+        elif re.search("^sat$", line, flags=re.MULTILINE):
+            result.append(SolverQueryResult.SAT)
+        elif re.search("^unknown$", line, flags=re.MULTILINE):
+            result.append(SolverQueryResult.UNKNOWN)
+    return result
+
+
+def solver_output(num_answers):
+    lines = []
+    for _ in range(num_answers):
+        lines.append(random.choice(["sat", "unsat", "unknown"]))
+        lines.append("((x 42) (y (- 1)))")
+    return "\n".join(lines) + "\n"
+
+
+def measure(fun, stdout, repetitions):
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        fun(stdout)
+    return (time.perf_counter() - start) / repetitions
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    print(
+        "%10s %12s %12s %8s"
+        % ("answers", "legacy [ms]", "new [ms]", "speedup")
+    )
+    for num_answers in [10, 1000, 10000, 100000]:
+        stdout = solver_output(num_answers)
+        assert legacy_grep_result(stdout).equals(grep_result(stdout))
+        crlf = stdout.replace("\n", "\r\n")
+        assert legacy_grep_lines(crlf).lst == grep_result(crlf).lst
+        repetitions = max(1, 100000 // num_answers)
+        legacy = measure(legacy_grep_result, stdout, repetitions)
+        new = measure(grep_result, stdout, repetitions)
+        print(
+            "%10d %12.3f %12.3f %7.1fx"
+            % (num_answers, legacy * 1000, new * 1000, legacy / new)
+        )
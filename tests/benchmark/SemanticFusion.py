@@ -0,0 +1,156 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Benchmark of generating SemanticFusion mutants as copy-on-write copies of
+the prefixed seeds (see Script.overlay) against the previous
+implementation, which deep-copied and prefixed both seeds for each mutant
+and substituted the variable occurrences in place. Both are run with the
+same random seed, so they generate the same mutants, which is checked.
+
+Usage: python tests/benchmark/SemanticFusion.py [seed_file ...]
+       (default: the seeds in tests/integration/semanticfusion, all pairs
+       of the given seeds are fused with both oracles)
+"""
+
+import sys
+import copy
+import glob
+import time
+import random
+import itertools
+
+sys.path.append(".")
+
+from yinyang.src.parsing.Ast import DeclareFun
+from yinyang.src.parsing.Parse import parse_file
+from yinyang.src.mutators.SemanticFusion.SemanticFusion import SemanticFusion
+from yinyang.src.mutators.SemanticFusion.VariableFusion import (
+    fill_template, inv_by_name, fusion_contraints, add_fusion_constraints,
+    add_var_decls, z_sort
+)
+from yinyang.src.mutators.SemanticFusion.Util import (
+    random_var_triplets, disjunction, conjunction
+)
+
+
+class Args:
+    config = "yinyang/config/fusion_functions.txt"
+    generate_functions = 0
+    multiple_variables = 2
+
+    def __init__(self, oracle):
+        self.oracle = oracle
+
+
+class DeepCopyFusion(SemanticFusion):
+    """
+    The previous implementation of SemanticFusion.mutate.
+    """
+
+    def fuse(self, formula1, formula2, triplets):
+        fusion_vars = []
+        fusion_vars_names = []
+        fusion_constr = []
+        for triplet in triplets:
+            mapped_var1, mapped_var2, template =\
+                triplet[0], triplet[1], triplet[2]
+            z_name = "_".join(list(mapped_var1.keys()) +
+                              list(mapped_var2.keys()) + ["fused"])
+            if z_name in fusion_vars_names:
+                continue
+            fusion_vars_names.append(z_name)
+            z = DeclareFun(z_name, "", z_sort(template))
+            fusion_vars.append(z)
+            template = fill_template(
+                mapped_var1, mapped_var2, z_name, template)
+            fusion_constr += fusion_contraints(template, z_sort(template))
+
+            def _random_substitute(formula, mapped_vars, formula_var_name):
+                occs = [occ for occ in formula.free_var_occs
+                        if occ.name == formula_var_name]
+                k = random.randint(0, len(occs))
+                occs = random.sample(occs, k)
+                for occ in occs:
+                    occ.substitute(occ, inv_by_name(
+                        template, mapped_vars[formula_var_name].symbol))
+            for formula1_var_name in mapped_var1:
+                _random_substitute(formula1, mapped_var1, formula1_var_name)
+            for formula2_var_name in mapped_var2:
+                _random_substitute(formula2, mapped_var2, formula2_var_name)
+
+        if self.oracle == "unsat":
+            formula = disjunction(formula1, formula2)
+            add_fusion_constraints(formula, fusion_constr)
+        else:
+            formula = conjunction(formula1, formula2)
+        add_var_decls(formula, fusion_vars)
+        return formula
+
+    def mutate(self):
+        formula1, formula2 =\
+            copy.deepcopy(self.formula1), copy.deepcopy(self.formula2)
+        formula1.prefix_vars("scr1_")
+        formula2.prefix_vars("scr2_")
+        triplets = random_var_triplets(
+            formula1.global_vars, formula2.global_vars, self.templates
+        )
+        return self.fuse(formula1, formula2, triplets), True, False
+
+
+def generate(mutator_class, pairs, iterations):
+    """
+    :returns: mutants (as strings) and the time of generating them in
+              seconds, without the time of creating the mutators
+    """
+    random.seed(0)
+    mutants, elapsed = [], 0.0
+    for fn1, fn2, oracle in pairs:
+        script1, _ = parse_file(fn1, silent=True)
+        script2, _ = parse_file(fn2, silent=True)
+        mutator = mutator_class(script1, script2, Args(oracle))
+        for _ in range(iterations):
+            start = time.perf_counter()
+            mutant, _, _ = mutator.mutate()
+            elapsed += time.perf_counter() - start
+            mutants.append(mutant.__str__())
+    return mutants, elapsed
+
+
+if __name__ == "__main__":
+    seeds = sys.argv[1:] or sorted(
+        glob.glob("tests/integration/semanticfusion/*.smt2")
+    )
+    pairs = [
+        (fn1, fn2, oracle)
+        for fn1, fn2 in itertools.combinations(seeds, 2)
+        for oracle in ["sat", "unsat"]
+    ]
+    iterations = 20
+    old, old_time = generate(DeepCopyFusion, pairs, iterations)
+    new, new_time = generate(SemanticFusion, pairs, iterations)
+    differences = sum(a != b for a, b in zip(old, new))
+    print("%d seed pairs, %d mutants, %d differences"
+          % (len(pairs), len(new), differences))
+    print("mutants [ms]:  %8.1f (deepcopy) %8.1f (copy-on-write)" % (
+        old_time * 1000, new_time * 1000
+    ))
@@ -0,0 +1,125 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Memory benchmark of the slotted AST classes. Parses SMT-LIB seeds and
+compares the size of their terms (object plus attribute storage, excluding
+the attribute values) and the time of deep-copying the terms with an
+equivalent term class without slots, i.e., with a per-instance __dict__.
+
+Usage: python tests/benchmark/TermMemory.py [seed_file ...]
+       (default: the seeds in tests/regression and tests/res)
+"""
+
+import sys
+import copy
+import glob
+import time
+
+sys.path.append(".")
+
+from yinyang.src.parsing.Ast import Term
+from yinyang.src.parsing.Parse import parse_file
+
+
+class DictTerm:
+    """
+    Term without slots, i.e., the layout of Term before it was slotted.
+    """
+
+    def __init__(self, term):
+        for attr in Term.__slots__:
+            setattr(self, attr, getattr(term, attr))
+
+
+def get_terms(script):
+    terms, todo = [], []
+    for cmd in script.commands:
+        for attr in ["term", "terms"]:
+            value = getattr(cmd, attr, None)
+            if isinstance(value, Term):
+                todo.append(value)
+            elif isinstance(value, list):
+                todo.extend(t for t in value if isinstance(t, Term))
+    while todo:
+        term = todo.pop()
+        terms.append(term)
+        for attr in ["subterms", "let_terms"]:
+            todo.extend(t for t in getattr(term, attr) or []
+                        if isinstance(t, Term))
+    return terms
+
+
+def mirror(terms):
+    """
+    Rebuild the terms as DictTerms, keeping the tree structure.
+    """
+    mirrored = {id(term): DictTerm(term) for term in terms}
+    for term in mirrored.values():
+        for attr in ["subterms", "let_terms"]:
+            subs = getattr(term, attr)
+            if subs:
+                setattr(term, attr, [mirrored.get(id(t), t) for t in subs])
+        term.parent = mirrored.get(id(term.parent), term.parent)
+    return list(mirrored.values())
+
+
+def object_size(obj):
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def copy_time(terms, repetitions=10):
+    times = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        copy.deepcopy(terms)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    seeds = sys.argv[1:] or sorted(
+        glob.glob("tests/regression/*.smt2") + glob.glob("tests/res/*.smt2")
+    )
+    terms = []
+    for seed in seeds:
+        script, _ = parse_file(seed, silent=True)
+        if script:
+            terms += get_terms(script)
+    if not terms:
+        print("no terms parsed")
+        exit(1)
+    dict_terms = mirror(terms)
+
+    slotted = sum(object_size(t) for t in terms) / len(terms)
+    unslotted = sum(object_size(t) for t in dict_terms) / len(terms)
+    print("%d seeds, %d terms" % (len(seeds), len(terms)))
+    print(
+        "bytes per term:   %6.1f (dict) %6.1f (slots)" % (unslotted, slotted)
+    )
+    print(
+        "deepcopy [ms]:    %6.1f (dict) %6.1f (slots)"
+        % (copy_time(dict_terms) * 1000, copy_time(terms) * 1000)
+    )
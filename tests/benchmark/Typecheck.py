@@ -0,0 +1,199 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Benchmark of the per-term cost of the typechecker's operator dispatch
+(Typechecker.resolve_op) against the previous classification, which tested
+the operator for membership in the operator list of each theory in turn,
+then compared it with the operators of the theory and finally searched it
+for the indexed operators. Large QF_FP and QF_S seeds are generated unless
+seed files are given. Reports the dispatch time per term (typecheck_term
+on each term, without typechecking the subterms) and, for seeds that
+typecheck, the time of typechecking them.
+
+Usage: python tests/benchmark/Typecheck.py [seed_file ...]
+       (default: generated QF_FP and QF_S seeds with 5000 asserts each)
+"""
+
+import sys
+import time
+import random
+
+sys.path.append(".")
+
+from yinyang.src.parsing import Typechecker
+from yinyang.src.parsing.Ast import Term
+from yinyang.src.parsing.Parse import parse_file, parse_str
+from yinyang.src.parsing.Traversal import preorder, let_and_subterms
+from yinyang.src.parsing.Typechecker import (
+    Context, typecheck, typecheck_term, OPERATORS, INDEXED_OPERATORS
+)
+from yinyang.src.parsing.Types import (
+    CORE_OPS, NUMERICAL_OPS, INT_OPS, REAL_OPS, REAL_INTS, STRING_OPS,
+    ARRAY_OPS, FP_OPS, BV_OPS, TO_FP, TO_FP_UNSIGNED, BV_EXTRACT,
+    BV_ZERO_EXTEND, BV_SIGN_EXTEND
+)
+
+THEORIES = [
+    CORE_OPS, NUMERICAL_OPS, INT_OPS, REAL_OPS, REAL_INTS, STRING_OPS,
+    ARRAY_OPS, FP_OPS, BV_OPS
+]
+
+
+def resolve_op_by_lists(op):
+    """
+    The previous operator classification.
+    """
+    for ops in THEORIES:
+        if op in ops:
+            for theory_op in list(ops):
+                if theory_op == op:
+                    return OPERATORS.get(op)
+    if TO_FP in op:
+        return INDEXED_OPERATORS[TO_FP]
+    if TO_FP_UNSIGNED in op:
+        return INDEXED_OPERATORS[TO_FP_UNSIGNED]
+    if (
+        BV_EXTRACT in op
+        or BV_ZERO_EXTEND in op
+        or BV_SIGN_EXTEND in op
+    ):
+        return INDEXED_OPERATORS["extract"]
+    return None
+
+
+def qf_fp_seed(n, rng):
+    fp = "(_ FloatingPoint 8 24)"
+
+    # The typechecker does not resolve floating-point sorts of constants
+    # declared by declare-const, the seed uses declare-fun.
+    lines = ["(set-logic QF_FP)", "(declare-fun rm () RoundingMode)"]
+    lines += ["(declare-fun x%d () %s)" % (i, fp) for i in range(50)]
+
+    def var():
+        return "x%d" % rng.randrange(50)
+
+    def term(depth):
+        if depth == 0:
+            return var()
+        op = rng.choice(["fp.add", "fp.sub", "fp.mul", "fp.div"])
+        if rng.random() < 0.2:
+            return "(%s %s)" % (rng.choice(["fp.abs", "fp.neg"]),
+                                term(depth - 1))
+        return "(%s rm %s %s)" % (op, term(depth - 1), term(depth - 1))
+
+    for _ in range(n):
+        pred = rng.choice(["fp.leq", "fp.lt", "fp.geq", "fp.eq"])
+        lines.append("(assert (or (%s %s %s) (fp.isNaN %s)))" % (
+            pred, term(3), term(3), term(2)
+        ))
+    return "\n".join(lines + ["(check-sat)"])
+
+
+def qf_s_seed(n, rng):
+    lines = ["(set-logic QF_S)", "(declare-const i Int)"]
+    lines += ["(declare-const s%d String)" % i for i in range(50)]
+
+    def var():
+        return "s%d" % rng.randrange(50)
+
+    def term(depth):
+        if depth == 0:
+            return rng.choice([var(), var(), '"ab"'])
+        return rng.choice([
+            "(str.++ %s %s)" % (term(depth - 1), term(depth - 1)),
+            "(str.substr %s 0 (str.len %s))" % (term(depth - 1), var()),
+            "(str.replace %s %s %s)" % (term(depth - 1), var(), var()),
+            "(str.at %s i)" % term(depth - 1),
+        ])
+
+    for _ in range(n):
+        lines.append(rng.choice([
+            "(assert (str.in_re %s (re.* (str.to_re %s))))" % (
+                term(3), term(1)),
+            "(assert (= (str.len %s) (str.indexof %s %s 0)))" % (
+                term(3), term(2), var()),
+            "(assert (and (str.prefixof %s %s) (str.contains %s %s)))" % (
+                var(), term(3), term(2), var()),
+        ]))
+    return "\n".join(lines + ["(check-sat)"])
+
+
+def get_terms(script):
+    terms = []
+    for cmd in script.assert_cmd:
+        for term in preorder(cmd.term, let_and_subterms):
+            if isinstance(term, Term):
+                terms.append(term)
+    return terms
+
+
+def dispatch_time(terms, glob, resolve, repetitions=5):
+    Typechecker.resolve_op.cache_clear()
+    saved = Typechecker.resolve_op
+    Typechecker.resolve_op = resolve
+    try:
+        times = []
+        for _ in range(repetitions):
+            ctxt = Context(glob, {})
+            start = time.perf_counter()
+            for term in terms:
+                typecheck_term(term, ctxt)
+            times.append(time.perf_counter() - start)
+    finally:
+        Typechecker.resolve_op = saved
+    return min(times)
+
+
+def typecheck_time(script, glob):
+    start = time.perf_counter()
+    try:
+        typecheck(script, glob)
+    except Exception as e:
+        return "n/a (%s)" % type(e).__name__
+    return "%.1f ms" % ((time.perf_counter() - start) * 1000)
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    if sys.argv[1:]:
+        seeds = [
+            (seed, parse_file(seed, silent=True)) for seed in sys.argv[1:]
+        ]
+    else:
+        seeds = [
+            ("QF_FP", parse_str(qf_fp_seed(5000, rng))),
+            ("QF_S", parse_str(qf_s_seed(5000, rng))),
+        ]
+    for name, (script, glob) in seeds:
+        if not script:
+            print("%s: not parsed" % name)
+            continue
+        terms = get_terms(script)
+        old = dispatch_time(terms, glob, resolve_op_by_lists)
+        new = dispatch_time(terms, glob, Typechecker.resolve_op)
+        print("%s: %d terms, typecheck: %s" % (
+            name, len(terms), typecheck_time(script, glob)
+        ))
+        print("  dispatch [ns/term]: %6.0f (lists) %6.0f (table)" % (
+            old / len(terms) * 1e9, new / len(terms) * 1e9
+        ))
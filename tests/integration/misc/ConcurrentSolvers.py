@@ -0,0 +1,145 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+python = sys.executable
+
+
+def call_fuzzer(solvers, seed, opts):
+    cmd = [
+        python, "bin/opfuzz", ";".join(solvers), seed,
+        "-b", os.path.join(tmp, "bugs"), "-s", os.path.join(tmp, "scratch"),
+        "-l", os.path.join(tmp, "logs"), "--concurrent-solvers"
+    ] + opts.split(" ")
+    start = time.time()
+    try:
+        proc = subprocess.run(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            timeout=120,
+        )
+    except subprocess.TimeoutExpired:
+        print("$", " ".join(cmd))
+        print("[ERROR] The fuzzer hangs.")
+        exit(1)
+    out = proc.stdout.decode()
+    return proc.returncode, out, " ".join(cmd), time.time() - start
+
+
+def create_mocksolver(code, script_fn):
+    open(script_fn, "w").write("#! /usr/bin/env python3\n" + code)
+    os.system("chmod +x " + script_fn)
+    return script_fn
+
+
+def bug_reports(bugtype):
+    folder = os.path.join(tmp, "bugs")
+    if not os.path.exists(folder):
+        return []
+    return [
+        os.path.join(folder, fn) for fn in sorted(os.listdir(folder))
+        if fn.startswith(bugtype) and fn.endswith(".output")
+    ]
+
+
+def reset():
+    for folder in ["bugs", "scratch", "logs"]:
+        shutil.rmtree(os.path.join(tmp, folder), ignore_errors=True)
+
+
+def expect(cond, msg, cmd, out):
+    if not cond:
+        print("$", cmd)
+        print(out)
+        print("[ERROR]", msg)
+        exit(1)
+
+
+tmp = tempfile.mkdtemp()
+slow_sat = create_mocksolver(
+    'import time\ntime.sleep(2)\nprint("sat")\n',
+    os.path.join(tmp, "slow_sat.py")
+)
+fast_unsat = create_mocksolver(
+    'print("unsat")\n', os.path.join(tmp, "fast_unsat.py")
+)
+hanging = create_mocksolver(
+    'import time\ntime.sleep(60)\nprint("sat")\n',
+    os.path.join(tmp, "hanging.py")
+)
+crash = create_mocksolver(
+    'print("Exception: mock crash")\n', os.path.join(tmp, "crash.py")
+)
+seed = os.path.join(tmp, "seed.smt2")
+with open(seed, "w") as f:
+    f.write("(declare-fun x () Int)\n(assert (> x 0))\n(check-sat)\n")
+
+# The solvers run at the same time, a mutant costs the slowest solver only.
+code, out, cmd, elapsed = call_fuzzer([slow_sat, slow_sat], seed, "-i 2")
+expect(code == 0, "Concurrent fuzzing failed.", cmd, out)
+expect(elapsed < 7, "Solvers did not run concurrently.", cmd, out)
+expect(not bug_reports(""), "Unexpected bug report.", cmd, out)
+reset()
+
+# Although the second solver finishes first, the first solver of the
+# testbook is the reference of the soundness check.
+code, out, cmd, _ = call_fuzzer([slow_sat, fast_unsat], seed, "-i 1")
+expect(code == 10, "Concurrent fuzzing failed.", cmd, out)
+reports = bug_reports("incorrect")
+expect(len(reports) == 1, "Soundness bug not detected.", cmd, out)
+log = open(reports[0]).read()
+expect(
+    log.startswith("*** REFERENCE \ncommand: " + slow_sat + "\n"),
+    "Wrong reference solver.", cmd, log
+)
+expect(
+    "*** INCORRECT \ncommand: " + fast_unsat + "\n" in log,
+    "Wrong incorrect solver.", cmd, log
+)
+reset()
+
+# A crash of the second solver cancels the first one still running.
+code, out, cmd, elapsed = call_fuzzer([hanging, crash], seed, "-i 1 -t 90")
+expect(code == 10, "Concurrent fuzzing failed.", cmd, out)
+expect(elapsed < 30, "Hanging solver not cancelled.", cmd, out)
+reports = bug_reports("crash")
+expect(len(reports) == 1, "Crash not detected.", cmd, out)
+expect(
+    "command: " + crash + "\n" in open(reports[0]).read(),
+    "Crash of the wrong solver reported.", cmd, out
+)
+expect(not bug_reports("incorrect"), "Unexpected bug report.", cmd, out)
+reset()
+
+# Same with solver sessions, which are reused across mutants.
+code, out, cmd, elapsed = call_fuzzer(
+    [hanging, crash], seed, "-i 1 -t 90 --sessions reset"
+)
+expect(code == 10, "Concurrent fuzzing failed.", cmd, out)
+expect(elapsed < 30, "Hanging solver session not cancelled.", cmd, out)
+expect(len(bug_reports("crash")) == 1, "Crash not detected.", cmd, out)
+shutil.rmtree(tmp)
@@ -0,0 +1,108 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+python = sys.executable
+
+
+def call_fuzzer(strategy, solver, folder, opts):
+    cmd = [
+        python, "bin/" + strategy, solver + ";" + solver, folder
+    ] + opts.split(" ")
+    try:
+        proc = subprocess.run(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            timeout=120,
+        )
+    except subprocess.TimeoutExpired:
+        print("$", " ".join(cmd))
+        print("[ERROR] The fuzzer hangs.")
+        exit(1)
+    return proc.returncode, proc.stdout.decode(), " ".join(cmd)
+
+
+def create_mocksolver(code, script_fn):
+    open(script_fn, "w").write("#! /usr/bin/env python3\n" + code)
+    os.system("chmod +x " + script_fn)
+
+
+def create_seeds(folder, formula, num):
+    os.makedirs(folder)
+    for i in range(num):
+        with open(os.path.join(folder, "seed%d.smt2" % i), "w") as f:
+            f.write(formula % i)
+
+
+def expect(cond, msg, cmd, out):
+    if not cond:
+        print("$", cmd)
+        print(out)
+        print("[ERROR]", msg)
+        exit(1)
+
+
+tmp = tempfile.mkdtemp()
+solver = os.path.join(tmp, "solver.py")
+create_mocksolver('print("sat")\n', solver)
+
+# The parent process of the solver is the worker, which is killed.
+killer = os.path.join(tmp, "killer.py")
+create_mocksolver(
+    "import os\nimport signal\nos.kill(os.getppid(), signal.SIGKILL)\n",
+    killer
+)
+
+good = os.path.join(tmp, "good")
+create_seeds(
+    good, "(declare-fun x () Int)\n(assert (> x %d))\n(check-sat)\n", 10
+)
+
+# The seeds do not typecheck, typefuzz fails on them.
+ill_typed = os.path.join(tmp, "ill_typed")
+create_seeds(
+    ill_typed, '(declare-fun x () Int)\n(assert (= x "%d"))\n(check-sat)\n',
+    10
+)
+
+code, out, cmd = call_fuzzer("opfuzz", solver, good, "-i 3 -j 2")
+expect(code == 0, "Parallel fuzzing failed.", cmd, out)
+expect(
+    "10 seeds processed, 10 valid, 0 invalid" in out,
+    "Statistics of the workers were not merged.", cmd, out
+)
+
+code, out, cmd = call_fuzzer("typefuzz", solver, ill_typed, "-i 3 -j 2")
+expect(code == 3, "Error of a worker not reported.", cmd, out)
+expect("failed on seed" in out, "Error of a worker not reported.", cmd, out)
+
+code, out, cmd = call_fuzzer("opfuzz", killer, good, "-i 3 -j 2")
+expect(code == 3, "Killed worker not reported.", cmd, out)
+expect(
+    "terminated with exit code -9" in out,
+    "Killed worker not reported.", cmd, out
+)
+shutil.rmtree(tmp)
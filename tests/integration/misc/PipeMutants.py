@@ -0,0 +1,94 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+python = sys.executable
+
+
+def call_fuzzer(solvers, seed, opts):
+    cmd = [
+        python, "bin/opfuzz", ";".join(solvers), seed,
+        "-b", os.path.join(tmp, "bugs"), "-s", os.path.join(tmp, "scratch"),
+        "-l", os.path.join(tmp, "logs"), "--pipe-mutants"
+    ] + opts
+    try:
+        proc = subprocess.run(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            timeout=120,
+        )
+    except subprocess.TimeoutExpired:
+        print("$", " ".join(cmd))
+        print("[ERROR] The fuzzer hangs.")
+        exit(1)
+    return proc.returncode, proc.stdout.decode(), " ".join(cmd)
+
+
+# The mock solvers only answer if the mutant is passed over stdin.
+def create_mocksolver(result, script_fn):
+    code = "#! /usr/bin/env python3\n"
+    code += "import sys\n"
+    code += "if len(sys.argv) == 1 and '(check-sat)' in sys.stdin.read():\n"
+    code += "    print('" + result + "')\n"
+    open(script_fn, "w").write(code)
+    os.system("chmod +x " + script_fn)
+    return script_fn
+
+
+def files(folder):
+    folder = os.path.join(tmp, folder)
+    return os.listdir(folder) if os.path.exists(folder) else []
+
+
+def expect(cond, msg, cmd, out):
+    if not cond:
+        print("$", cmd)
+        print(out)
+        print("[ERROR]", msg)
+        exit(1)
+
+
+tmp = tempfile.mkdtemp()
+sat = create_mocksolver("sat", os.path.join(tmp, "sat.py"))
+unsat = create_mocksolver("unsat", os.path.join(tmp, "unsat.py"))
+seed = os.path.join(tmp, "seed.smt2")
+with open(seed, "w") as f:
+    f.write("(declare-fun x () Int)\n(assert (> x 0))\n(check-sat)\n")
+
+code, out, cmd = call_fuzzer([sat, sat], seed, ["-i", "5"])
+expect(code == 0, "Piping mutants failed.", cmd, out)
+expect(not files("scratch"), "Mutant written to a scratch file.", cmd, out)
+
+# The solvers answer differently only if they received the mutant over stdin.
+# The bug trigger is written although the mutant was not written to a file.
+code, out, cmd = call_fuzzer([sat, unsat], seed, ["-i", "1"])
+expect(code == 10, "Soundness bug not detected.", cmd, out)
+expect(
+    len([fn for fn in files("bugs") if fn.endswith(".smt2")]) == 1,
+    "Bug trigger not written.", cmd, out
+)
+expect(not files("scratch"), "Mutant written to a scratch file.", cmd, out)
+shutil.rmtree(tmp)
@@ -0,0 +1,133 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import sys
+import glob
+import unittest
+
+from antlr4.InputStream import InputStream
+
+from yinyang.src.parsing.Ast import Term
+from yinyang.src.parsing.Parse import (
+    generate_ast,
+    generate_ast_fast,
+    parse_str,
+)
+from yinyang.src.parsing.FastParser import FastParserException
+
+sys.path.append("../../")
+
+
+def dump(x):
+    """
+    :returns: nested tuples representing all attributes of x, i.e., of the
+              commands, terms and types
+    """
+    if isinstance(x, Term):
+        return tuple(
+            (s, dump(getattr(x, s))) for s in Term.__slots__ if s != "parent"
+        )
+    if isinstance(x, (list, tuple)):
+        return (type(x).__name__,) + tuple(dump(y) for y in x)
+    if isinstance(x, dict):
+        return tuple((k, dump(v)) for k, v in x.items())
+    if isinstance(x, (str, int, type(None))):
+        return x
+    slots = []
+    for cls in type(x).__mro__:
+        slots += getattr(cls, "__slots__", ())
+    if slots:
+        return (type(x).__name__,) + tuple(
+            (s, dump(getattr(x, s, None))) for s in slots
+        )
+    return (type(x).__name__, str(x))
+
+
+def antlr_ast(text):
+    try:
+        return generate_ast(InputStream(text), prep_seed=False)
+    except Exception:
+        return "error"
+
+
+class FastParserTestCase(unittest.TestCase):
+    def assertSameAst(self, text):
+        expected = antlr_ast(text)
+        try:
+            actual = generate_ast_fast(text, prep_seed=False)
+        except FastParserException:
+
+            # The fast parser rejects scripts with syntax errors, the ANTLR
+            # parser is used for them.
+            self.assertEqual(expected, "error")
+            return
+        self.assertEqual(dump(actual), dump(expected))
+        if expected:
+            self.assertEqual(str(actual[0]), str(expected[0]))
+
+    def test_corpus(self):
+        folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        seeds = glob.glob(folder + "/**/*.smt2", recursive=True)
+        self.assertTrue(len(seeds) > 0)
+        for seed in seeds:
+            with open(seed, "rb") as f:
+                text = f.read().decode("utf8")
+            with self.subTest(seed=seed):
+                self.assertSameAst(text)
+
+    def test_quirks(self):
+        scripts = [
+            "(assert (= x (_ bv5 32) (_\nbv5 32) (_ foo 5) (_ foo 5 6)))",
+            "(push 1)(pop 2)(check-sat-assuming (a b))(get-value (x y))",
+            "(declare-const x Int)(assert (let ((x (+ x 1))) (> x 0)))",
+            "(declare-const x Int)(assert (forall ((x Bool)) x))(assert x)",
+            "(define-fun f ((x Int)) Int (+ x 1))(assert (= (f 1) 2))",
+            "(declare-const |a b| Real)(assert (> |a b| 1.5 0.007))",
+            "(assert ((_ extract 7 0) #x01))(assert (str.in_re x re.all))",
+            "(declare-datatypes ((L 1)) ((par (T) ((nil) (c (h T) (t L))))))",
+            "(set-info :source |a\nb|)(set-info :notes (_ bv5 32))(exit)",
+            "(assert-soft (> x 1) :weight 2)(echo \"a\"\"b\")\r\n(check-sat)",
+        ]
+        for script in scripts:
+            with self.subTest(script=script):
+                self.assertSameAst(script)
+
+    def test_fallback(self):
+        scripts = [
+            "(assert (= bvx y))",
+            "(assert (= x 007))",
+            "(declare-datatypes () ((List nil)))",
+            "(assert true)(check-sat-using smt)",
+            "(declare-const x Int)(assert (! x :named n))",
+        ]
+        for script in scripts:
+            with self.subTest(script=script):
+                with self.assertRaises(FastParserException):
+                    generate_ast_fast(script)
+                fast = parse_str(script, backend="fast")
+                antlr = parse_str(script, backend="antlr")
+                self.assertEqual(dump(fast), dump(antlr))
+
+
+if __name__ == "__main__":
+    unittest.main()
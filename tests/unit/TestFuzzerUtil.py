@@ -0,0 +1,52 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import sys
+import unittest
+
+from yinyang.src.core.Solver import SolverQueryResult
+from yinyang.src.core.FuzzerUtil import grep_result
+
+sys.path.append("../../")
+
+SAT = SolverQueryResult.SAT
+UNSAT = SolverQueryResult.UNSAT
+UNKNOWN = SolverQueryResult.UNKNOWN
+
+
+class FuzzerUtilTestCase(unittest.TestCase):
+    def test_grep_result(self):
+        stdout = "sat\n((x 1))\nunsat\n unknown\nunknown\n(error \"sat\")"
+        self.assertEqual(grep_result(stdout).lst, [SAT, UNSAT, UNKNOWN])
+        self.assertEqual(grep_result("sat").lst, [SAT])
+        self.assertEqual(grep_result("").lst, [])
+        self.assertEqual(grep_result("satisfiable\n").lst, [])
+
+    def test_grep_result_crlf(self):
+        result = grep_result("sat\r\nunsat\r\n")
+        self.assertEqual(result.lst, [SAT, UNSAT])
+        self.assertEqual(str(result), "sat\nunsat")
+        self.assertEqual(grep_result("unknown\r\n").lst, [UNKNOWN])
+
+
+if __name__ == "__main__":
+    unittest.main()
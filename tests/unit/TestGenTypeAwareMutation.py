@@ -30,6 +30,8 @@ from yinyang.src.parsing.Parse import *
 from yinyang.src.parsing.Typechecker import Context, typecheck
 from yinyang.src.mutators.GenTypeAwareMutation.GenTypeAwareMutation import *
 from yinyang.src.mutators.GenTypeAwareMutation.Util import *
+from yinyang.src.parsing.Ast import Var
+from yinyang.src.parsing.Types import INTEGER_TYPE, STRING_TYPE
 
 
 class Mockargs:
@@ -63,6 +65,109 @@ class GenTypeAwareMutationTestCase(unittest.TestCase):
         gen.generate()
         os.system("rm " + formulafile)
 
+    def test_ill_typed_mutant(self):
+        formula = """
+        (declare-fun x () Int)
+        (declare-fun s () String)
+        (assert (> (* (+ 3 x) 2) (str.len s)))
+        (check-sat)
+        """
+        script, glob = parse_str(formula)
+        ctxt = typecheck(script, glob)
+        unique_expr = get_unique_subterms(script)
+        gen = GenTypeAwareMutation(script, Mockargs(), unique_expr, ctxt)
+        before = str(script)
+        plus = script.assert_cmd[0].term.subterms[0].subterms[0]
+        self.assertFalse(gen.substitute(plus, Var("s", STRING_TYPE)))
+        self.assertEqual(str(script), before)
+        self.assertEqual(plus.type, INTEGER_TYPE)
+        self.assertIs(plus.parent.subterms[0], plus)
+
+        self.assertTrue(gen.substitute(plus, Var("x", INTEGER_TYPE)))
+        self.assertEqual(
+            str(script.assert_cmd[0].term), "(> (* x 2) (str.len s))"
+        )
+        gen.undo_log.rollback()
+        self.assertEqual(str(script), before)
+        for _ in range(10):
+            gen.mutate()
+        gen.undo_log.rollback()
+        self.assertEqual(str(script), before)
+
+    def test_candidate_ops(self):
+        formula = """
+        (declare-fun x () Int)
+        (declare-fun y () Int)
+        (assert (exists ((z Int)) (> z x)))
+        (assert (= (+ x 1) y))
+        (check-sat)
+        """
+        script, glob = parse_str(formula)
+        typecheck(script, glob)
+        unique_expr = get_unique_subterms(script)
+        gen = GenTypeAwareMutation(script, Mockargs(), unique_expr)
+
+        # The seed has Int and Bool expressions only.
+        names = [op.name for op in gen.get_candidate_ops(Var("x", "Int"))]
+        self.assertIn("id", names)
+        self.assertIn("+", names)
+        self.assertNotIn("str.len", names)
+        self.assertIs(
+            gen.get_candidate_ops(Var("x", "Int")),
+            gen.candidate_ops["Int"]
+        )
+        names = [op.name for op in gen.get_candidate_ops(Var("s", "String"))]
+        self.assertEqual(names, ["id", "str.from_code", "str.from_int"])
+        self.assertIsNone(gen.get_compatible_expr(Var("s", "String")))
+
+        # The expressions z and x, first seen within the quantifier, are not
+        # compatible with the holes of the second assert.
+        self.assertEqual(
+            [str(t) for t, _ in gen.bound_pools["Int"]], ["z", "x"]
+        )
+        y = script.assert_cmd[1].term.subterms[1]
+        for _ in range(20):
+            self.assertIn(
+                str(gen.get_compatible_expr(y)), ["1", "(+ x 1)"]
+            )
+
+    def test_hole_index(self):
+        formula = """
+        (declare-fun x () Int)
+        (declare-fun y () Int)
+        (assert (> (* (+ 3 x) 2) y))
+        (check-sat)
+        """
+        script, glob = parse_str(formula)
+        ctxt = typecheck(script, glob)
+        unique_expr = get_unique_subterms(script)
+        gen = GenTypeAwareMutation(script, Mockargs(), unique_expr, ctxt)
+
+        def holes():
+            return sorted(str(t) for t in gen.holes.holes)
+
+        # Subterms shared by a mutant (e.g. (* y y)) are indexed once.
+        def expected():
+            terms = {id(t): t for t in get_all_subterms(script)[0]}
+            return sorted(str(t) for t in terms.values())
+
+        before = holes()
+        self.assertEqual(len(before), 7)
+        self.assertEqual(before, expected())
+        times = script.assert_cmd[0].term.subterms[0]
+        self.assertTrue(gen.substitute(times, Var("y", INTEGER_TYPE)))
+        self.assertEqual(holes(), ["(> y y)", "y", "y"])
+        gen.undo_log.rollback()
+        self.assertEqual(holes(), before)
+
+        for _ in range(20):
+            gen.mutate()
+            self.assertEqual(holes(), expected())
+            for i, hole in enumerate(gen.holes.holes):
+                self.assertEqual(gen.holes.positions[id(hole)], i)
+        gen.undo_log.rollback()
+        self.assertEqual(holes(), before)
+
 
 if __name__ == "__main__":
     unittest.main()
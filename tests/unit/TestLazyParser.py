@@ -0,0 +1,114 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import sys
+import copy
+import pickle
+import unittest
+
+from yinyang.src.parsing.Ast import LazyAssert
+from yinyang.src.parsing.Parse import parse_str
+from yinyang.src.parsing.FastParser import FastParserException
+from yinyang.src.parsing.LazyParser import split_commands
+
+sys.path.append("../../")
+
+
+class LazyParserTestCase(unittest.TestCase):
+    def test_split_commands(self):
+        data = b"""\
+; (comment)
+(set-info :source |(quoted)|)
+(declare-fun x () String) ; )
+(assert (= x "a)""("))
+"""
+        cmds = split_commands(data)
+        self.assertEqual(
+            [head for head, _, _ in cmds],
+            [b"set-info", b"declare-fun", b"assert"],
+        )
+        self.assertEqual(
+            [data[start:end] for _, start, end in cmds],
+            [
+                b"(set-info :source |(quoted)|)",
+                b"(declare-fun x () String)",
+                b'(assert (= x "a)""("))',
+            ],
+        )
+
+        # Commands nested deeper than COMMAND_REGEX matches.
+        deep = b"(assert " + b"(not " * 20 + b"x" + b")" * 21
+        self.assertEqual(
+            split_commands(deep + b"(exit)"),
+            [(b"assert", 0, len(deep)), (b"exit", len(deep), len(deep) + 6)],
+        )
+        for data in [b"(assert x", b"(assert x))", b"x (check-sat)",
+                     b'(echo "x)']:
+            self.assertRaises(FastParserException, split_commands, data)
+
+    def test_lazy_asserts(self):
+        formula = """\
+(set-info :status sat)
+(assert (> x 0))
+(declare-fun x () Int)
+(get-model)
+(assert (> x   1))
+(check-sat)
+"""
+        fast, fast_globs = parse_str(formula, backend="fast")
+        script, globs = parse_str(formula, backend="lazy")
+        self.assertEqual(len(script.commands), 4)
+        self.assertTrue(isinstance(script.commands[0], LazyAssert))
+
+        # Untouched asserts are printed as in the text.
+        self.assertEqual(script.commands[2].__str__(), "(assert (> x   1))")
+        self.assertFalse(script.commands[2].is_parsed())
+        for other in [copy.deepcopy(script),
+                      pickle.loads(pickle.dumps(script))]:
+            self.assertFalse(other.commands[2].is_parsed())
+            self.assertEqual(other.__str__(), script.__str__())
+
+        # x is a variable only after its declaration.
+        term = script.commands[2].term
+        self.assertTrue(script.commands[2].is_parsed())
+        self.assertTrue(term.subterms[0].is_var)
+        self.assertTrue(isinstance(script.commands[0].term.subterms[0], str))
+        self.assertEqual(script.__str__(), fast.__str__())
+        self.assertEqual(
+            [op.__str__() for op in script.op_occs],
+            [op.__str__() for op in fast.op_occs],
+        )
+        self.assertEqual(globs, fast_globs)
+
+    def test_fallback(self):
+        formula = """\
+(declare-fun x () Int)
+(assert (> x (x)))
+"""
+        script, _ = parse_str(formula, backend="lazy")
+        term = script.assert_cmd[0].term
+        self.assertEqual(term.__str__(), "(> x x)")
+        self.assertTrue(term.subterms[1].is_var)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import sys
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from antlr4.FileStream import FileStream
+
+from yinyang.src.parsing.Parse import parse_file
+from yinyang.src.parsing.MmapStream import MmapStream, open_stream
+
+sys.path.append("../../")
+
+
+class MmapStreamTestCase(unittest.TestCase):
+    def write(self, name, content):
+        fn = os.path.join(self.folder, name)
+        with open(fn, "w", encoding="utf8") as f:
+            f.write(content)
+        return fn
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_open_stream(self):
+        ascii_fn = self.write("ascii.smt2", "(check-sat)")
+        stream = open_stream(ascii_fn)
+        self.assertTrue(isinstance(stream, MmapStream))
+        self.assertEqual(stream.getText(1, 9), "check-sat")
+        stream.close()
+
+        for content in ["", '(echo "ä")']:
+            stream = open_stream(self.write("other.smt2", content))
+            self.assertTrue(isinstance(stream, FileStream))
+            self.assertEqual(stream.__str__(), content)
+
+    def test_parse(self):
+        fn = self.write("seed.smt2", """\
+(declare-fun x () Int)
+(declare-fun |y z| () Int)
+(assert (> x |y z|))
+(assert (distinct x 5))
+(check-sat)
+""")
+        antlr, _ = parse_file(fn, backend="antlr")
+        fast, _ = parse_file(fn, backend="fast")
+        self.assertEqual(antlr.__str__(), fast.__str__())
+        self.assertEqual(len(antlr.assert_cmd), 2)
+
+        # Lazily parsed scripts map the file, their copies carry the text.
+        lazy, _ = parse_file(fn, backend="lazy")
+        copied = pickle.loads(pickle.dumps(lazy))
+        self.assertEqual(copied.__str__(), lazy.__str__())
+        self.assertEqual(
+            copied.assert_cmd[1].term.__str__(), "(distinct x 5)"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
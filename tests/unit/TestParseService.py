@@ -0,0 +1,65 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import sys
+import unittest
+
+from yinyang.src.parsing.Parse import parse_file
+from yinyang.src.parsing.ParseService import ParseService
+
+sys.path.append("../../")
+
+LARGE = "(declare-fun x () Int)\n(assert (> x (+ %s)))\n" % ("x " * 200000)
+
+
+class ParseServiceTestCase(unittest.TestCase):
+    def test_parse(self):
+        service = ParseService()
+        fn = "tests/res/issue18.smt2"
+        script, globs = service.parse_file(fn)
+        expected, expected_globs = parse_file(fn)
+        self.assertEqual(script.__str__(), expected.__str__())
+        self.assertEqual(globs, expected_globs)
+        self.assertEqual(service.parse_str("(assert ))("), (None, None))
+        self.assertTrue(service.alive())
+        service.stop()
+
+    def test_timeout(self):
+        service = ParseService(timeout_limit=0.05)
+        self.assertEqual(service.parse_str(LARGE), (None, None))
+        self.assertFalse(service.alive())
+
+        # The parser process is restarted for the next seed.
+        service.timeout_limit = 30
+        script, _ = service.parse_str("(assert true)")
+        self.assertEqual(script.__str__(), "(assert true)")
+        service.stop()
+
+    def test_memory_limit(self):
+        service = ParseService(memory_limit=1024 * 1024)
+        self.assertEqual(service.parse_str(LARGE), (None, None))
+        self.assertFalse(service.alive())
+        service.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -47,6 +47,36 @@ class ParsingTestCase(unittest.TestCase):
 (check-sat)"""
         self.assertEqual(oracle, formula.__str__())
 
+    def test_prepare_seed(self):
+        script = """\
+(set-info :status sat)
+(set-logic QF_LIA)
+(declare-fun echo_x () Int)
+(assert (> echo_x 0))
+(simplify (+ echo_x 1))
+(check-sat)
+(get-value (echo_x))
+(get-model)
+(echo "get-model")
+(get-unsat-core)"""
+        oracle = """\
+(declare-fun echo_x () Int)
+(assert (> echo_x 0))
+(check-sat)"""
+        for backend in ["fast", "lazy", "antlr"]:
+            formula, _ = parse_str(script, silent=False, backend=backend)
+            self.assertEqual(oracle, formula.__str__())
+
+    def test_timeout_limit(self):
+
+        # The time limit used to be the second argument, it is ignored now.
+        with self.assertWarns(DeprecationWarning):
+            formula, _ = parse_str("(assert true)", 30, False)
+        self.assertEqual(formula.__str__(), "(assert true)")
+        with self.assertWarns(DeprecationWarning):
+            formula, _ = parse_file("tests/res/issue18.smt2", 30)
+        self.assertIsNotNone(formula)
+
 
 #     def test_issue25(self):
 # script = """\
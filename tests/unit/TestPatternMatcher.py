@@ -0,0 +1,66 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import sys
+import unittest
+
+from yinyang.src.base.PatternMatcher import PatternMatcher
+
+sys.path.append("../../")
+
+
+class PatternMatcherTestCase(unittest.TestCase):
+    def test_classify(self):
+        matcher = PatternMatcher(
+            crash=["Exception", "ASSERTION"],
+            duplicate=["src/smt/smt_mock.cpp:1489"],
+            ignore=["(error ", "unsupported"],
+        )
+        stderr = "ASSERTION VIOLATION\nFile: src/smt/smt_mock.cpp:1489\n"
+        self.assertEqual(
+            matcher.classify("unsat\n", stderr),
+            {"crash": "ASSERTION", "duplicate": "src/smt/smt_mock.cpp:1489"},
+        )
+        self.assertEqual(
+            matcher.classify('(error "unsupported")\n', ""),
+            {"ignore": "(error "},
+        )
+        self.assertEqual(matcher.classify("sat\n", ""), {})
+
+    def test_overlapping_patterns(self):
+        matcher = PatternMatcher(
+            crash=["Assertion", "Assert"], duplicate=["ertion fail"]
+        )
+        self.assertEqual(
+            matcher.classify("Assertion failed", ""),
+            {"crash": "Assertion", "duplicate": "ertion fail"},
+        )
+        matcher = PatternMatcher(crash=["Assertion"], duplicate=["Assert"])
+        self.assertEqual(
+            matcher.classify("Assertion", ""),
+            {"crash": "Assertion", "duplicate": "Assert"},
+        )
+        self.assertEqual(matcher.search("x Assert"), "Assert")
+
+
+if __name__ == "__main__":
+    unittest.main()
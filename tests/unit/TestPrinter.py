@@ -0,0 +1,57 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import io
+import sys
+import unittest
+
+from yinyang.src.parsing.Parse import parse_str
+from yinyang.src.parsing.Ast import Var, Expr
+from yinyang.src.parsing.Printer import write_script, script_to_str
+
+sys.path.append("../../")
+
+
+class PrinterTestCase(unittest.TestCase):
+    def test_write_script(self):
+        formula = """\
+(declare-fun x () Int)
+(declare-fun p () Bool)
+(assert (forall ((a Int) (b Int)) (let ((c (+ a b))(d 3)) (and (> c d) p))))
+(assert (exists ((a Int)) (> a (- x 1))))
+(check-sat)"""
+        script, _ = parse_str(formula)
+        self.assertEqual(script_to_str(script), formula)
+        self.assertEqual(script.__str__(), formula)
+        stream = io.StringIO()
+        write_script(script, stream, buffer_size=8)
+        self.assertEqual(stream.getvalue(), formula)
+
+    def test_deep_term(self):
+        term = Var("x", "Int")
+        for _ in range(100000):
+            term = Expr("-", [term])
+        self.assertEqual(len(term.__str__()), 4 * 100000 + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import warnings
+
+from yinyang.src.parsing.Ast import LazyScript
+from yinyang.src.parsing.Parse import parse_file
+from yinyang.src.parsing.ParseService import ParseService
+from yinyang.src.parsing.SeedCache import SeedCache, schema_tag
+
+sys.path.append("../../")
+
+
+class SeedCacheTestCase(unittest.TestCase):
+    def test_seed_cache(self):
+        folder = tempfile.mkdtemp()
+        seed = os.path.join(folder, "seed.smt2")
+        with open(seed, "w") as f:
+            f.write("""\
+(declare-fun x () Int)
+(assert (> x (- 1)))
+(check-sat)
+""")
+        cache = SeedCache(os.path.join(folder, "cache"))
+        script, globs = parse_file(seed)
+        for _ in range(2):
+            cached_script, cached_globs = cache.parse_file(seed)
+            self.assertEqual(cached_script.__str__(), script.__str__())
+            self.assertEqual(cached_globs, globs)
+        entries = os.listdir(os.path.join(folder, "cache", schema_tag()))
+        self.assertEqual(len(entries), 1)
+
+        # Corrupted entries are replaced.
+        entry = os.path.join(folder, "cache", schema_tag(), entries[0])
+        with open(entry, "wb") as f:
+            f.write(b"corrupted")
+        cached_script, _ = cache.parse_file(seed)
+        self.assertEqual(cached_script.__str__(), script.__str__())
+        shutil.rmtree(folder)
+
+    def test_parse_without_service(self):
+        folder = tempfile.mkdtemp()
+        seed = os.path.join(folder, "seed.smt2")
+        with open(seed, "w") as f:
+            f.write("(assert true)\n(check-sat)\n")
+        cache = SeedCache(os.path.join(folder, "cache"))
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)
+            script, _ = cache.parse_file(seed, silent=False)
+        self.assertEqual(len(script.commands), 2)
+        shutil.rmtree(folder)
+
+    def test_backends(self):
+        folder = tempfile.mkdtemp()
+        seed = os.path.join(folder, "seed.smt2")
+        with open(seed, "w") as f:
+            f.write("(declare-fun x () Int)\n(assert (> x 0))\n")
+        service = ParseService(backend="lazy")
+        try:
+            lazy = SeedCache(os.path.join(folder, "cache"), service)
+            script, _ = lazy.parse_file(seed)
+            self.assertIsInstance(script, LazyScript)
+        finally:
+            service.stop()
+
+        # The ASTs of other backends are cached separately.
+        script, _ = SeedCache(os.path.join(folder, "cache")).parse_file(seed)
+        self.assertNotIsInstance(script, LazyScript)
+        entries = os.listdir(os.path.join(folder, "cache", schema_tag()))
+        self.assertEqual(len(entries), 2)
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+from yinyang.src.core.SeedIndex import (
+    VALID,
+    TYPE_ERROR,
+    PARSE_ERROR,
+    TOO_LARGE,
+    build_index,
+    write_index,
+    load_index,
+    lookup,
+    filter_seeds,
+)
+
+sys.path.append("../../")
+
+SEEDS = {
+    "valid.smt2": """\
+(set-logic QF_LIA)
+(declare-fun x () Int)
+(assert (> x (- 1)))
+(check-sat)
+""",
+    "ill_typed.smt2": """\
+(declare-fun x () Int)
+(assert (and x true))
+(check-sat)
+""",
+    "syntax_error.smt2": "(assert ))(\n",
+    "large.smt2": "(assert true)\n" + "; padding\n" * 100,
+}
+
+
+class SeedIndexTestCase(unittest.TestCase):
+    def test_seed_index(self):
+        folder = tempfile.mkdtemp()
+        seeds = []
+        for name, content in SEEDS.items():
+            seeds.append(os.path.join(folder, name))
+            with open(seeds[-1], "w") as f:
+                f.write(content)
+
+        fn = os.path.join(folder, "seeds.index")
+        write_index(build_index(seeds, jobs=2, size_limit=500), fn)
+        index = load_index(fn)
+        status = {
+            os.path.basename(path): entry["status"]
+            for path, entry in index.items()
+        }
+        self.assertEqual(status, {
+            "valid.smt2": VALID,
+            "ill_typed.smt2": TYPE_ERROR,
+            "syntax_error.smt2": PARSE_ERROR,
+            "large.smt2": TOO_LARGE,
+        })
+        lazy_entries = build_index(seeds, size_limit=500, backend="lazy")
+        self.assertEqual(
+            [entry["status"] for entry in lazy_entries],
+            [index[entry["path"]]["status"] for entry in lazy_entries],
+        )
+        entry = index[os.path.join(folder, "valid.smt2")]
+        self.assertEqual(entry["logic"], "QF_LIA")
+        self.assertEqual(entry["terms"], 4)
+        self.assertEqual(entry["sorts"], ["Bool", "Int"])
+
+        unindexed = os.path.join(folder, "unindexed.smt2")
+        kept, num_skipped = filter_seeds(
+            seeds + [unindexed], index, 100000, "opfuzz"
+        )
+        self.assertEqual(num_skipped, 1)
+        self.assertNotIn(os.path.join(folder, "syntax_error.smt2"), kept)
+        kept, num_skipped = filter_seeds(seeds, index, 100, "typefuzz")
+        self.assertEqual(
+            [os.path.basename(seed) for seed in kept], ["valid.smt2"]
+        )
+
+        # Entries of seeds modified after indexing are not trusted.
+        ill_typed = os.path.join(folder, "ill_typed.smt2")
+        self.assertIsNotNone(lookup(index, ill_typed))
+        with open(ill_typed, "w") as f:
+            f.write(SEEDS["valid.smt2"])
+        self.assertIsNone(lookup(index, ill_typed))
+        kept, _ = filter_seeds(seeds, index, 100, "typefuzz")
+        self.assertEqual(
+            [os.path.basename(seed) for seed in kept],
+            ["valid.smt2", "ill_typed.smt2"],
+        )
+
+        # Same size, but a different modification time.
+        syntax_error = os.path.join(folder, "syntax_error.smt2")
+        entry = index[syntax_error]
+        os.utime(syntax_error, ns=(entry["mtime"] + 10**9,) * 2)
+        self.assertIsNone(lookup(index, syntax_error))
+        os.utime(syntax_error, ns=(entry["mtime"],) * 2)
+        self.assertIs(lookup(index, syntax_error), entry)
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,7 +23,8 @@
 import sys
 import unittest
 
-from yinyang.src.parsing.Parse import parse_file
+from yinyang.src.parsing.Ast import Const, Expr, Var
+from yinyang.src.parsing.Parse import parse_file, parse_str
 from yinyang.src.mutators.SemanticFusion.SemanticFusion import SemanticFusion
 
 sys.path.append("../../")
@@ -53,6 +54,34 @@ class SemanticFusionTestCase(unittest.TestCase):
         script2, _ = parse_file(fn2, silent=True)
         sf_sat.mutate()
 
+    def test_overlay(self):
+        formula_str = """
+(declare-const x Int)
+(declare-const y Int)
+(assert (> (+ x (let ((v x)) (* v y))) 0))
+(assert (< y 2))
+(check-sat)
+"""
+        script, _ = parse_str(formula_str)
+        before = script.__str__()
+        occs = script.free_var_occs
+        repl = Expr("-", [Const("1", type="Int"), Var("y", "Int")])
+        mutant = script.overlay([(occs[0], repl), (occs[1], Var("z", "Int"))])
+        self.assertEqual(script.__str__(), before)
+        self.assertEqual(
+            mutant.assert_cmd[0].__str__(),
+            "(assert (> (+ (- 1 y) (let ((v z)) (* v y))) 0))",
+        )
+        self.assertIs(mutant.assert_cmd[1], script.assert_cmd[1])
+        mul = script.assert_cmd[0].term.subterms[0].subterms[1].subterms[0]
+        self.assertIs(
+            mutant.assert_cmd[0].term.subterms[0].subterms[1].subterms[0], mul
+        )
+        let = mutant.assert_cmd[0].term.subterms[0].subterms[1]
+        self.assertIs(let.let_terms[0].parent, let)
+        self.assertIsNone(mutant.assert_cmd[0].term.parent)
+        self.assertEqual([occ.name for occ in mutant.free_var_occs], ["y"] * 3)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,148 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+from yinyang.src.core.Solver import Solver, OutputBuffer, stdin_cmd
+
+sys.path.append("../../")
+
+# Mock solvers, the processes spawned by the wrapper keep its output open.
+MOCK_SOLVERS = {
+    "crash": """
+import sys, time
+print("ASSERTION failure", flush=True)
+time.sleep(10)
+""",
+    "wrapper_crash": """
+import subprocess, time
+subprocess.Popen(["sleep", "10"])
+print("ASSERTION failure", flush=True)
+time.sleep(10)
+""",
+    "wrapper_hang": """
+import subprocess, time
+subprocess.Popen(["sleep", "10"])
+time.sleep(10)
+""",
+    "verbose": """
+import sys
+sys.stdout.write("sat\\n" * 100000)
+""",
+    "echo": """
+import sys
+assert len(sys.argv) == 1
+for line in sys.stdin:
+    sys.stdout.write(line)
+""",
+}
+
+
+def create_mocksolvers(folder):
+    for name, code in MOCK_SOLVERS.items():
+        fn = os.path.join(folder, name + ".py")
+        with open(fn, "w") as f:
+            f.write("#! /usr/bin/env python3\n" + code)
+        os.chmod(fn, 0o755)
+
+
+class SolverTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = tempfile.mkdtemp()
+        create_mocksolvers(cls.folder)
+        cls.formula = os.path.join(cls.folder, "formula.smt2")
+        with open(cls.formula, "w") as f:
+            f.write("(assert true)\n(check-sat)\n")
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.folder)
+
+    def solve(self, name, timeout=30, **kwargs):
+        solver = Solver(os.path.join(self.folder, name + ".py"), **kwargs)
+        start = time.monotonic()
+        result = solver.solve(self.formula, timeout)
+        return result, time.monotonic() - start
+
+    def test_kill_on_crash(self):
+        (stdout, _, code), elapsed = self.solve(
+            "crash", kill_on=["ASSERTION"]
+        )
+        self.assertIn("ASSERTION failure", stdout)
+        self.assertEqual(code, -9)
+        self.assertLess(elapsed, 5)
+
+        # The output of a killed wrapper is drained for a short time only.
+        (stdout, _, code), elapsed = self.solve(
+            "wrapper_crash", kill_on=["ASSERTION"]
+        )
+        self.assertIn("ASSERTION failure", stdout)
+        self.assertLess(elapsed, 5)
+
+    def test_timeout(self):
+        (stdout, stderr, code), elapsed = self.solve("wrapper_hang", 1)
+        self.assertEqual((stdout, stderr, code), ("", "", 137))
+        self.assertLess(elapsed, 5)
+
+    def test_output_limit(self):
+        (stdout, _, code), _ = self.solve("verbose", output_limit=1000)
+        self.assertEqual(code, 0)
+        self.assertEqual(stdout, "sat\n" * 250)
+        (stdout, _, _), _ = self.solve("verbose")
+        self.assertEqual(len(stdout), 400000)
+
+    def test_solve_formula(self):
+        solver = Solver(os.path.join(self.folder, "echo.py"))
+
+        # The formula exceeds the pipe buffers, it has to be written while
+        # the output is read.
+        formula = "(assert true)\n" * 100000 + "(check-sat)\n"
+        self.assertEqual(solver.solve_formula(formula, 30), (formula, "", 0))
+
+    def test_stdin_cmd(self):
+        self.assertEqual(
+            stdin_cmd("z3 model_validate=true"),
+            ["z3", "model_validate=true", "-in"],
+        )
+        self.assertEqual(
+            stdin_cmd("/opt/z3/bin/z3 -in"), ["/opt/z3/bin/z3", "-in"]
+        )
+        self.assertEqual(
+            stdin_cmd("cvc5  --lang smt2"), ["cvc5", "--lang", "smt2"]
+        )
+
+    def test_output_buffer(self):
+        buffer = OutputBuffer(limit=8, signatures=["ASSERTION"])
+        self.assertIsNone(buffer.append(b"sat\nASSE"))
+        self.assertEqual(buffer.append(b"RTION failure"), "ASSERTION")
+        self.assertEqual(buffer.decode(), "sat\nASSE")
+        self.assertTrue(buffer.truncated)
+
+
+if __name__ == "__main__":
+    unittest.main()
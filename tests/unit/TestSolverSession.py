@@ -0,0 +1,194 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+
+from yinyang.src.core.SolverSession import SolverSession
+
+sys.path.append("../../")
+
+# Interactive mock solver keeping a stack of assertion frames. The check-sat
+# answer is unsat iff an assertion contains false.
+MOCK_SOLVER = """
+import os, subprocess, sys, time
+frames = [[]]
+for line in iter(sys.stdin.readline, ""):
+    line = line.strip()
+    if line == "(reset)":
+        frames = [[]]
+    elif line == "(push 1)":
+        frames.append([])
+    elif line == "(pop 1)":
+        frames.pop()
+    elif line.startswith("(assert"):
+        frames[-1].append(line)
+    elif line == "(check-sat)":
+        false = any("false" in a for frame in frames for a in frame)
+        print("unsat" if false else "sat", flush=True)
+    elif line == "(get-info :pid)":
+        print("(:pid %d)" % os.getpid(), flush=True)
+    elif line.startswith("(echo"):
+        print(line[7:-2], flush=True)
+    elif line == "(hang)":
+        time.sleep(60)
+    elif line == "(crash)":
+        print("ASSERTION failure", flush=True)
+        sys.exit(134)
+    elif line == "(crash-hang)":
+        subprocess.Popen(["sleep", "10"])
+        print("ASSERTION failure", flush=True)
+        time.sleep(60)
+    elif line == "(exit)":
+        sys.exit(0)
+"""
+
+MODES = ["reset", "push"]
+
+
+class SolverSessionTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = tempfile.mkdtemp()
+        cls.solver = os.path.join(cls.folder, "session.py")
+        with open(cls.solver, "w") as f:
+            f.write("#! /usr/bin/env python3\n" + MOCK_SOLVER)
+        os.chmod(cls.solver, 0o755)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.folder)
+
+    def session(self, mode, **kwargs):
+        session = SolverSession(self.solver, mode, **kwargs)
+        self.addCleanup(session.stop)
+        return session
+
+    def pid(self, session):
+        stdout, _, code = session.solve_formula("(get-info :pid)", 30)
+        self.assertEqual(code, 0)
+        return int(stdout.split()[1][:-1])
+
+    def test_wrap(self):
+        query = self.session("reset").wrap("(check-sat)", "done")
+        self.assertEqual(query, '(reset)\n(check-sat)\n(echo "done")\n')
+        query = self.session("push").wrap("(check-sat)", "done")
+        self.assertEqual(
+            query, '(push 1)\n(check-sat)\n(pop 1)\n(echo "done")\n'
+        )
+
+    def test_sentinel(self):
+        for mode in MODES:
+            with self.subTest(mode=mode):
+                session = self.session(mode)
+                pid = self.pid(session)
+                result = session.solve_formula(
+                    "(assert false)\n(check-sat)", 30
+                )
+                self.assertEqual(result, ("unsat\n", "", 0))
+
+                # The assertions of a query do not leak into the next one
+                # and the solver keeps running.
+                result = session.solve_formula("(check-sat)\n(check-sat)", 30)
+                self.assertEqual(result, ("sat\nsat\n", "", 0))
+                self.assertEqual(self.pid(session), pid)
+
+    def test_restart_after_timeout(self):
+        for mode in MODES:
+            with self.subTest(mode=mode):
+                session = self.session(mode)
+                pid = self.pid(session)
+                start = time.monotonic()
+                result = session.solve_formula("(check-sat)\n(hang)", 1)
+                self.assertEqual(result, ("sat\n", "", 137))
+                self.assertLess(time.monotonic() - start, 5)
+                self.assertFalse(session.alive())
+                result = session.solve_formula("(check-sat)", 30)
+                self.assertEqual(result, ("sat\n", "", 0))
+                self.assertNotEqual(self.pid(session), pid)
+
+    def test_restart_after_eof(self):
+        for mode in MODES:
+            with self.subTest(mode=mode):
+                session = self.session(mode)
+                pid = self.pid(session)
+                result = session.solve_formula("(check-sat)\n(exit)", 30)
+                self.assertEqual(result, ("sat\n", "", 0))
+                new_pid = self.pid(session)
+                self.assertNotEqual(new_pid, pid)
+                stdout, _, code = session.solve_formula("(crash)", 30)
+                self.assertEqual(code, 134)
+                self.assertIn("ASSERTION failure", stdout)
+                self.assertNotEqual(self.pid(session), new_pid)
+
+    def test_recycle(self):
+        session = self.session("push", recycle=2)
+        pids = [self.pid(session) for _ in range(3)]
+        self.assertEqual(pids[0], pids[1])
+        self.assertNotEqual(pids[1], pids[2])
+
+    def test_kill_on_crash(self):
+        for mode in MODES:
+            with self.subTest(mode=mode):
+                session = self.session(mode, kill_on=["ASSERTION"])
+                start = time.monotonic()
+                stdout, _, code = session.solve_formula("(crash-hang)", 30)
+                self.assertIn("ASSERTION failure", stdout)
+                self.assertEqual(code, -9)
+                self.assertLess(time.monotonic() - start, 5)
+                result = session.solve_formula("(check-sat)", 30)
+                self.assertEqual(result, ("sat\n", "", 0))
+
+    def test_cancel(self):
+        session = self.session("reset")
+        self.pid(session)
+        timer = threading.Timer(0.5, session.cancel)
+        timer.start()
+        start = time.monotonic()
+        _, _, code = session.solve_formula("(hang)", 30)
+        timer.join()
+        self.assertEqual(code, -9)
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertTrue(session.cancelled)
+
+    def test_cancel_before_query(self):
+        session = self.session("reset")
+        pid = self.pid(session)
+        session.cancel()
+        start = time.monotonic()
+        result = session.solve_formula("(hang)", 30)
+        self.assertEqual(result, ("", "", -9))
+        self.assertLess(time.monotonic() - start, 5)
+
+        # The session stays cancelled until the flag is cleared.
+        self.assertEqual(session.solve_formula("(hang)", 30)[2], -9)
+        session.cancelled = False
+        self.assertEqual(self.pid(session), pid)
+
+
+if __name__ == "__main__":
+    unittest.main()
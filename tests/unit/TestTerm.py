@@ -24,7 +24,7 @@ import sys
 import unittest
 
 from yinyang.src.parsing.Parse import parse_str
-from yinyang.src.parsing.Ast import Const, Var, Expr
+from yinyang.src.parsing.Ast import Const, Var, Expr, TermTable, UndoLog
 
 sys.path.append("../../")
 
@@ -196,6 +196,65 @@ class TermTestCase(unittest.TestCase):
         free_vars_let()
         free_vars_let2()
 
+    def test_term_table(self):
+        formula = """\
+(declare-const x Int)
+(declare-const y Int)
+(assert (= (+ x y) (+ x y)))
+(assert (= (+ x y) (+ y x)))
+"""
+        script, _ = parse_str(formula)
+        eq1, eq2 = script.commands[2].term, script.commands[3].term
+        table = TermTable()
+        self.assertTrue(table.equal(eq1.subterms[0], eq1.subterms[1]))
+        self.assertFalse(table.equal(eq2.subterms[0], eq2.subterms[1]))
+        self.assertEqual(
+            table.hash(eq1.subterms[0]), table.hash(eq2.subterms[0])
+        )
+        self.assertEqual(
+            TermTable().hash(eq1.subterms[0]), table.hash(eq2.subterms[0])
+        )
+
+        # Terms are mutable and hence hashed through a table only.
+        with self.assertRaises(TypeError):
+            hash(eq1)
+        self.assertEqual(len(set(table.intern(t) for t in eq2.subterms)), 2)
+
+        occs = []
+        eq1.find_all(Var("x", "Int"), occs, TermTable())
+        self.assertEqual(occs.__str__(), "[x:Int, x:Int]")
+        eq1.substitute(eq1.subterms[0], Var("z", "Int"), TermTable())
+        self.assertEqual(eq1.__str__(), "(= z z)")
+
+    def test_undo_log(self):
+        formula = """\
+(declare-const x Int)
+(declare-const y Int)
+(assert (= (+ x y) (- x y)))
+"""
+        script, _ = parse_str(formula)
+        eq = script.commands[2].term
+        plus, minus = eq.subterms
+        log = UndoLog()
+        eq.substitute(Var("x", "Int"), Expr("*", [Var("y", "Int")]), None, log)
+        self.assertEqual(eq.__str__(), "(= (+ (* y) y) (- (* y) y))")
+        mark = len(log)
+        log.set(plus, "op", "-")
+        log.set(minus, "op", "+")
+        self.assertEqual(eq.__str__(), "(= (- (* y) y) (+ (* y) y))")
+        log.rollback(mark)
+        self.assertEqual(eq.__str__(), "(= (+ (* y) y) (- (* y) y))")
+        log.rollback()
+        self.assertEqual(eq.__str__(), "(= (+ x y) (- x y))")
+        self.assertIs(eq.subterms[0], plus)
+        self.assertIs(plus.subterms[0].parent, plus)
+        self.assertEqual(len(log), 0)
+
+        log.set(plus, "op", "*")
+        log.commit()
+        log.rollback()
+        self.assertEqual(plus.__str__(), "(* x y)")
+
 
 if __name__ == "__main__":
     TermTestCase().test_term()
@@ -0,0 +1,86 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import sys
+import unittest
+
+from yinyang.src.parsing.Parse import parse_str
+from yinyang.src.parsing.Typechecker import typecheck
+from yinyang.src.parsing.Traversal import preorder, postorder, evaluate
+from yinyang.src.mutators.GenTypeAwareMutation.Util import get_all_subterms
+
+sys.path.append("../../")
+
+
+class TraversalTestCase(unittest.TestCase):
+    def test_orders(self):
+        formula = """\
+(declare-fun x () Int)
+(assert (> (+ x 1) (- x)))
+"""
+        script, _ = parse_str(formula)
+        term = script.assert_cmd[0].term
+        self.assertEqual(
+            [t.__str__() for t in preorder(term)],
+            ["(> (+ x 1) (- x))", "(+ x 1)", "x", "1", "(- x)", "x"],
+        )
+        self.assertEqual(
+            [t.__str__() for t in postorder(term)],
+            ["x", "1", "(+ x 1)", "x", "(- x)", "(> (+ x 1) (- x))"],
+        )
+
+    def test_evaluate(self):
+        def depth(n):
+            if n == 0:
+                return 0
+            return 1 + (yield n - 1)
+
+        self.assertEqual(evaluate(100000, depth), 100000)
+
+        def fail(n):
+            if n == 0:
+                raise ValueError()
+            return (yield n - 1)
+
+        self.assertRaises(ValueError, evaluate, 100000, fail)
+
+    def test_deep_term(self):
+        depth = 20000
+        formula = (
+            "(declare-fun x () Int)\n(assert (> x "
+            + "(+ 1 " * depth + "x" + ")" * depth + "))\n"
+        )
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(1000)
+        try:
+            script, globs = parse_str(formula)
+            typecheck(script, globs)
+            av_expr, _ = get_all_subterms(script)
+            printed = script.__str__()
+        finally:
+            sys.setrecursionlimit(limit)
+        self.assertEqual(len(av_expr), 2 * depth + 3)
+        self.assertEqual(printed.count("(+ 1"), depth)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -48,8 +48,52 @@ class TypeAwareOpMutationTestCase(unittest.TestCase):
         args.modulo = 2
 
         script, _ = parse_file(formulafile, silent=True)
+        seed = script.__str__()
         mutator = TypeAwareOpMutation(script, args)
         mutator.mutate()
+        for _ in range(10):
+            mutator.mutate()
+        mutator.undo_log.rollback()
+        self.assertEqual(script.__str__(), seed)
+
+    def test_replacement_index(self):
+        formula = """
+(declare-fun x () Int)
+(declare-fun y () Int)
+(declare-fun f (Int) Int)
+(assert (exists ((z Int)) (> (- x) (+ x y z))))
+(assert (= (f x) (mod x y)))
+"""
+        args = Mockargs()
+        args.config = "yinyang/config/operator_mutations.txt"
+        args.modulo = 1
+        script, _ = parse_str(formula)
+        mutator = TypeAwareOpMutation(script, args)
+
+        # Unary minus only matches the class "abs,-" with arity 1.
+        self.assertEqual(mutator.replacements[("-", 1)], ("abs",))
+        self.assertEqual(mutator.replacements[("-", 3)], ("+", "*"))
+        self.assertEqual(mutator.replacements[("=", 2)], ("distinct",))
+
+        # The application of f has no replacement.
+        ops = [occ.op for occ in mutator.candidates]
+        self.assertEqual(len(mutator.candidates), 6)
+        self.assertNotIn("f", [str(op) for op in ops])
+
+        for _ in range(20):
+            _, success, _ = mutator.mutate()
+            self.assertTrue(success)
+
+        # Quantifiers are mutated.
+        script, _ = parse_str(
+            "(declare-fun x () Int)(assert (exists ((z Int)) (= z x)))"
+        )
+        mutator = TypeAwareOpMutation(script, args)
+        for _ in range(100):
+            mutator.mutate()
+            if "forall" in script.__str__():
+                break
+        self.assertIn("(forall ((z Int))", script.__str__())
 
 
 if __name__ == "__main__":
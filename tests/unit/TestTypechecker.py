@@ -27,7 +27,7 @@ import pathlib
 sys.path.append("../../")
 
 from yinyang.src.parsing.Ast import (
-    Assert,
+    Assert, Const, Expr, Var
 )
 from yinyang.src.parsing.Parse import (
     parse_str, parse_file
@@ -37,10 +37,14 @@ from yinyang.src.parsing.Types import (
     UNKNOWN,
     BOOLEAN_TYPE,
     INTEGER_TYPE,
+    REAL_TYPE,
     STRING_TYPE,
 )
 
-from yinyang.src.parsing.Typechecker import Context, typecheck_expr, typecheck
+from yinyang.src.parsing.Typechecker import (
+    Context, typecheck_expr, typecheck, retypecheck, resolve_op,
+    TypeCheckError
+)
 
 
 def check_type(expr):
@@ -141,6 +145,35 @@ class TypecheckerTestCase(unittest.TestCase):
         ctxt = Context(globals, {})
         self.assertEqual(typecheck_expr(greater, ctxt), BOOLEAN_TYPE)
 
+    def test_typecheck_int_real_conversions(self):
+        formula_str = """
+(declare-const i Int)
+(declare-const r Real)
+(declare-const s String)
+(assert (= (to_real i) r))
+(assert (= (to_int r) i))
+(assert (is_int r))
+(assert (is_int i))
+(check-sat)
+"""
+        formula, globals = parse_str(formula_str)
+        ctxt = Context(globals, {})
+        to_real, to_int = [
+            formula.commands[i].term.subterms[0] for i in [3, 4]
+        ]
+        self.assertEqual(typecheck_expr(to_real, ctxt), REAL_TYPE)
+        self.assertEqual(typecheck_expr(to_int, ctxt), INTEGER_TYPE)
+        for i in [5, 6]:
+            is_int = formula.commands[i].term
+            self.assertEqual(typecheck_expr(is_int, ctxt), BOOLEAN_TYPE)
+
+        for term in ["(to_real s)", "(to_int s)", "(is_int s)"]:
+            formula, globals = parse_str(
+                "(declare-const s String)\n(assert (= %s %s))" % (term, term)
+            )
+            with self.assertRaises(TypeCheckError):
+                typecheck(formula, globals)
+
     def test_typecheck_string_ops(self):
         formula_str = """
 (assert (distinct (str.replace_all "B" "A" "") "B"))
@@ -185,6 +218,62 @@ class TypecheckerTestCase(unittest.TestCase):
         oracle(formula)
         self.assertEqual(oracle(formula), True)
 
+    def test_resolve_op(self):
+        formula_str = """
+(declare-const x Int)
+(declare-fun f (Int) Int)
+(assert (> (abs (- x)) (- (f x) 1)))
+(check-sat)
+"""
+        formula, glob = parse_str(formula_str)
+        typecheck(formula, glob)
+        gt = formula.commands[2].term
+        self.assertEqual(gt.subterms[0].type, INTEGER_TYPE)
+        self.assertEqual(gt.subterms[1].subterms[0].type, INTEGER_TYPE)
+        self.assertIs(
+            resolve_op("(_ extract 3 0)"), resolve_op("(_ zero_extend 2)")
+        )
+        self.assertIsNot(
+            resolve_op("(_ to_fp 8 24)"), resolve_op("(_ to_fp_unsigned 8 24)")
+        )
+        self.assertIsNone(resolve_op("f"))
+
+    def test_retypecheck(self):
+        formula_str = """
+(declare-const x Int)
+(declare-const r Real)
+(declare-const s String)
+(assert (let ((y (+ x 1))) (> (* y 2) (- x))))
+(check-sat)
+"""
+        formula, glob = parse_str(formula_str)
+        ctxt = typecheck(formula, glob)
+        let = formula.commands[3].term
+        mul = let.subterms[0].subterms[0]
+        y = mul.subterms[0]
+
+        # y is bound by the let, which is only seen by retyping the path.
+        three = Const("3", type=INTEGER_TYPE)
+        y.substitute(y, Expr(op="+", subterms=[Var("y", None), three]))
+        self.assertEqual(retypecheck(y, ctxt), BOOLEAN_TYPE)
+        self.assertEqual(y.type, INTEGER_TYPE)
+        self.assertEqual(y.subterms[0].type, INTEGER_TYPE)
+        self.assertEqual(mul.type, INTEGER_TYPE)
+
+        bound = let.let_terms[0]
+        self.assertIs(bound.parent, let)
+        one = bound.subterms[1]
+        one.substitute(one, Var("s", STRING_TYPE))
+        with self.assertRaises(TypeCheckError):
+            retypecheck(one, ctxt)
+
+        one.substitute(one, Var("r", REAL_TYPE))
+        minus = let.subterms[0].subterms[1]
+        minus.substitute(minus, Var("s", STRING_TYPE))
+        self.assertEqual(retypecheck(one, ctxt), BOOLEAN_TYPE)
+        with self.assertRaises(TypeCheckError):
+            retypecheck(minus, ctxt)
+
 
 if __name__ == "__main__":
     TypecheckerTestCase.test_typechecker()
@@ -140,6 +140,40 @@ options:
     -m <vars>, --multiple-variables <vars>
             try to fuse at least vars variables, if possible, distributing
             the variables evenly as possible between the seeds (default: 2)
+    -j <N>, --jobs <N>
+            number of worker processes fuzzing seeds in parallel (default: 1)
+    --concurrent-solvers
+            run all solvers on a mutant at the same time instead of one
+            after another
+    --pipe-mutants
+            pass the mutants to the solvers over stdin instead of writing
+            them to the scratch folder (bug triggers are still stored)
+    --sessions {reset,push}
+            keep the solvers running in interactive mode and separate the
+            mutants by (reset) or by (push 1)/(pop 1)
+    --session-recycle <N>
+            restart the solver sessions every N mutants (default: 0, never)
+    --seed-cache path_to_folder
+            cache the parsed seeds in this folder to skip parsing them in
+            later runs (default: disabled)
+    --seed-index path_to_file
+            skip the seeds that the seed index (see bin/prepare-seeds) marks
+            as invalid or too large without reading them (default: disabled)
+    --parse-timeout secs
+            time limit for parsing a seed (default: 30)
+    --parse-memory-limit num_bytes
+            memory limit for parsing a seed (default: 4294967296)
+    --parser-backend {fast,lazy,antlr}
+            parser used for the seeds: "fast" is the hand-written parser,
+            "lazy" parses the asserts of a seed only when they are accessed,
+            i.e., outside of the parse timeout and memory limit, "antlr" is
+            the ANTLR parser (default: fast)
+    --kill-on-crash
+            kill a solver shortly after a crash message from the crash list
+            occurred in its output instead of waiting for it to terminate
+    --output-limit num_bytes
+            maximal number of bytes of a solver's stdout and stderr that are
+            kept, the rest is dropped (default: 16777216)
     -k, --keep-mutants          do not delete scratch file
     -n, --no-log                disable logging
     -q, --quiet                 do not print statistics and other output
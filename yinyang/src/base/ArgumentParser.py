@@ -22,6 +22,7 @@
 
 import sys
 import argparse
+import multiprocessing
 
 from yinyang.src.base.Exitcodes import ERR_USAGE
 from yinyang.src.base.Version import VERSION, COMMIT
@@ -106,6 +107,71 @@ def add_common_args(parser, rootpath, current_dir):
         default=100000,
         type=int,
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        metavar="<N>",
+        default=1,
+        type=int,
+    )
+    parser.add_argument(
+        "--concurrent-solvers",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--pipe-mutants",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--sessions",
+        metavar="{reset,push}",
+        choices=["reset", "push"],
+        default=None,
+    )
+    parser.add_argument(
+        "--session-recycle",
+        metavar="<N>",
+        default=0,
+        type=int,
+    )
+    parser.add_argument(
+        "--seed-cache",
+        metavar="path_to_folder",
+        default=None,
+    )
+    parser.add_argument(
+        "--seed-index",
+        metavar="path_to_file",
+        default=None,
+    )
+    parser.add_argument(
+        "--parse-timeout",
+        metavar="secs",
+        default=30,
+        type=int,
+    )
+    parser.add_argument(
+        "--parse-memory-limit",
+        metavar="num_bytes",
+        default=4294967296,
+        type=int,
+    )
+    parser.add_argument(
+        "--parser-backend",
+        metavar="{fast,lazy,antlr}",
+        choices=["fast", "lazy", "antlr"],
+        default="fast",
+    )
+    parser.add_argument(
+        "--kill-on-crash",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--output-limit",
+        metavar="num_bytes",
+        default=16777216,
+        type=int,
+    )
 
 def add_dafnyfuzz_args(parser, rootpath, current_dir):
     parser.add_argument(
@@ -142,6 +208,12 @@ def add_opfuzz_args(parser, rootpath, current_dir):
         metavar="<N>",
         type=int,
     )
+    parser.add_argument(
+        "--mutation-mode",
+        metavar="{accumulate,fresh}",
+        choices=["accumulate", "fresh"],
+        default="accumulate",
+    )
     parser.add_argument(
         "-v",
         "--version",
@@ -171,6 +243,12 @@ def add_typefuzz_args(parser, rootpath, current_dir):
         metavar="<N>",
         type=int,
     )
+    parser.add_argument(
+        "--mutation-mode",
+        metavar="{accumulate,fresh}",
+        choices=["accumulate", "fresh"],
+        default="accumulate",
+    )
     parser.add_argument(
         "-v",
         "--version",
@@ -284,3 +362,69 @@ def build_yinyang_parser(current_dir, usage):
     add_yinyang_args(parser, ROOTPATH, current_dir)
 
     return parser
+
+
+def build_prepare_seeds_parser(current_dir):
+    parser = ArgumentParser(
+        prog="prepare-seeds",
+        description="Parse and typecheck SMT-LIB seeds in parallel and "
+        "write an index of the seeds. The fuzzers skip the seeds that the "
+        "index marks as unusable with --seed-index.",
+    )
+    parser.add_argument(
+        "PATH_TO_SEEDS",
+        nargs="+",
+        metavar="seed_file/seed_folder",
+    )
+    parser.add_argument(
+        "-o",
+        "--index",
+        metavar="path_to_file",
+        default=current_dir + "/seeds.index",
+        help="index file (default: ./seeds.index)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        metavar="<N>",
+        default=multiprocessing.cpu_count(),
+        type=int,
+        help="number of worker processes (default: number of cores)",
+    )
+    parser.add_argument(
+        "-L",
+        "--file-size-limit",
+        metavar="num_bytes",
+        default=None,
+        type=int,
+        help="do not parse seeds of this size or larger (default: no limit)",
+    )
+    parser.add_argument(
+        "-T",
+        "--parse-timeout",
+        metavar="secs",
+        default=30,
+        type=int,
+        help="parse timeout per seed (default: 30)",
+    )
+    parser.add_argument(
+        "--parse-memory-limit",
+        metavar="num_bytes",
+        default=4294967296,
+        type=int,
+        help="memory limit of the parser per seed (default: 4294967296)",
+    )
+    parser.add_argument(
+        "--parser-backend",
+        metavar="{fast,lazy,antlr}",
+        choices=["fast", "lazy", "antlr"],
+        default="fast",
+        help="parser used for the seeds (default: fast)",
+    )
+    parser.add_argument(
+        "--seed-cache",
+        metavar="path_to_folder",
+        default=None,
+        help="add the parsed seeds to this seed cache (default: disabled)",
+    )
+    return parser
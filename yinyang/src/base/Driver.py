@@ -24,6 +24,7 @@ import os
 import sys
 from pathlib import Path
 from yinyang.src.base.Exitcodes import ERR_USAGE, ERR_EXHAUSTED_DISK
+from yinyang.src.core.SeedIndex import load_index
 
 path = Path(__file__)
 rootpath = str(path.parent.absolute().parent)
@@ -59,6 +60,38 @@ def check_iterations():
         exit(ERR_USAGE)
 
 
+def check_jobs():
+    if args.jobs <= 0:
+        print("error: jobs should not be a negative number or zero",
+              flush=True)
+        exit(ERR_USAGE)
+
+
+def check_output_limit():
+    if args.output_limit <= 0:
+        print("error: output limit should not be a negative number or zero",
+              flush=True)
+        exit(ERR_USAGE)
+
+
+def check_parse_limits():
+    if args.parse_timeout <= 0:
+        print("error: parse timeout should not be a negative number or zero",
+              flush=True)
+        exit(ERR_USAGE)
+    if args.parse_memory_limit <= 0:
+        print("error: parse memory limit should not be a negative number or "
+              "zero", flush=True)
+        exit(ERR_USAGE)
+
+
+def check_session_recycle():
+    if args.session_recycle < 0:
+        print("error: session recycle should not be a negative number",
+              flush=True)
+        exit(ERR_USAGE)
+
+
 def create_bug_folder():
     if not os.path.isdir(args.bugsfolder):
         try:
@@ -86,9 +119,13 @@ def create_scratch_folder():
             exit(ERR_EXHAUSTED_DISK)
 
 
-def get_seeds():
+def collect_seeds(paths):
+    """
+    :returns: list of the seed files and the .smt2 files in the seed folders
+              of paths
+    """
     temp_seeds = []
-    for path in args.PATH_TO_SEEDS:
+    for path in paths:
         if not os.path.exists(path):
             print('error: folder/file "%s" does not exist' % (path),
                   flush=True)
@@ -104,8 +141,22 @@ def get_seeds():
         else:
             print("error: %s is neither a file nor a directory", flush=True)
             exit(ERR_USAGE)
+    return temp_seeds
 
-    args.PATH_TO_SEEDS = temp_seeds
+
+def get_seeds():
+    args.PATH_TO_SEEDS = collect_seeds(args.PATH_TO_SEEDS)
+
+
+def check_seed_index():
+    if args.seed_index is None:
+        return
+    try:
+        load_index(args.seed_index)
+    except Exception:
+        print('error: "%s" is not a valid seed index (rebuild it with '
+              'bin/prepare-seeds)' % args.seed_index, flush=True)
+        exit(ERR_USAGE)
 
 
 def check_opfuzz():
@@ -140,6 +191,11 @@ def run_checks(parser, strategy):
     check_solver_clis()
     check_timeout()
     check_iterations()
+    check_jobs()
+    check_session_recycle()
+    check_output_limit()
+    check_parse_limits()
+    check_seed_index()
     create_bug_folder()
     create_log_folder()
     create_scratch_folder()
@@ -0,0 +1,126 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import re
+
+
+def trie_regex(patterns):
+    """
+    Compile a list of plain-string patterns into a regular expression
+    matching any of them. The patterns are factored by common prefixes (i.e.,
+    the expression has the shape of a trie), so that matching at a position
+    costs at most one pass over the longest pattern, instead of one attempt
+    per pattern. At a given position, the longest matching pattern wins.
+    """
+    trie = {}
+    for pattern in patterns:
+        node = trie
+        for char in pattern:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node):
+        alternatives = [
+            re.escape(char) + build(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not alternatives:
+            return ""
+        if len(alternatives) == 1 and "" not in node:
+            return alternatives[0]
+        regex = "(?:" + "|".join(alternatives) + ")"
+        if "" in node:
+            regex += "?"
+        return regex
+
+    return build(trie)
+
+
+class PatternMatcher:
+    """
+    Matches solver outputs against several named lists of plain-string
+    patterns (e.g., crash list, duplicate list and ignore list) at once. All
+    lists are compiled into a single regular expression, so that an output is
+    classified in one pass instead of one substring search per pattern.
+
+    The expression is wrapped into a lookahead, i.e., the scan reports every
+    position at which a pattern occurs, including overlapping occurrences.
+    Other patterns occurring at the same position are prefixes of the
+    reported (longest) one and hence their categories are known in advance.
+
+    :lists: category name mapped to a list of patterns
+    """
+
+    def __init__(self, **lists):
+        self.categories = list(lists)
+        patterns = {}
+        for category, lst in lists.items():
+            for pattern in lst:
+                if pattern:
+                    patterns.setdefault(pattern, []).append(category)
+
+        # Pattern mapped to the (category, pattern) pairs of all patterns
+        # occurring with it, i.e., its prefixes including itself.
+        self.implied = {}
+        for pattern in patterns:
+            self.implied[pattern] = [
+                (category, prefix)
+                for prefix, categories in patterns.items()
+                if pattern.startswith(prefix)
+                for category in categories
+            ]
+
+        self.regex = None
+        if patterns:
+            self.regex = re.compile("(?=(" + trie_regex(patterns) + "))")
+
+    def classify(self, *outputs):
+        """
+        Match the outputs (str), e.g., stdout and stderr of a solver call,
+        against all lists.
+
+        :returns: dict mapping each category with a pattern occurring in the
+                  outputs to the first such pattern
+        """
+        matches = {}
+        if not self.regex:
+            return matches
+        for output in outputs:
+            for match in self.regex.finditer(output):
+                for category, pattern in self.implied[match.group(1)]:
+                    if category not in matches:
+                        matches[category] = pattern
+                if len(matches) == len(self.categories):
+                    return matches
+        return matches
+
+    def search(self, output):
+        """
+        :returns: the first pattern occurring in output (str) or None
+        """
+        if not self.regex:
+            return None
+        match = self.regex.search(output)
+        if not match:
+            return None
+        return match.group(1)
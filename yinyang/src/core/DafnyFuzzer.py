@@ -36,7 +36,6 @@ from yinyang.src.core.Dafny import Dafny
 from yinyang.src.core.Statistic import Statistic
 from yinyang.src.core.Solver import Solver, SolverQueryResult, SolverResult
 
-from yinyang.src.parsing.Parse import parse_file
 from yinyang.src.parsing.Typechecker import typecheck
 
 from yinyang.src.mutators.TypeAwareOpMutation import TypeAwareOpMutation
@@ -91,7 +90,7 @@ class DafnyFuzzer(Fuzzer):
             return None, None
 
         self.currentseeds.append(pathlib.Path(seed).stem)
-        script, glob = parse_file(seed, silent=True)
+        script, glob = self.parse_service.parse_file(seed, silent=True)
 
         if not script:
 
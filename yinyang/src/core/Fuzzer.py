@@ -21,19 +21,26 @@
 # SOFTWARE.
 
 import os
-import re
 import copy
 import time
+import queue
 import shutil
 import random
 import signal
 import logging
 import pathlib
+import traceback
+import multiprocessing
+
+from concurrent.futures import ThreadPoolExecutor, wait
 
 from yinyang.src.core.Statistic import Statistic
 from yinyang.src.core.Solver import Solver, SolverQueryResult, SolverResult
+from yinyang.src.core.SolverSession import SolverSession
 
-from yinyang.src.parsing.Parse import parse_file
+from yinyang.src.parsing.ParseService import ParseService
+from yinyang.src.parsing.Printer import write_script, script_to_str
+from yinyang.src.parsing.SeedCache import SeedCache
 from yinyang.src.parsing.Typechecker import typecheck
 
 from yinyang.src.mutators.TypeAwareOpMutation import TypeAwareOpMutation
@@ -67,16 +74,17 @@ from yinyang.src.core.FuzzerUtil import (
     grep_result,
     admissible_seed_size,
     in_crash_list,
-    in_duplicate_list,
-    in_ignore_list,
+    classify_output,
     init_oracle,
+    is_segfault,
+    crash_list,
 )
 
 MAX_TIMEOUTS = 32
 
 
 class Fuzzer:
-    def __init__(self, args, strategy):
+    def __init__(self, args, strategy, name=None, is_worker=False):
         self.args = args
         self.currentseeds = []
         self.strategy = strategy
@@ -85,8 +93,21 @@ class Fuzzer:
         self.old_time = time.time()
         self.start_time = time.time()
         self.first_status_bar_printed = False
-        self.name = random_string()
+        self.name = name if name else random_string()
+        self.is_worker = is_worker
         self.timeout_of_current_seed = 0
+        self.executor = None
+        self.sessions = {}
+        self.parse_service = ParseService(
+            self.args.parse_timeout,
+            self.args.parse_memory_limit,
+            self.args.parser_backend,
+        )
+        self.seed_cache = None
+        if self.args.seed_cache:
+            self.seed_cache = SeedCache(
+                self.args.seed_cache, self.parse_service
+            )
 
         init_logging(strategy, self.args.quiet, self.name, args)
 
@@ -97,7 +118,10 @@ class Fuzzer:
             return None, None
 
         self.currentseeds.append(pathlib.Path(seed).stem)
-        script, glob = parse_file(seed, silent=True)
+        if self.seed_cache:
+            script, glob = self.seed_cache.parse_file(seed, silent=True)
+        else:
+            script, glob = self.parse_service.parse_file(seed, silent=True)
 
         if not script:
 
@@ -132,100 +156,334 @@ class Fuzzer:
     def run(self):
         """
         Realizes the main fuzzing loop. The procedure fetches seeds at random
-        from the seed corpus (or a pair of seeds for yinyang), instantiates a
-        mutator and then generates `self.args.iterations` many iterations per
-        seed.
+        from the seed corpus (or a pair of seeds for yinyang) and fuzzes each
+        of them with `fuzz_seed`. With `--jobs N` (N > 1), the seeds are
+        distributed among N worker processes instead (see `run_parallel`).
         """
         seeds, num_seeds = get_seeds(self.args, self.strategy)
         num_targets = len(self.args.SOLVER_CLIS)
         log_strategy_num_seeds(self.strategy, num_seeds, num_targets)
 
-        for seed in seeds:
-            if self.strategy == "typefuzz":
-                script, glob = self.get_script(seed)
-                if not script:
-                    continue
+        if self.args.jobs > 1:
+            self.run_parallel(seeds)
+        else:
+            for seed in seeds:
+                self.fuzz_seed(seed)
+        self.terminate()
+
+    def run_parallel(self, seeds):
+        """
+        Coordinator of the parallel fuzzing mode. Spawns `self.args.jobs`
+        worker processes which pull seeds (or seed pairs for yinyang) from a
+        shared bounded queue. Each worker has its own mutator state and
+        scratch file namespace and sends back its statistics after every
+        processed seed, which the coordinator merges into `self.statistic`.
+        Bug triggers are written by the workers directly to the bug folder.
+        """
+        seed_queue = multiprocessing.Queue(maxsize=2 * self.args.jobs)
+        stat_queue = multiprocessing.Queue()
+        workers = []
+        for i in range(self.args.jobs):
+            worker = multiprocessing.Process(
+                target=fuzz_worker,
+                args=(
+                    self.args,
+                    self.strategy,
+                    self.name + "-" + str(i),
+                    seed_queue,
+                    stat_queue,
+                ),
+                daemon=True,
+            )
+            worker.start()
+            workers.append(worker)
 
-                typecheck(script, glob)
-                script_cp = copy.deepcopy(script)
-                unique_expr = get_unique_subterms(script_cp)
-                self.mutator = GenTypeAwareMutation(
-                    script, self.args, unique_expr
+        try:
+            finished = 0
+            for seed in seeds:
+                finished += self.feed_worker(
+                    seed_queue, seed, stat_queue, workers
+                )
+            for _ in workers:
+                finished += self.feed_worker(
+                    seed_queue, None, stat_queue, workers
                 )
+            while finished < len(workers):
+                finished += self.collect_statistics(stat_queue, timeout=1)
+                self.check_workers(workers)
+        finally:
+
+            # On an error, the remaining workers are stopped right away.
+            for worker in workers:
+                if worker.is_alive() and finished < len(workers):
+                    worker.terminate()
+                worker.join()
+
+    def feed_worker(self, seed_queue, seed, stat_queue, workers):
+        """
+        Put a seed into the seed queue. While the queue is full, the
+        statistics sent by the workers are merged in the meantime and the
+        workers are checked for errors, as the queue stays full if they died.
 
-            elif self.strategy == "opfuzz":
-                script, _ = self.get_script(seed)
-                if not script:
-                    continue
-                self.mutator = TypeAwareOpMutation(script, self.args)
+        :returns: number of workers that finished in the meantime
+        """
+        finished = 0
+        while True:
+            try:
+                seed_queue.put(seed, timeout=1)
+                return finished + self.collect_statistics(stat_queue)
+            except queue.Full:
+                finished += self.collect_statistics(stat_queue)
+                self.check_workers(workers)
+
+    def check_workers(self, workers):
+        """
+        Raise an error if a worker terminated abnormally, e.g., it was killed
+        by the OS. Workers report errors on seeds through the statistics
+        queue (see fuzz_worker) and otherwise only terminate at the end.
+        """
+        for worker in workers:
+            if worker.exitcode not in [None, 0]:
+                raise RuntimeError(
+                    "worker %s terminated with exit code %d"
+                    % (worker.name, worker.exitcode)
+                )
 
-            elif self.strategy == "yinyang":
-                script1, _, script2, _ = self.get_script_pair(seed)
-                if not script1 or not script2:
-                    continue
-                self.mutator = SemanticFusion(script1, script2, self.args)
+    def collect_statistics(self, stat_queue, timeout=None):
+        """
+        Merge all statistics currently available in stat_queue into
+        `self.statistic` and print the status bar.
 
+        :returns: number of workers that reported to be finished
+        """
+        finished = 0
+        block = timeout is not None
+        while True:
+            try:
+                statistic = stat_queue.get(block=block, timeout=timeout)
+            except queue.Empty:
+                break
+            block = False
+            if statistic is None:
+                finished += 1
+            elif isinstance(statistic, WorkerError):
+                raise statistic
             else:
-                assert False
-
-            log_generation_attempt(self.args)
-
-            unsuccessful_gens = 0
-            successful_gens = 0
-            self.timeout_of_current_seed = 0
-            for i in range(self.args.iterations):
-                self.print_stats()
-                mutant, success, skip_seed = self.mutator.mutate()
-
-                # Reason for unsuccessful generation: randomness in the
-                # mutator to more efficiently generate mutants.
-                if not success:
-                    self.statistic.unsuccessful_generations += 1
-                    unsuccessful_gens += 1
-                    continue  # Go to next iteration.
-
-                successful_gens += 1
-
-                # Reason for mutator to skip a seed: no random components, i.e.
-                # mutant would be the same for all  iterations and hence just
-                # waste time.
-                if skip_seed:
-                    log_skip_seed_mutator(self.args, i)
-                    break  # Continue to next seed.
-
-                (mutate_further, scratchfile) = self.test(mutant, i + 1)
-                if not mutate_further:  # Continue to next seed.
-                    log_skip_seed_test(self.args, i)
-                    break  # Continue to next seed.
-
-                self.statistic.mutants += 1
-                if not self.args.keep_mutants:
-                    os.remove(scratchfile)
-
-            log_finished_generations(successful_gens, unsuccessful_gens)
-        self.terminate()
+                self.statistic.merge(statistic)
+        self.print_stats()
+        return finished
+
+    def fuzz_seed(self, seed):
+        """
+        Instantiates a mutator for the seed (or the pair of seeds for yinyang)
+        and then generates `self.args.iterations` many iterations.
+        """
+        if self.strategy == "typefuzz":
+            script, glob = self.get_script(seed)
+            if not script:
+                return
+
+            ctxt = typecheck(script, glob)
+            script_cp = copy.deepcopy(script)
+            unique_expr = get_unique_subterms(script_cp)
+            self.mutator = GenTypeAwareMutation(
+                script, self.args, unique_expr, ctxt
+            )
+
+        elif self.strategy == "opfuzz":
+            script, _ = self.get_script(seed)
+            if not script:
+                return
+            self.mutator = TypeAwareOpMutation(script, self.args)
+
+        elif self.strategy == "yinyang":
+            script1, _, script2, _ = self.get_script_pair(seed)
+            if not script1 or not script2:
+                return
+            self.mutator = SemanticFusion(script1, script2, self.args)
+
+        else:
+            assert False
+
+        log_generation_attempt(self.args)
+
+        unsuccessful_gens = 0
+        successful_gens = 0
+        self.timeout_of_current_seed = 0
+        for i in range(self.args.iterations):
+            self.print_stats()
+
+            # The in-place mutators log their edits, in fresh mode they are
+            # undone to mutate the seed again.
+            if self.strategy in ["opfuzz", "typefuzz"]:
+                if self.args.mutation_mode == "fresh":
+                    self.mutator.undo_log.rollback()
+                else:
+                    self.mutator.undo_log.commit()
+            mutant, success, skip_seed = self.mutator.mutate()
+
+            # Reason for unsuccessful generation: randomness in the
+            # mutator to more efficiently generate mutants.
+            if not success:
+                self.statistic.unsuccessful_generations += 1
+                unsuccessful_gens += 1
+                continue  # Go to next iteration.
+
+            successful_gens += 1
+
+            # Reason for mutator to skip a seed: no random components, i.e.
+            # mutant would be the same for all  iterations and hence just
+            # waste time.
+            if skip_seed:
+                log_skip_seed_mutator(self.args, i)
+                break  # Continue to next seed.
+
+            (mutate_further, scratchfile) = self.test(mutant, i + 1)
+            if not mutate_further:  # Continue to next seed.
+                log_skip_seed_test(self.args, i)
+                break  # Continue to next seed.
+
+            self.statistic.mutants += 1
+            if scratchfile and not self.args.keep_mutants:
+                os.remove(scratchfile)
+
+        log_finished_generations(successful_gens, unsuccessful_gens)
 
     def create_testbook(self, script):
         """
         Generate a "testbook" for script and solver configs.
 
         script:     parsed SMT-LIB script
-        :returns:   list containing with cli and testcases pairs
+        :returns:   list containing with cli and testcases pairs. The
+                    testcase is None if the formula is passed to the solvers
+                    over stdin and hence has not been written to a file.
         """
         testbook = []
-        testcase = "%s/%s-%s-%s.smt2" % (
-            self.args.scratchfolder,
-            escape("-".join(self.currentseeds)),
-            self.name,
-            random_string(),
-        )
-        with open(testcase, "w") as testcase_writer:
-            testcase_writer.write(script.__str__())
+        testcase = None
+        if self.args.keep_mutants or not (
+            self.args.pipe_mutants or self.args.sessions
+        ):
+            testcase = "%s/%s-%s-%s.smt2" % (
+                self.args.scratchfolder,
+                escape("-".join(self.currentseeds)),
+                self.name,
+                random_string(),
+            )
+            with open(testcase, "w") as testcase_writer:
+                write_script(script, testcase_writer)
 
         for cli in self.args.SOLVER_CLIS:
             testbook.append((cli, testcase))
         return testbook
 
+    def get_solver(self, solver_cli):
+        """
+        :returns: the persistent solver session for solver_cli with
+                  `--sessions` and a fresh Solver object otherwise. With
+                  `--kill-on-crash`, the solver is killed as soon as an entry
+                  of the crash list occurs in its output.
+        """
+        kill_on = crash_list if self.args.kill_on_crash else None
+        if not self.args.sessions:
+            return Solver(solver_cli, kill_on, self.args.output_limit)
+        if solver_cli not in self.sessions:
+            self.sessions[solver_cli] = SolverSession(
+                solver_cli,
+                self.args.sessions,
+                self.args.session_recycle,
+                kill_on,
+                self.args.output_limit,
+            )
+        return self.sessions[solver_cli]
+
+    def stop_sessions(self):
+        for session in self.sessions.values():
+            session.stop()
+        self.sessions = {}
+
+    def solve(self, solver, testcase, formula):
+        """
+        Run the solver on a mutant. The mutant is passed over stdin if it has
+        not been written to a scratch file or if a solver session is used.
+        """
+        if testcase and not self.args.sessions:
+            return solver.solve(testcase, self.args.timeout)
+        return solver.solve_formula(formula, self.args.timeout)
+
+    def run_testbook(self, testbook, formula):
+        """
+        Run the solvers on the testcases of the testbook. Solvers are called
+        one after another, unless `--concurrent-solvers` is set.
+
+        :returns: generator of (cli, testcase, stdout, stderr, exitcode)
+                  tuples in the order of the testbook
+        """
+        if self.args.concurrent_solvers and len(testbook) > 1:
+            yield from self.run_testbook_concurrently(testbook, formula)
+            return
+
+        for solver_cli, testcase in testbook:
+            solver = self.get_solver(solver_cli)
+            self.statistic.solver_calls += 1
+            stdout, stderr, exitcode = self.solve(solver, testcase, formula)
+            yield solver_cli, testcase, stdout, stderr, exitcode
+
+    def run_testbook_concurrently(self, testbook, formula):
+        """
+        Launch all solvers of the testbook at once, so that testing a mutant
+        costs the runtime of the slowest solver instead of the sum of all
+        runtimes. As soon as one solver crashes, the other solvers still
+        running on the mutant are cancelled, as testing stops on a crash
+        anyway. Results of cancelled solvers are left out.
+
+        :returns: generator of (cli, testcase, stdout, stderr, exitcode)
+                  tuples in the order of the testbook
+        """
+        if not self.executor:
+            self.executor = ThreadPoolExecutor(
+                max_workers=len(self.args.SOLVER_CLIS)
+            )
+        solvers = [self.get_solver(solver_cli) for solver_cli, _ in testbook]
+
+        # Solver sessions stay cancelled from the previous mutant, a solver
+        # may be cancelled before its thread got to run it on this one.
+        for solver in solvers:
+            solver.cancelled = False
+
+        def cancel_on_crash(future):
+            if future.cancelled() or future.exception():
+                return
+            stdout, stderr, exitcode = future.result()
+            if in_crash_list(stdout, stderr) or is_segfault(exitcode):
+                for solver in solvers:
+                    solver.cancel()
+
+        futures = []
+        for solver, (_, testcase) in zip(solvers, testbook):
+            self.statistic.solver_calls += 1
+            future = self.executor.submit(
+                self.solve, solver, testcase, formula
+            )
+            future.add_done_callback(cancel_on_crash)
+            futures.append(future)
+
+        try:
+            for solver, future, testitem in zip(solvers, futures, testbook):
+                stdout, stderr, exitcode = future.result()
+                if solver.cancelled and not (
+                    in_crash_list(stdout, stderr) or is_segfault(exitcode)
+                ):
+                    continue
+                yield testitem[0], testitem[1], stdout, stderr, exitcode
+        finally:
+
+            # Testing on the mutant has stopped, the remaining solvers are not
+            # needed anymore.
+            for solver, future in zip(solvers, futures):
+                solver.cancel()
+                future.cancel()
+            wait(futures)
+
     def test(self, script, iteration):
         """
         Tests the solvers on the provided script. Checks for crashes, segfaults
@@ -246,34 +504,36 @@ class Fuzzer:
         else:
             oracle = init_oracle(self.args)
 
+        # The mutant is serialized once for all solvers it is piped to, and
+        # streamed into the scratch file otherwise.
+        formula = None
+        if self.args.pipe_mutants or self.args.sessions:
+            formula = script_to_str(script)
         testbook = self.create_testbook(script)
         reference = None
-        scratchfile = None
-        for testitem in testbook:
-            solver_cli, scratchfile = testitem[0], testitem[1]
-            solver = Solver(solver_cli)
-            self.statistic.solver_calls += 1
-            stdout, stderr, exitcode = solver.solve(
-                scratchfile, self.args.timeout
-            )
+        scratchfile = testbook[0][1]
+        for testitem in self.run_testbook(testbook, formula):
+            solver_cli, scratchfile, stdout, stderr, exitcode = testitem
 
             if self.max_timeouts_reached():
                 return (False, scratchfile)
 
-            # Match stdout and stderr against the crash list
-            # (see yinyang/config/Config.py:27) which contains various
-            # crash messages such as assertion errors, check failure,
-            # invalid models, etc.
-            if in_crash_list(stdout, stderr):
+            # Match stdout and stderr against the crash, duplicate and
+            # ignore lists (see yinyang/config/Config.py) at once.
+            matches = classify_output(stdout, stderr)
 
-                # Match stdout and stderr against the duplicate list
-                # (see yinyang/config/Config.py:51) to prevent catching
-                # duplicate bug triggers.
-                if not in_duplicate_list(stdout, stderr):
+            # The crash list contains various crash messages such as
+            # assertion errors, check failure, invalid models, etc.
+            if "crash" in matches:
+
+                # The duplicate list prevents catching duplicate bug
+                # triggers.
+                if "duplicate" not in matches:
                     self.statistic.effective_calls += 1
                     self.statistic.crashes += 1
                     path = self.report(
-                        script, "crash", solver_cli, stdout, stderr
+                        script, "crash", solver_cli, stdout, stderr,
+                        matches["crash"]
                     )
                     log_crash_trigger(path)
                 else:
@@ -283,10 +543,9 @@ class Fuzzer:
             else:
 
                 # Check whether the solver call produced errors, e.g, related
-                # to its parser, options, type-checker etc., by matching stdout
-                # and stderr against the ignore list
-                # (see yinyang/config/Config.py:54).
-                if in_ignore_list(stdout, stderr):
+                # to its parser, options, type-checker etc., i.e., whether
+                # stdout and stderr matched the ignore list.
+                if "ignore" in matches:
                     log_ignore_list_mutant(solver_cli)
                     self.statistic.invalid_mutants += 1
                     continue  # Continue to the next solver.
@@ -294,14 +553,14 @@ class Fuzzer:
                 if exitcode != 0:
 
                     # Check whether the solver crashed with a segfault.
-                    if exitcode == -signal.SIGSEGV or exitcode == 245:
+                    if is_segfault(exitcode):
                         self.statistic.effective_calls += 1
                         self.statistic.crashes += 1
                         path = self.report(
                             script, "segfault", solver_cli, stdout, stderr
                         )
                         log_segfault_trigger(self.args, path, iteration)
-                        return False  # Stop testing.
+                        return (False, scratchfile)  # Stop testing.
 
                     # Check whether the solver timed out.
                     elif exitcode == 137:
@@ -316,11 +575,8 @@ class Fuzzer:
 
                 # Check if the stdout contains a valid solver query result,
                 # i.e., contains lines with 'sat', 'unsat' or 'unknown'.
-                if (
-                    not re.search("^unsat$", stdout, flags=re.MULTILINE)
-                    and not re.search("^sat$", stdout, flags=re.MULTILINE)
-                    and not re.search("^unknown$", stdout, flags=re.MULTILINE)
-                ):
+                result = grep_result(stdout)
+                if not result.lst:
                     self.statistic.invalid_mutants += 1
                     log_invalid_mutant(self.args, iteration)
                     continue  # Continue to the next solver.
@@ -333,7 +589,6 @@ class Fuzzer:
                     # (yinyang) or with other non-erroneous solver runs
                     # (opfuzz) for soundness bugs.
                     self.statistic.effective_calls += 1
-                    result = grep_result(stdout)
                     if oracle.equals(SolverQueryResult.UNKNOWN):
 
                         # For differential testing (opfuzz), the first solver
@@ -377,7 +632,7 @@ class Fuzzer:
                         return (False, scratchfile)  # Stop testing.
         return (True, scratchfile)  # Continue to next seed.
 
-    def report(self, script, bugtype, cli, stdout, stderr):
+    def report(self, script, bugtype, cli, stdout, stderr, signature=None):
         plain_cli = plain(cli)
         # format: <solver><{crash,wrong,invalid_model}><seed>.<random-str>.smt2
         report = "%s/%s-%s-%s-%s.smt2" % (
@@ -389,7 +644,7 @@ class Fuzzer:
         )
         try:
             with open(report, "w") as report_writer:
-                report_writer.write(script.__str__())
+                write_script(script, report_writer)
         except Exception:
             logging.error("error: couldn't copy scratchfile to bugfolder.")
             exit(ERR_EXHAUSTED_DISK)
@@ -402,6 +657,8 @@ class Fuzzer:
         )
         with open(logpath, "w") as log:
             log.write("command: " + cli + "\n")
+            if signature:
+                log.write("signature: " + signature + "\n")
             log.write("stderr:\n")
             log.write(stderr)
             log.write("stdout:\n")
@@ -430,7 +687,7 @@ class Fuzzer:
         )
         try:
             with open(report, "w") as report_writer:
-                report_writer.write(script.__str__())
+                write_script(script, report_writer)
         except Exception:
             logging.error("error: couldn't copy scratchfile to bugfolder.")
             exit(ERR_EXHAUSTED_DISK)
@@ -458,6 +715,9 @@ class Fuzzer:
         return report
 
     def print_stats(self):
+        if self.is_worker:
+            return  # The coordinator prints the merged statistics.
+
         if not self.first_status_bar_printed\
            and time.time() - self.old_time >= 1:
             self.statistic.printbar(self.start_time)
@@ -469,6 +729,8 @@ class Fuzzer:
             self.old_time = time.time()
 
     def terminate(self):
+        self.stop_sessions()
+        self.parse_service.stop()
         print("All seeds processed", flush=True)
         if not self.args.quiet:
             self.statistic.printsum()
@@ -477,6 +739,65 @@ class Fuzzer:
         exit(OK_BUGS)
 
     def __del__(self):
+        self.stop_sessions()
+        self.parse_service.stop()
         for fn in os.listdir(self.args.scratchfolder):
             if self.name in fn:
                 os.remove(os.path.join(self.args.scratchfolder, fn))
+
+
+class WorkerError(Exception):
+    """
+    Error of a worker process of the parallel fuzzing mode on a seed, which
+    the worker sends to the coordinator instead of its statistics. The
+    coordinator raises it, i.e., fuzzing stops as in the sequential mode.
+    """
+
+    def __init__(self, worker, seed, trace):
+        super().__init__(worker, seed, trace)
+        self.worker = worker
+        self.seed = seed
+        self.trace = trace
+
+    def __str__(self):
+        return "worker %s failed on seed %s\n%s" % (
+            self.worker, self.seed, self.trace
+        )
+
+
+def fuzz_worker(args, strategy, name, seed_queue, stat_queue):
+    """
+    Worker process of the parallel fuzzing mode. Fuzzes the seeds from
+    seed_queue until it receives None and sends its statistics to the
+    coordinator after each seed. If fuzzing a seed fails, the error is sent
+    to the coordinator (see WorkerError) and the worker stops.
+
+    :name: name of the worker's fuzzer, prefixed by the coordinator's name,
+           so that the coordinator can clean up the worker's scratch files.
+    """
+    # The coordinator handles user interrupts.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # Forked workers inherit the random state of the coordinator, reseed to
+    # avoid generating the same mutants in every worker.
+    random.seed()
+
+    fuzzer = Fuzzer(args, strategy, name=name, is_worker=True)
+    try:
+        while True:
+            seed = seed_queue.get()
+            if seed is None:
+                break
+            try:
+                fuzzer.fuzz_seed(seed)
+            except Exception:
+                stat_queue.put(
+                    WorkerError(name, seed, traceback.format_exc())
+                )
+                return
+            stat_queue.put(fuzzer.statistic)
+            fuzzer.statistic = Statistic()
+    finally:
+        fuzzer.stop_sessions()
+        fuzzer.parse_service.stop()
+    stat_queue.put(None)
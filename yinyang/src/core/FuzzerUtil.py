@@ -21,9 +21,10 @@
 # SOFTWARE.
 import random
 import re
+import signal
 import pathlib
 
-from yinyang.src.base.Utils import in_list
+from yinyang.src.base.PatternMatcher import PatternMatcher
 
 try:
     sys.path.insert(1, os.getcwd() + "/.yinyang")
@@ -32,18 +33,43 @@ except Exception as e:
     from yinyang.config.Config import crash_list, duplicate_list, ignore_list
 
 from yinyang.src.core.Solver import SolverResult, SolverQueryResult
+from yinyang.src.core.SeedIndex import load_index, filter_seeds
+from yinyang.src.core.Logger import log_seed_index_skipped
+
+
+output_matcher = PatternMatcher(
+    crash=crash_list, duplicate=duplicate_list, ignore=ignore_list
+)
+
+
+def classify_output(stdout, stderr):
+    """
+    Match stdout and stderr of a solver call against the crash, duplicate
+    and ignore list in a single pass.
+
+    :returns: dict mapping "crash", "duplicate" and "ignore" to the first
+              matching entry of the respective list, if any
+    """
+    return output_matcher.classify(stdout, stderr)
 
 
 def in_crash_list(stdout, stderr):
-    return in_list(stdout, stderr, crash_list)
+    return "crash" in classify_output(stdout, stderr)
 
 
 def in_duplicate_list(stdout, stderr):
-    return in_list(stdout, stderr, duplicate_list)
+    return "duplicate" in classify_output(stdout, stderr)
 
 
 def in_ignore_list(stdout, stderr):
-    return in_list(stdout, stderr, ignore_list)
+    return "ignore" in classify_output(stdout, stderr)
+
+
+def is_segfault(exitcode):
+    """
+    Checks whether the exit code of a solver call indicates a segfault.
+    """
+    return exitcode == -signal.SIGSEGV or exitcode == 245
 
 
 def admissible_seed_size(seed, args):
@@ -55,28 +81,47 @@ def admissible_seed_size(seed, args):
     return seed_size_in_bytes < args.file_size_limit
 
 
+# With re.MULTILINE, $ only matches before \n, the \r of CRLF line endings
+# is skipped explicitly.
+RESULT_REGEX = re.compile(r"^(sat|unsat|unknown)\r?$", flags=re.MULTILINE)
+
+RESULT_TOKENS = {
+    "sat": SolverQueryResult.SAT,
+    "unsat": SolverQueryResult.UNSAT,
+    "unknown": SolverQueryResult.UNKNOWN,
+}
+
+
 def grep_result(stdout):
     """
-    Grep the result from the stdout of a solver.
+    Grep the result from the stdout of a solver, i.e., the lines 'sat',
+    'unsat' and 'unknown', in a single pass over stdout.
+
+    :returns: SolverResult with one item per line, empty if stdout does not
+              contain a valid solver query result
     """
     result = SolverResult()
-    for line in stdout.splitlines():
-        if re.search("^unsat$", line, flags=re.MULTILINE):
-            result.append(SolverQueryResult.UNSAT)
-        elif re.search("^sat$", line, flags=re.MULTILINE):
-            result.append(SolverQueryResult.SAT)
-        elif re.search("^unknown$", line, flags=re.MULTILINE):
-            result.append(SolverQueryResult.UNKNOWN)
+    for token in RESULT_REGEX.findall(stdout):
+        result.append(RESULT_TOKENS[token])
     return result
 
 
 def get_seeds(args, strategy):
     initial_seeds = args.PATH_TO_SEEDS
+    if strategy == "yinyang":
+        assert len(initial_seeds) >= 2
+    if args.seed_index:
+        initial_seeds, num_skipped = filter_seeds(
+            initial_seeds,
+            load_index(args.seed_index),
+            args.file_size_limit,
+            strategy,
+        )
+        log_seed_index_skipped(num_skipped)
     num_initial = len(initial_seeds)
     random.shuffle(initial_seeds)
 
     if strategy == "yinyang":
-        assert len(initial_seeds) >= 2
         gen = get_permutation_generator(initial_seeds)
         return gen, num_initial**2
     else:
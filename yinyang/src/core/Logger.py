@@ -32,6 +32,12 @@ ENDC = "\033[0m"
 
 
 def init_logging(strategy, quiet_mode, name, args):
+    if logging.getLogger().handlers:
+
+        # Logging has already been initialized, e.g., worker processes of the
+        # parallel fuzzing mode inherit the handlers of the coordinator.
+        return
+
     fn = (
         datetime.datetime.now().strftime(strategy + "-%Y-%m-%d-%M:%S-%p")
         + "-"
@@ -71,6 +77,12 @@ def log_strategy_num_seeds(strategy, num_seeds, num_targets):
     )
 
 
+def log_seed_index_skipped(num_skipped):
+    logging.info(
+        "Seed index: skipping " + str(num_skipped) + " invalid or large seeds"
+    )
+
+
 def log_generation_attempt(args):
     logging.debug(
         "Attempting to generate " + str(args.iterations) + " mutants"
@@ -0,0 +1,236 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import re
+import json
+import time
+import tempfile
+import multiprocessing
+
+from yinyang.src.parsing.Ast import Term
+from yinyang.src.parsing.Traversal import preorder, let_and_subterms
+from yinyang.src.parsing.SeedCache import SeedCache
+from yinyang.src.parsing.MmapStream import map_file
+from yinyang.src.parsing.Parse import DEFAULT_BACKEND
+from yinyang.src.parsing.ParseService import ParseService
+from yinyang.src.parsing.Typechecker import typecheck
+from yinyang.src.parsing.Types import UNKNOWN
+
+# Version of the index format, stored in the first line of the index.
+INDEX_FORMAT = 2
+
+# Seed status: the seed is fine for all strategies.
+VALID = "valid"
+# Seed status: the seed parses but does not typecheck, only typefuzz needs
+# typechecked seeds.
+TYPE_ERROR = "type_error"
+# Seed status: the seed could not be parsed (syntax error or parser timeout).
+PARSE_ERROR = "parse_error"
+# Seed status: the seed was not analyzed as it exceeds the size limit.
+TOO_LARGE = "too_large"
+
+LOGIC_REGEX = re.compile(rb"\(\s*set-logic\s+([^\s()]+)\s*\)")
+
+
+def count_terms(script):
+    """
+    :returns: number of terms in the asserts of script and the set of their
+              sorts (as strings), e.g., after typechecking
+    """
+    num_terms, sorts = 0, set()
+    for cmd in script.assert_cmd:
+        for term in preorder(cmd.term, let_and_subterms):
+            if not isinstance(term, Term):
+                continue
+            num_terms += 1
+            if term.type is not None and term.type != UNKNOWN:
+                sorts.add(str(term.type))
+    return num_terms, sorts
+
+
+def analyze_seed(seed, service, size_limit=None, seed_cache=None):
+    """
+    Parse and typecheck a seed.
+
+    :service: ParseService parsing the seed
+    :size_limit: seeds of this size (in bytes) or larger are not parsed
+    :seed_cache: path to a seed cache folder or None
+    :returns: index entry of the seed (dict)
+    """
+    stat = os.stat(seed)
+    entry = {
+        "path": os.path.abspath(seed),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "status": TOO_LARGE,
+        "logic": None,
+        "terms": 0,
+        "sorts": [],
+        "parse_time": 0.0,
+    }
+    if size_limit is not None and entry["size"] >= size_limit:
+        return entry
+
+    data = map_file(seed)
+    if data is not None:
+        with data:
+            m = LOGIC_REGEX.search(data)
+            if m:
+                entry["logic"] = m.group(1).decode("utf8", errors="replace")
+
+    start = time.perf_counter()
+    if seed_cache:
+        script, glob = SeedCache(seed_cache, service).parse_file(seed)
+    else:
+        script, glob = service.parse_file(seed)
+    entry["parse_time"] = round(time.perf_counter() - start, 4)
+    if not script:
+        entry["status"] = PARSE_ERROR
+        return entry
+
+    try:
+        typecheck(script, glob)
+        entry["status"] = VALID
+    except Exception:
+        entry["status"] = TYPE_ERROR
+    entry["terms"], sorts = count_terms(script)
+    entry["sorts"] = sorted(sorts)
+    return entry
+
+
+# Parse service of a worker process of build_index.
+_service = None
+
+
+def _init_worker(timeout_limit, memory_limit, backend):
+    global _service
+    _service = ParseService(timeout_limit, memory_limit, backend)
+
+
+def _analyze_seed(task):
+    seed, size_limit, seed_cache = task
+    return analyze_seed(seed, _service, size_limit, seed_cache)
+
+
+def build_index(
+    seeds, jobs=1, size_limit=None, timeout_limit=30, memory_limit=None,
+    seed_cache=None, callback=None, backend=DEFAULT_BACKEND
+):
+    """
+    Analyze the seeds with `jobs` worker processes, each of which parses the
+    seeds with its own ParseService.
+
+    :callback: called with each entry as soon as it is available
+    :backend: parser backend of the ParseServices (see Parse.BACKENDS)
+    :returns: list of index entries sorted by path
+    """
+    tasks = [(seed, size_limit, seed_cache) for seed in seeds]
+    initargs = (timeout_limit, memory_limit, backend)
+    entries = []
+    if jobs > 1:
+        with multiprocessing.Pool(jobs, _init_worker, initargs) as pool:
+            for entry in pool.imap_unordered(_analyze_seed, tasks):
+                entries.append(entry)
+                if callback:
+                    callback(entry)
+    else:
+        _init_worker(*initargs)
+        try:
+            for task in tasks:
+                entry = _analyze_seed(task)
+                entries.append(entry)
+                if callback:
+                    callback(entry)
+        finally:
+            _service.stop()
+    entries.sort(key=lambda entry: entry["path"])
+    return entries
+
+
+def write_index(entries, fn):
+    """
+    Write the index as JSON lines, the first line holds the format version.
+    """
+    folder = os.path.dirname(os.path.abspath(fn))
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        f.write(json.dumps({"yinyang-seed-index": INDEX_FORMAT}) + "\n")
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+    os.replace(tmp, fn)
+
+
+def load_index(fn):
+    """
+    :returns: dict mapping the absolute paths of the seeds to their entries
+    """
+    with open(fn, "r") as f:
+        header = json.loads(f.readline())
+        if header.get("yinyang-seed-index") != INDEX_FORMAT:
+            raise ValueError("unsupported seed index format")
+        index = {}
+        for line in f:
+            entry = json.loads(line)
+            index[entry["path"]] = entry
+    return index
+
+
+def lookup(index, seed):
+    """
+    :returns: index entry of the seed or None if the seed is missing in the
+              index or has been modified since it was indexed, i.e., its
+              size or modification time differ from the entry's
+    """
+    entry = index.get(os.path.abspath(seed))
+    if entry is None:
+        return None
+    try:
+        stat = os.stat(seed)
+    except OSError:
+        return None
+    if (stat.st_size, stat.st_mtime_ns) != (entry["size"], entry["mtime"]):
+        return None
+    return entry
+
+
+def filter_seeds(seeds, index, size_limit, strategy):
+    """
+    Drop the seeds that the index marks as unusable for the strategy, i.e.,
+    seeds that cannot be parsed, that are too large, and, for typefuzz,
+    that do not typecheck. Seeds missing in the index or modified since they
+    were indexed are kept.
+
+    :returns: remaining seeds and number of dropped seeds
+    """
+    skip = {PARSE_ERROR}
+    if strategy == "typefuzz":
+        skip.add(TYPE_ERROR)
+    kept = []
+    for seed in seeds:
+        entry = lookup(index, seed)
+        if entry and (
+            entry["status"] in skip or entry["size"] >= size_limit
+        ):
+            continue
+        kept.append(seed)
+    return kept, len(seeds) - len(kept)
@@ -20,6 +20,9 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import os
+import time
+import selectors
 import subprocess
 from enum import Enum
 
@@ -83,31 +86,132 @@ class SolverResult:
         return s
 
 
+# Options making a solver read its SMT-LIB input from stdin, by the name of the
+# solver binary. Solvers not listed here read stdin if no file is given.
+STDIN_OPTIONS = {
+    "z3": ["-in"],
+}
+
+
+def stdin_cmd(cil):
+    """
+    Command for running the solver command line cil on an SMT-LIB script
+    passed over stdin.
+    """
+    cmd = list(filter(None, cil.split(" ")))
+    binary = os.path.basename(cmd[0])
+    for name, options in STDIN_OPTIONS.items():
+        if binary.startswith(name):
+            return cmd + [opt for opt in options if opt not in cmd]
+    return cmd
+
+
+# Time granted to a solver to finish writing its crash message after a crash
+# signature has been spotted in its output, before it is killed.
+KILL_GRACE = 0.5
+
+# Time granted to read the rest of a solver's output after it was killed.
+# Processes spawned by the solver (e.g., by a wrapper script) may keep its
+# output streams open, they are closed afterwards.
+DRAIN_TIMEOUT = 1.0
+
+CHUNK_SIZE = 65536
+
+
+class OutputBuffer:
+    """
+    Collects the output of a solver stream chunk by chunk, as it is produced.
+    At most `limit` bytes are kept, the rest is dropped. The chunks are matched
+    against the signatures on the fly, including signatures that span two
+    chunks.
+
+    :limit: maximal number of bytes kept (None = no limit)
+    :signatures: list of strings, e.g., the crash list
+    """
+
+    def __init__(self, limit=None, signatures=None):
+        self.data = bytearray()
+        self.limit = limit
+        self.truncated = False
+        self.signatures = [sig.encode() for sig in signatures or []]
+        self.overlap = max([len(sig) for sig in self.signatures] + [1]) - 1
+        self.tail = b""
+        self.match = None
+
+    def append(self, chunk):
+        """
+        Add a chunk of output to the buffer.
+
+        :returns: the first signature that occurred in the output so far or
+                  None
+        """
+        if self.limit is not None and len(self.data) + len(chunk) > self.limit:
+            self.data += chunk[: max(0, self.limit - len(self.data))]
+            self.truncated = True
+        else:
+            self.data += chunk
+
+        if self.signatures and self.match is None:
+            window = self.tail + chunk
+            for sig in self.signatures:
+                if sig in window:
+                    self.match = sig.decode()
+                    break
+            self.tail = window[max(0, len(window) - self.overlap):]
+        return self.match
+
+    def decode(self):
+        return self.data.decode(errors="replace")
+
+
 class Solver:
-    def __init__(self, cil):
+    """
+    Runs a solver on SMT-LIB scripts. The output of the solver is read while
+    the solver is running. If one of the `kill_on` signatures (e.g., an entry
+    of the crash list) occurs in the output, the solver is killed shortly
+    after instead of waiting for a slow teardown or the timeout. At most
+    `output_limit` bytes per output stream are kept.
+    """
+
+    def __init__(self, cil, kill_on=None, output_limit=None):
         self.cil = cil
+        self.kill_on = kill_on
+        self.output_limit = output_limit
+        self.process = None
+        self.cancelled = False
 
     def solve(self, file, timeout, debug=False):
+        cmd = list(filter(None, self.cil.split(" "))) + [file]
+        return self._run(cmd, timeout, debug)
+
+    def solve_formula(self, formula, timeout, debug=False):
+        """
+        Solve the SMT-LIB script formula (str) passed over the solver's stdin,
+        i.e., without a round trip through the file system.
+        """
+        return self._run(stdin_cmd(self.cil), timeout, debug, formula.encode())
+
+    def _run(self, cmd, timeout, debug, stdin=None):
         try:
-            cmd = list(filter(None, self.cil.split(" "))) + [file]
             if debug:
                 print("cmd: " + " ".join(cmd), flush=True)
-            output = subprocess.run(
+            self.process = subprocess.Popen(
                 cmd,
-                timeout=timeout,
+                stdin=subprocess.PIPE if stdin is not None else None,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 shell=False,
             )
 
-        except subprocess.TimeoutExpired as te:
-            if te.stdout and te.stderr:
-                stdout = te.stdout.decode()
-                stderr = te.stderr.decode()
-            else:
-                stdout = ""
-                stderr = ""
-            return stdout, stderr, 137
+            # The solver may have been cancelled while it was launched.
+            if self.cancelled:
+                self.process.kill()
+
+            stdout, stderr, timed_out = self._communicate(stdin, timeout)
+            if timed_out:
+                if stdout and stderr:
+                    return stdout, stderr, 137
+                return "", "", 137
 
         except ValueError:
             stdout = ""
@@ -118,11 +222,96 @@ class Solver:
             print('error: solver "' + cmd[0] + '" not found', flush=True)
             exit(ERR_USAGE)
 
-        stdout = output.stdout.decode()
-        stderr = output.stderr.decode()
-        returncode = output.returncode
+        returncode = self.process.returncode
 
         if debug:
             print("output: " + stdout + "\n" + stderr)
 
         return stdout, stderr, returncode
+
+    def _communicate(self, stdin, timeout):
+        """
+        Write stdin (bytes or None) to the solver and read its stdout and
+        stderr until the solver terminated. The solver is killed if the
+        timeout expired or `KILL_GRACE` seconds after a signature of
+        `self.kill_on` occurred in its output. After killing it, its output
+        is read for at most `DRAIN_TIMEOUT` seconds.
+
+        :returns: stdout, stderr and whether the timeout expired
+        """
+        process = self.process
+        buffers = {
+            process.stdout: OutputBuffer(self.output_limit, self.kill_on),
+            process.stderr: OutputBuffer(self.output_limit, self.kill_on),
+        }
+        deadline = time.monotonic() + timeout
+        timed_out = killed = matched = False
+
+        with selectors.DefaultSelector() as selector:
+            for stream in buffers:
+                selector.register(stream, selectors.EVENT_READ)
+            if stdin is not None:
+                if stdin:
+                    os.set_blocking(process.stdin.fileno(), False)
+                    selector.register(process.stdin, selectors.EVENT_WRITE)
+                    view, written = memoryview(stdin), 0
+                else:
+                    process.stdin.close()
+
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    if killed:
+                        break
+                    timed_out = not matched
+                    process.kill()
+                    killed = True
+                    deadline = time.monotonic() + DRAIN_TIMEOUT
+                    remaining = DRAIN_TIMEOUT
+                events = selector.select(remaining)
+                for key, _ in events:
+                    if key.fileobj is process.stdin:
+                        try:
+                            written += os.write(
+                                key.fd, view[written: written + CHUNK_SIZE]
+                            )
+                        except BlockingIOError:
+                            continue
+                        except BrokenPipeError:
+                            written = len(stdin)
+                        if written >= len(stdin):
+                            selector.unregister(process.stdin)
+                            process.stdin.close()
+                        continue
+
+                    chunk = os.read(key.fd, CHUNK_SIZE)
+                    if not chunk:
+                        selector.unregister(key.fileobj)
+                        key.fileobj.close()
+                        continue
+                    if buffers[key.fileobj].append(chunk) and not matched:
+                        deadline = min(deadline, time.monotonic() + KILL_GRACE)
+                        matched = True
+            for key in list(selector.get_map().values()):
+                selector.unregister(key.fileobj)
+                key.fileobj.close()
+
+        if process.stdin and not process.stdin.closed:
+            process.stdin.close()
+        process.wait()
+        return (
+            buffers[process.stdout].decode(),
+            buffers[process.stderr].decode(),
+            timed_out,
+        )
+
+    def cancel(self):
+        """
+        Kill the solver process, e.g., if a concurrently running solver has
+        already found a crash on the same mutant. Can be called from another
+        thread than the one running `solve`.
+        """
+        self.cancelled = True
+        process = self.process
+        if process and process.poll() is None:
+            process.kill()
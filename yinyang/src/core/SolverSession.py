@@ -0,0 +1,237 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import time
+import signal
+import selectors
+import subprocess
+
+from yinyang.src.base.Utils import random_string
+from yinyang.src.base.Exitcodes import ERR_USAGE
+from yinyang.src.core.Solver import (
+    stdin_cmd,
+    OutputBuffer,
+    CHUNK_SIZE,
+    KILL_GRACE,
+    DRAIN_TIMEOUT,
+)
+
+
+class SolverSession:
+    """
+    Keeps a solver running in interactive mode and feeds it the mutants over
+    stdin, so that solver startup and initialization is paid once per session
+    instead of once per mutant. Each mutant is isolated from the previous ones
+    by (reset) or by a (push 1)/(pop 1) frame. The end of a mutant's output
+    is detected by a sentinel (echo) command. The session is restarted if the
+    solver crashed or timed out, and optionally every `recycle` queries to
+    avoid state leaking from one mutant into another.
+
+    :mode: "reset" or "push"
+    :recycle: restart the solver after this many queries (0 = never)
+    :kill_on: signatures upon which the solver is killed (see Solver)
+    :output_limit: maximal number of output bytes kept per query
+    """
+
+    def __init__(
+        self, cil, mode="reset", recycle=0, kill_on=None, output_limit=None
+    ):
+        self.cil = cil
+        self.mode = mode
+        self.recycle = recycle
+        self.kill_on = kill_on
+        self.output_limit = output_limit
+        self.process = None
+        self.queries = 0
+        self.busy = False
+        self.cancelled = False
+
+    def start(self):
+        cmd = stdin_cmd(self.cil)
+        try:
+            self.process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                shell=False,
+            )
+        except FileNotFoundError:
+            print('error: solver "' + cmd[0] + '" not found', flush=True)
+            exit(ERR_USAGE)
+        os.set_blocking(self.process.stdin.fileno(), False)
+        self.queries = 0
+
+    def stop(self):
+        if not self.process:
+            return
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        self.process.stdin.close()
+        self.process.stdout.close()
+        self.process = None
+
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def wrap(self, formula, sentinel):
+        """
+        Wrap the formula such that it does not interfere with the following
+        queries and prints the sentinel when the solver is done.
+        """
+        if self.mode == "push":
+            query = "(push 1)\n" + formula + "\n(pop 1)\n"
+        else:
+            query = "(reset)\n" + formula + "\n"
+        return query + '(echo "' + sentinel + '")\n'
+
+    def solve_formula(self, formula, timeout, debug=False):
+        """
+        Solve the SMT-LIB script formula (str) within the session.
+
+        :returns: stdout, stderr and exit code in the same format as
+                  Solver.solve_formula. The solver's stderr is merged into
+                  stdout. The exit code is 0 if the solver answered the
+                  query, 137 on a timeout, and the solver's exit code if it
+                  terminated. If the session has been cancelled before the
+                  query started, the query is skipped and the exit code is
+                  that of a killed solver.
+        """
+        if self.recycle and self.queries >= self.recycle:
+            self.stop()
+        if not self.alive():
+            self.stop()
+            self.start()
+        self.queries += 1
+
+        sentinel = "yinyang-session-" + random_string(10)
+        query = self.wrap(formula, sentinel).encode()
+        if debug:
+            print("session: " + self.cil + "\n" + query.decode(), flush=True)
+
+        # Once busy is set, a cancel kills the solver. A cancel before that
+        # is caught here.
+        self.busy = True
+        try:
+            if self.cancelled:
+                return "", "", -signal.SIGKILL
+
+            # The sentinel is only matched with its newline, which could
+            # otherwise be left in the pipe and end up in the next query's
+            # output.
+            output, status = self._communicate(
+                query, sentinel.encode() + b"\n", timeout
+            )
+        finally:
+            self.busy = False
+
+        stdout = output.decode(errors="replace")
+        if status == "timeout":
+            self.stop()
+            return stdout, "", 137
+        if status == "eof":
+
+            # The solver terminated, e.g., because it crashed, was cancelled
+            # or the mutant contained (exit). It is restarted on the next
+            # query.
+            returncode = self.process.wait()
+            self.stop()
+            return stdout, "", returncode
+        return stdout, "", 0
+
+    def _communicate(self, query, sentinel, timeout):
+        """
+        Write the query to the solver and read its output until the sentinel
+        has been printed, the solver terminated or the timeout expired.
+
+        :returns: output (without the sentinel) and one of the states
+                  "done", "eof", "timeout"
+        """
+        stdin, stdout = self.process.stdin, self.process.stdout
+        deadline = time.monotonic() + timeout
+        output = OutputBuffer(self.output_limit, self.kill_on)
+        view, written = memoryview(query), 0
+        tail, matched, killed = b"", False, False
+
+        with selectors.DefaultSelector() as selector:
+            selector.register(stdout, selectors.EVENT_READ)
+            selector.register(stdin, selectors.EVENT_WRITE)
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    if not matched:
+                        return bytes(output.data), "timeout"
+                    if killed:
+                        return bytes(output.data), "eof"
+
+                    # A crash signature occurred, kill the solver and
+                    # collect the rest of its output (see DRAIN_TIMEOUT).
+                    self.process.kill()
+                    killed = True
+                    deadline = time.monotonic() + DRAIN_TIMEOUT
+                    remaining = DRAIN_TIMEOUT
+                for key, _ in selector.select(remaining):
+                    if key.fileobj is stdin:
+                        try:
+                            written += os.write(
+                                stdin.fileno(),
+                                view[written: written + CHUNK_SIZE]
+                            )
+                        except BlockingIOError:
+                            continue
+                        except BrokenPipeError:
+                            written = len(query)
+                        if written >= len(query):
+                            selector.unregister(stdin)
+                        continue
+
+                    chunk = os.read(stdout.fileno(), CHUNK_SIZE)
+                    if not chunk:
+                        return bytes(output.data), "eof"
+                    if output.append(chunk) and not matched:
+                        deadline = min(deadline, time.monotonic() + KILL_GRACE)
+                        matched = True
+
+                    # The sentinel is searched in the last chunk and the end
+                    # of the previous one, as the output may be truncated.
+                    window = tail + chunk
+                    if sentinel in window:
+                        data = bytes(output.data)
+                        idx = data.find(sentinel)
+                        if idx != -1:
+                            data = data[: data.rfind(b"\n", 0, idx) + 1]
+                        return data, "done"
+                    tail = window[-len(sentinel):]
+
+    def cancel(self):
+        """
+        Kill the solver if it is currently working on a query, and skip the
+        query otherwise. Can be called from another thread than the one
+        running `solve_formula`. The session stays cancelled until the caller
+        clears `cancelled`, e.g., before the next mutant.
+        """
+        self.cancelled = True
+        process = self.process
+        if self.busy and process and process.poll() is None:
+            process.kill()
@@ -40,6 +40,15 @@ class Statistic:
         self.solver_calls = 0
         self.effective_calls = 0
 
+    def merge(self, other):
+        """
+        Add the counters of another Statistic object, e.g. the one of a
+        worker process in the parallel fuzzing mode, to self.
+        """
+        for key, value in vars(other).items():
+            if key != "starttime":
+                setattr(self, key, getattr(self, key) + value)
+
     def printbar(self, start_time):
         total_time = time.time() - start_time
         if self.solver_calls != 0:
@@ -27,19 +27,28 @@ from yinyang.src.mutators.GenTypeAwareMutation.Operator import (
     Operator, handle_parametric_op, handle_non_parametric_op
 )
 from yinyang.src.mutators.GenTypeAwareMutation.Util import (
-    type2num, get_all_subterms, local_compatible
+    type2num, local_defs, HoleIndex
 )
-from yinyang.src.parsing.Ast import Expr
+from yinyang.src.parsing.Ast import Expr, UndoLog
+from yinyang.src.parsing.Traversal import postorder
 from yinyang.src.parsing.Types import ALL
+from yinyang.src.parsing.Typechecker import (
+    retypecheck, TypeCheckError, UnknownOperator
+)
 
 
 class GenTypeAwareMutation(Mutator):
-    def __init__(self, formula, args, unique_expr):
+    def __init__(self, formula, args, unique_expr, ctxt=None):
         self.args = args
         self.formula = formula
         self.unique_expr = unique_expr
+        self.ctxt = ctxt
+        self.undo_log = UndoLog()
         self.operators = []
         self.parse_config_file()
+        self.build_pools()
+        self.build_candidate_ops()
+        self.holes = HoleIndex(formula)
 
     def parse_config_file(self):
         """
@@ -70,20 +79,67 @@ class GenTypeAwareMutation(Mutator):
                 op = Operator(op_name, type_strings, attributes, parameters)
             self.operators.append(op)
 
+    def build_pools(self):
+        """
+        Index the unique expressions of the seed by their types. The
+        expressions without local variables are kept separately as they are
+        compatible with every hole, the others come with their local
+        variables (see local_compatible).
+        """
+        self.pools = {}
+        self.closed_pools = {}
+        self.bound_pools = {}
+        for typ, type_id in type2num.items():
+            if type_id >= len(self.unique_expr):
+                continue
+            pool = self.unique_expr[type_id]
+            self.pools[typ] = pool
+            self.closed_pools[typ] = []
+            self.bound_pools[typ] = []
+            for term in pool:
+                local = local_defs(term, set())
+                if local:
+                    self.bound_pools[typ].append((term, local))
+                else:
+                    self.closed_pools[typ].append(term)
+
+    def get_pool(self, typ):
+        """
+        :returns: list of the unique expressions of type typ
+        """
+        if not isinstance(typ, str):
+            return []
+        return self.pools.get(typ, [])
+
     def has_types(self, types):
         """
         types: list of types (possibly redundant)
 
         :returns: True if the seed formula supports the types
         """
-        for t in set(types):
-            if t == ALL:
-                continue
-            type_id = type2num[t]
-            if len(self.unique_expr[type_id]) == 0:
+        for t in types:
+            if t != ALL and not self.get_pool(t):
                 return False
         return True
 
+    def build_candidate_ops(self):
+        """
+        Precompute the candidate operators for the types of the seed, see
+        get_candidate_ops.
+        """
+        self.supported_ops = [
+            op for op in self.operators if self.has_types(op.arg_types)
+        ]
+        self.candidate_ops = {}
+        for typ in type2num:
+            self.candidate_ops[typ] = self.filter_candidate_ops(typ)
+
+    def filter_candidate_ops(self, typ):
+        return [
+            op for op in self.supported_ops
+            if op.rtype == ALL or op.rtype == typ
+        ]
+
     def get_candidate_ops(self, term):
         """
         term: term object
@@ -95,13 +151,40 @@ class GenTypeAwareMutation(Mutator):
 
         :returns: a list of candidate operators
         """
-        candidate_ops = []
-        for op in self.operators:
-            if op.rtype != ALL and op.rtype != term.type:
-                continue
-            if self.has_types(op.arg_types):
-                candidate_ops.append(op)
-        return candidate_ops
+        if not isinstance(term.type, str):
+            return self.filter_candidate_ops(term.type)
+        if term.type not in self.candidate_ops:
+            self.candidate_ops[term.type] = self.filter_candidate_ops(
+                term.type
+            )
+        return self.candidate_ops[term.type]
+
+    def get_compatible_expr(self, term):
+        """
+        term: term object
+
+        :returns: random unique expression of the same type as term which is
+                  locally compatible with term and differs from it, or None
+        """
+        if not self.get_pool(term.type):
+            return None
+        choices = self.closed_pools[term.type]
+        bound = self.bound_pools[term.type]
+        if bound:
+            local = local_defs(term, set())
+            choices = choices + [t for t, loc in bound if loc <= local]
+        if len(choices) == 0:
+            return None
+
+        choice = random.choice(choices)
+        if choice == term:
+
+            # The expressions are unique, the others differ from term.
+            choices = [t for t in choices if t is not choice]
+            if len(choices) == 0:
+                return None
+            choice = random.choice(choices)
+        return choice
 
     def get_replacee(self, term):
         """
@@ -122,36 +205,74 @@ class GenTypeAwareMutation(Mutator):
             return None
 
         op = random.choice(candidate_ops)
-        args = []
         if op.name == "id":
-            typ_id = type2num[term.type]
-            if self.unique_expr[typ_id]:
-                choices = [
-                    termPrime
-                    for termPrime in self.unique_expr[typ_id]
-                    if termPrime != term and local_compatible(term, termPrime)
-                ]
+            return self.get_compatible_expr(term)
 
+        args = []
+        for t in op.arg_types:
+            choices = self.get_pool(t)
             if len(choices) == 0:
                 return None
+            args.append(random.choice(choices))
 
-            return random.choice(choices)
-        else:
-            for t in op.arg_types:
-                typ_id = type2num[t]
-                choices = [tPrime for tPrime in self.unique_expr[typ_id]]
+        exp = Expr(op=op.name, subterms=args)
+        exp.type = op.rtype
+        return exp
 
-                if len(choices) == 0:
-                    return None
+    def substitute(self, t1, t2):
+        """
+        Substitute t1 by t2. Given the context returned by typecheck, the
+        mutant is typechecked incrementally (see retypecheck) and the
+        substitution is undone if the mutant is ill-typed, i.e., if its
+        typechecking fails or changes the type of the assert. The holes
+        within t1 are replaced by those within t2 in the hole index.
+
+        :returns: True if t1 was substituted by t2
+        """
+        old_holes = list(postorder(t1))[:-1]
+        if self.ctxt is None:
+            t1.substitute(t1, t2, undo_log=self.undo_log)
+            self.update_holes(t1, old_holes)
+            return True
 
-                arg = random.choice(choices)
-                args.append(arg)
+        mark = len(self.undo_log)
+        root = t1
+        while root.parent is not None:
+            root = root.parent
+            self.undo_log.save(root, ["type"])
+        root_type = root.type
 
-            exp = Expr(op=op.name, subterms=args)
-            exp.type = op.rtype
+        t1.substitute(t1, t2, undo_log=self.undo_log)
+        if self.well_typed(t1, root_type):
+            self.update_holes(t1, old_holes)
+            return True
+        self.undo_log.rollback(mark)
+        return False
+
+    def update_holes(self, term, old_holes):
+        """
+        Replace the holes within term before its substitution, old_holes, by
+        those within term in the hole index.
+        """
+        for hole in old_holes:
+            self.holes.remove(hole, self.undo_log)
+        for hole in list(postorder(term))[:-1]:
+            self.holes.add(hole, self.undo_log)
+
+    def well_typed(self, term, root_type):
+        """
+        :returns: True if the script is well-typed after substituting term
+                  and the type of its assert is still root_type
+        """
+        try:
+            return retypecheck(term, self.ctxt) == root_type
+        except TypeCheckError:
+            return False
+        except UnknownOperator:
 
-            return exp
-        return None
+            # Not all operators of the configuration file are known to the
+            # typechecker, such mutants are kept.
+            return True
 
     def mutate(self):
         """
@@ -160,16 +281,15 @@ class GenTypeAwareMutation(Mutator):
 
         :returns: mutant formula, and result of mutation
         """
+        # The holes that failed are moved behind the first end holes.
         success = False
-        self.av_expr, self.expr_type = get_all_subterms(self.formula)
-        num_holes = len(self.av_expr)
-        all_holes = self.av_expr
-        for _ in range(num_holes):
-            t1 = random.choice(all_holes)
+        end = len(self.holes)
+        while end > 0:
+            t1 = self.holes.choice(end)
             t2 = self.get_replacee(t1)
-            if t2:
+            if t2 and self.substitute(t1, t2):
                 success = True
-                t1.substitute(t1, t2)
                 break
-            all_holes.remove(t1)
+            end -= 1
+            self.holes.swap(t1, end)
         return self.formula, success, False  # False = never skip seed
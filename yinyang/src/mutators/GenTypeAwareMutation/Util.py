@@ -21,8 +21,10 @@
 # SOFTWARE.
 
 import copy
+import random
 
-from yinyang.src.parsing.Ast import Term
+from yinyang.src.parsing.Ast import Term, TermTable
+from yinyang.src.parsing.Traversal import postorder
 from yinyang.src.parsing.Types import (
     BOOLEAN_TYPE, REAL_TYPE, INTEGER_TYPE, ROUNDINGMODE_TYPE,
     STRING_TYPE, REGEXP_TYPE
@@ -46,25 +48,14 @@ def get_subterms(expr):
               expr_types list of types
               (s.t. expression e = av_expr[i] has type expr_types[i])
     """
-    av_expr = []
-    expr_types = []
-    if isinstance(expr, Term):
-        if expr.subterms:
-            for s in expr.subterms:
-                new_av, new_type = get_subterms(s)
-                av_expr += new_av
-                expr_types += new_type
-            new_type = expr.type
-            expr_types.append(new_type)
-            av_expr.append(expr)
-        else:
-            av_expr.append(expr)
-            expr_types.append(expr.type)
-    else:
-        if expr.term:
-            new_av, new_type = get_subterms(expr.term)
-            av_expr += new_av
-            expr_types += new_type
+    if not isinstance(expr, Term):
+        if not expr.term:
+            return [], []
+        expr = expr.term
+
+    # Each expression follows its subexpressions.
+    av_expr = list(postorder(expr))
+    expr_types = [e.type for e in av_expr]
     return av_expr, expr_types
 
 
@@ -84,6 +75,72 @@ def get_all_subterms(formula):
     return av_expr, expr_type
 
 
+class HoleIndex:
+    """
+    The holes of a formula, i.e., the expressions within its asserts (see
+    get_all_subterms), in an array together with the position of each hole.
+    Holes are chosen, added and removed in O(1), hence the index is updated
+    when a hole is substituted instead of collecting the holes anew.
+    """
+
+    def __init__(self, formula):
+        self.holes = []
+        self.positions = {}
+        for hole in get_all_subterms(formula)[0]:
+            self.add(hole)
+
+    def __len__(self):
+        return len(self.holes)
+
+    def add(self, hole, undo_log=None):
+        """
+        Add hole to the end of the array. Subterms shared between terms
+        (e.g., by a substitution with the same argument twice) are added
+        only once.
+
+        undo_log:   optional UndoLog, the addition can then be undone
+        """
+        if id(hole) in self.positions:
+            return
+        self.positions[id(hole)] = len(self.holes)
+        self.holes.append(hole)
+        if undo_log is not None:
+            undo_log.on_rollback(self.remove, hole)
+
+    def remove(self, hole, undo_log=None):
+        """
+        Remove hole if present, the last hole of the array takes its
+        position.
+
+        undo_log:   optional UndoLog, the removal can then be undone
+        """
+        if id(hole) not in self.positions:
+            return
+        pos = self.positions.pop(id(hole))
+        last = self.holes.pop()
+        if last is not hole:
+            self.holes[pos] = last
+            self.positions[id(last)] = pos
+        if undo_log is not None:
+            undo_log.on_rollback(self.add, hole)
+
+    def choice(self, end):
+        """
+        :returns: random hole among the first end holes of the array
+        """
+        return self.holes[random.randrange(end)]
+
+    def swap(self, hole, pos):
+        """
+        Swap hole with the hole at position pos, e.g., to exclude it from
+        the holes chosen by choice.
+        """
+        other = self.holes[pos]
+        old_pos = self.positions[id(hole)]
+        self.holes[old_pos], self.holes[pos] = other, hole
+        self.positions[id(other)], self.positions[id(hole)] = old_pos, pos
+
+
 def get_unique_subterms(formula):
     """
     Get all the unique expressions within a formula.
@@ -95,33 +152,23 @@ def get_unique_subterms(formula):
     # Below index indicates what type of expressions are stored in each list
     # 0: Bool, 1: Real, 2: Int, 3: RoundingMode, 4: String, 5: Regex, 6: Ukn
     unique_expr = [[], [], [], [], [], []]
+    types = [
+        BOOLEAN_TYPE, REAL_TYPE, INTEGER_TYPE, ROUNDINGMODE_TYPE,
+        STRING_TYPE, REGEXP_TYPE
+    ]
+
+    # Structurally equal expressions have the same id in the table, i.e., the
+    # duplicates are found by hashing instead of pairwise comparisons.
+    table = TermTable()
+    seen = [set() for _ in types]
     for i in range(len(expr_type)):
-        if expr_type[i] == BOOLEAN_TYPE:
-            unique_expr[0].append(copy.deepcopy(av_expr[i]))
-        elif expr_type[i] == REAL_TYPE:
-            unique_expr[1].append(copy.deepcopy(av_expr[i]))
-        elif expr_type[i] == INTEGER_TYPE:
-            unique_expr[2].append(copy.deepcopy(av_expr[i]))
-        elif expr_type[i] == ROUNDINGMODE_TYPE:
-            unique_expr[3].append(copy.deepcopy(av_expr[i]))
-        elif expr_type[i] == STRING_TYPE:
-            unique_expr[4].append(copy.deepcopy(av_expr[i]))
-        elif expr_type[i] == REGEXP_TYPE:
-            unique_expr[5].append(copy.deepcopy(av_expr[i]))
-
-    for i in range(6):
-        if unique_expr[i]:
-            temp = []
-            temp.append(unique_expr[i][0])
-            for j in range(1, len(unique_expr[i])):
-                flag = 0
-                for exp in temp:
-                    if unique_expr[i][j] == exp:
-                        flag = 1
-                        pass
-                if flag == 0:
-                    temp.append(unique_expr[i][j])
-            unique_expr[i] = temp
+        for j, typ in enumerate(types):
+            if expr_type[i] == typ:
+                term_id = table.intern(av_expr[i])
+                if term_id not in seen[j]:
+                    seen[j].add(term_id)
+                    unique_expr[j].append(copy.deepcopy(av_expr[i]))
+                break
     return unique_expr
 
 
@@ -132,16 +179,17 @@ def local_defs(term, local):
 
     :returns: list of local variables to be considered within the term
     """
-    term = term.parent
-    if term:
+    child, term = term, term.parent
+    while term:
         if term.quantifier:
             for q_var in term.quantified_vars[0]:
                 local.add(q_var)
-        if term.let_terms:
+
+        # The variables of a let binding are bound in its body only.
+        if term.let_terms and not any(child is t for t in term.let_terms):
             for var in term.var_binders:
                 local.add(var)
-        if term.parent:
-            local_defs(term, local)
+        child, term = term, term.parent
     return local
 
 
@@ -50,6 +50,13 @@ class SemanticFusion(Mutator):
     def __init__(self, formula1, formula2, args):
         self.formula1 = canonicalize_script(formula1)
         self.formula2 = canonicalize_script(formula2)
+
+        # The seeds with prefixed variables, which the mutants are
+        # copy-on-write copies of (see Script.overlay).
+        self.prefixed1 = copy.deepcopy(self.formula1)
+        self.prefixed1.prefix_vars("scr1_")
+        self.prefixed2 = copy.deepcopy(self.formula2)
+        self.prefixed2.prefix_vars("scr2_")
         self.args = args
         self.config = self.args.config
         self.generate_functions = self.args.generate_functions > 0
@@ -97,6 +104,7 @@ class SemanticFusion(Mutator):
         fusion_vars = []
         fusion_vars_names = []
         fusion_constr = []
+        replacements1, replacements2 = {}, {}
         for triplet in triplets:
             # xs and ys map variables names to template variable declarations.
             mapped_var1, mapped_var2, template =\
@@ -114,19 +122,28 @@ class SemanticFusion(Mutator):
             # Should I look at both input and output sorts?
             fusion_constr += fusion_contraints(template, z_sort(template))
 
-            def _random_substitute(formula, mapped_vars, formula_var_name):
+            def _random_substitute(
+                formula, mapped_vars, formula_var_name, replacements
+            ):
                 occs = [occ for occ in formula.free_var_occs
-                        if occ.name == formula_var_name]
+                        if occ.name == formula_var_name
+                        and id(occ) not in replacements]
                 k = random.randint(0, len(occs))
                 occs = random.sample(occs, k)
                 for occ in occs:
-                    occ.substitute(occ, inv_by_name(
+                    replacements[id(occ)] = (occ, inv_by_name(
                         template, mapped_vars[formula_var_name].symbol))
             for formula1_var_name in mapped_var1:
-                _random_substitute(formula1, mapped_var1, formula1_var_name)
+                _random_substitute(
+                    formula1, mapped_var1, formula1_var_name, replacements1
+                )
             for formula2_var_name in mapped_var2:
-                _random_substitute(formula2, mapped_var2, formula2_var_name)
+                _random_substitute(
+                    formula2, mapped_var2, formula2_var_name, replacements2
+                )
 
+        formula1 = formula1.overlay(replacements1.values())
+        formula2 = formula2.overlay(replacements2.values())
         if self.oracle == "unsat":
             formula = disjunction(formula1, formula2)
             add_fusion_constraints(formula, fusion_constr)
@@ -141,10 +158,7 @@ class SemanticFusion(Mutator):
            self.formula2.free_var_occs == []:
             skip_seed = True
 
-        formula1, formula2 =\
-            copy.deepcopy(self.formula1), copy.deepcopy(self.formula2)
-        formula1.prefix_vars("scr1_")
-        formula2.prefix_vars("scr2_")
+        formula1, formula2 = self.prefixed1, self.prefixed2
 
         templates = generate_fusion_function_templates(
             formula1.global_vars,
@@ -32,7 +32,7 @@ from yinyang.src.parsing.Types import (
 from yinyang.src.parsing.Parse import parse_str
 from yinyang.src.parsing.Ast import (
     Term,
-    Script,
+    LazyScript,
     Assert,
     DeclareConst,
     DeclareFun,
@@ -105,7 +105,11 @@ def concat(op, script1, script2):
         else:
             new_cmds.append(cmd)
     new_cmds = sorts + new_cmds
-    return Script(new_cmds, {**script1.global_vars, **script2.global_vars})
+
+    # The occurrences of the fused script are collected on first access.
+    return LazyScript(
+        new_cmds, {**script1.global_vars, **script2.global_vars}
+    )
 
 
 def conjunction(script1, script2):
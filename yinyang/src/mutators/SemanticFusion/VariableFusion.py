@@ -176,8 +176,14 @@ def fill_template(xs, ys, z_name, template):
     :returns: bindded template
     """
     # xs and ys map variables to template variable names.
-    filled_template = copy.deepcopy(template)
-    first_ass_idx = get_first_assert_idx(filled_template)
+    # Only the asserts are changed, the declarations are shared.
+    first_ass_idx = get_first_assert_idx(template)
+    filled_template = copy.copy(template)
+    filled_template.commands = template.commands[:first_ass_idx]\
+        + copy.deepcopy(template.commands[first_ass_idx:])
+    filled_template.assert_cmd = [
+        cmd for cmd in filled_template.commands if isinstance(cmd, Assert)
+    ]
     z = Var(z_name, z_sort(template))
 
     # Detect whether template includes random variable c
@@ -23,6 +23,19 @@
 import random
 
 from yinyang.src.mutators.Mutator import Mutator
+from yinyang.src.parsing.Ast import UndoLog
+
+
+def arity_class(num_subterms):
+    """
+    :returns: arity class of a term with num_subterms subterms, terms in
+              the same class match the same arity conditions
+    """
+    return min(max(num_subterms, 1), 3)
+
+
+# A representative number of subterms of each arity class.
+ARITY_CLASSES = (1, 2, 3)
 
 
 class TypeAwareOpMutation(Mutator):
@@ -31,8 +44,14 @@ class TypeAwareOpMutation(Mutator):
         self.formula = formula
         self.bidirectional = []
         self.unidirectional = []
+        self.replacements = {}
+        self.undo_log = UndoLog()
 
         self.parse_config_file()
+        self.build_index()
+        self.candidates = [
+            occ for occ in self.formula.op_occs if self.get_replacements(occ)
+        ]
 
     def parse_config_file(self):
         with open(self.args.config) as f:
@@ -56,50 +75,71 @@ class TypeAwareOpMutation(Mutator):
             op_class = [op.strip() for op in line.split(",")]
             self.bidirectional.append((arity, op_class))
 
-    def arities_mismatch(self, arity, op_occ):
-        if arity == "2+" and len(op_occ.subterms) < 2:
+    def arities_mismatch(self, arity, num_subterms):
+        if arity == "2+" and num_subterms < 2:
             return True
 
-        if arity == "1-" and len(op_occ.subterms) > 2:
+        if arity == "1-" and num_subterms > 2:
             return True
         return False
 
-    def get_replacee(self, op_occ):
-        for b in self.bidirectional:
-            arity, op_class = b[0], b[1]
-            if self.arities_mismatch(arity, op_occ):
-                continue
+    def build_index(self):
+        """
+        Index the replacements of each operator by the operator and the arity
+        class of its occurrences. An operator is replaced by the other
+        operators of the first equivalence class containing it whose arity
+        condition holds. As before, unidirectional mutations are parsed but
+        not applied.
+        """
+        for arity, op_class in self.bidirectional:
+            for num_subterms in ARITY_CLASSES:
+                if self.arities_mismatch(arity, num_subterms):
+                    continue
+                for op in op_class:
+                    key = (op, num_subterms)
+                    if key in self.replacements:
+                        continue
+                    self.replacements[key] = tuple(
+                        other for other in op_class if other != op
+                    )
 
-            if op_occ.op in op_class:
-                diff = op_class.copy()
-                diff.remove(op_occ.op)
-                replacee = random.choice(diff)
-                return replacee
-
-            if op_occ.quantifier in op_class:
-                diff = op_class.copy()
-                diff.remove(op_occ.quantifier)
-                replacee = random.choice(diff)
-                return replacee
-
-        for u in self.unidirectional:
-            arity, op, replacee = u[0], u[1], u[2]
-            if op_occ.op != op or op_occ.quantifier != op:
-                continue
-            if self.arities_mismatch(arity, op_occ):
-                continue
-            return replacee
-        return None
+    def operator_attr(self, op_occ):
+        """
+        :returns: the attribute holding the operator of op_occ, i.e.,
+                  "quantifier" for quantified terms and "op" otherwise
+        """
+        if op_occ.quantifier:
+            return "quantifier"
+        return "op"
+
+    def get_replacements(self, op_occ):
+        """
+        :returns: tuple of the operators which may replace the operator of
+                  op_occ (empty if there are none)
+        """
+        op = getattr(op_occ, self.operator_attr(op_occ))
+        if not isinstance(op, str):
+            return ()
+        key = (op, arity_class(len(op_occ.subterms)))
+        return self.replacements.get(key, ())
+
+    def get_replacee(self, op_occ):
+        replacements = self.get_replacements(op_occ)
+        if not replacements:
+            return None
+        return random.choice(replacements)
 
     def mutate(self):
+        # An operator is replaced by another one of its equivalence class,
+        # so the candidates remain replaceable after mutating them.
         success = False
+        if not self.candidates:
+            return self.formula, success, False
         for _ in range(self.args.modulo):
-            max_choices = len(self.formula.op_occs)
-            for _ in range(max_choices):
-                op_occ = random.choice(self.formula.op_occs)
-                replacee = self.get_replacee(op_occ)
-                if replacee:
-                    success = True
-                    op_occ.op = replacee
-                    break
+            op_occ = random.choice(self.candidates)
+            replacee = self.get_replacee(op_occ)
+            if replacee:
+                attr = self.operator_attr(op_occ)
+                self.undo_log.set(op_occ, attr, replacee)
+                success = True
         return self.formula, success, False
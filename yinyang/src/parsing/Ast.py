@@ -21,6 +21,9 @@
 # SOFTWARE.
 
 import copy
+import operator
+
+from yinyang.src.parsing.Traversal import visit, let_and_subterms
 
 
 class Script:
@@ -28,60 +31,70 @@ class Script:
         self.commands = commands
         self.vars, self.types = self._decl_commands()
         self.global_vars = global_vars
-        self.free_var_occs = []
-        self.op_occs = []
         self.assert_cmd = []
-
         for cmd in self.commands:
             if isinstance(cmd, Assert):
-                globs_ = copy.deepcopy(self.global_vars)
-                self._get_free_var_occs(cmd.term, self.global_vars)
-                self.global_vars = globs_
-                self._get_op_occs(cmd.term)
                 self.assert_cmd.append(cmd)
+        self._collect_occs()
 
-    def _get_op_occs(self, e):
-        if isinstance(e, str):
-            return
-        if e.is_const:
-            return
-        if e.label:
-            return
-        if e.is_var:
-            return
+    def _collect_occs(self):
+        """
+        Collect the free variable and operator occurrences of the asserts.
+        """
+        self.free_var_occs = []
+        self.op_occs = []
+        op_seen = set()
+        for cmd in self.assert_cmd:
+            globs_ = copy.deepcopy(self.global_vars)
+            self._get_free_var_occs(cmd.term, self.global_vars)
+            self.global_vars = globs_
+            self._get_op_occs(cmd.term, op_seen)
+
+    def _get_op_occs(self, e, seen=None):
+        """
+        Collect the operator occurrences in e. Subterms shared between terms
+        (e.g. of a hash-consed term DAG) are collected only once.
+        """
+        if seen is None:
+            seen = set()
 
-        self.op_occs.append(e)
-        for sub in e.subterms:
-            self._get_op_occs(sub)
+        def enter(e):
+            if isinstance(e, str):
+                return False
+            if e.is_const or e.label or e.is_var:
+                return False
+            if id(e) in seen:
+                return False
+            seen.add(id(e))
+            self.op_occs.append(e)
 
-    def _get_free_var_occs(self, e, global_vars):
-        if isinstance(e, str):
-            return
-        if e.is_const:
-            return
-        if e.label:
-            return
-        if e.quantifier:
-            for var in list(global_vars):
-                for quantified_var in e.quantified_vars[0]:
-                    if var == quantified_var:
-                        global_vars.pop(var)
-
-        if e.var_binders:
-            for var in list(global_vars):
-                for let_var in e.var_binders:
-                    if var == let_var:
-                        global_vars.pop(var)
-            for let_term in e.let_terms:
-                self._get_free_var_occs(let_term, global_vars)
-
-        if e.is_var:
-            if e.name in global_vars:
-                self.free_var_occs.append(e)
-            return
+        visit(e, enter)
 
-        for sub in e.subterms:
-            self._get_free_var_occs(sub, global_vars)
+    def _get_free_var_occs(self, e, global_vars):
+        def enter(e):
+            if isinstance(e, str):
+                return False
+            if e.is_const or e.label:
+                return False
+            if e.quantifier:
+                for var in list(global_vars):
+                    for quantified_var in e.quantified_vars[0]:
+                        if var == quantified_var:
+                            global_vars.pop(var)
+
+            if e.var_binders:
+                for var in list(global_vars):
+                    for let_var in e.var_binders:
+                        if var == let_var:
+                            global_vars.pop(var)
+
+            if e.is_var:
+                if e.name in global_vars:
+                    self.free_var_occs.append(e)
+                return False
+
+        # The bound terms of let binders are visited before the subterms.
+        visit(e, enter, let_and_subterms)
 
     def _decl_commands(self):
         vars, types = [], {}
@@ -96,21 +109,17 @@ class Script:
         return vars, types
 
     def _prefix_free_vars(self, prefix, e):
-        if isinstance(e, str):
-            return
-        if e.is_const:
-            return
-        if e.is_var and e.type:
-            if e in self.free_var_occs:
-                e.name = prefix + e.name
-            return
-
-        if e.var_binders:
-            for i, var in enumerate(e.var_binders):
-                self._prefix_free_vars(prefix, e.let_terms[i])
-
-        for s in e.subterms:
-            self._prefix_free_vars(prefix, s)
+        def enter(e):
+            if isinstance(e, str):
+                return False
+            if e.is_const:
+                return False
+            if e.is_var and e.type:
+                if e in self.free_var_occs:
+                    e.name = prefix + e.name
+                return False
+
+        visit(e, enter, let_and_subterms)
 
     def prefix_vars(self, prefix):
         """
@@ -166,22 +175,101 @@ class Script:
             new_cmds.append(cmd)
         self.commands = new_cmds
 
-    def __str__(self):
-        s = ""
-        for i, c in enumerate(self.commands):
-            if i != len(self.commands) - 1:
-                s += c.__str__() + "\n"
+    def overlay(self, replacements):
+        """
+        Copy-on-write copy of the script with term occurrences substituted,
+        e.g., free variable occurrences. Only the asserts and the terms on
+        the paths from the substituted occurrences to the roots of their
+        asserts are copied, all other terms and commands are shared with
+        self (and keep their parent pointers into self).
+
+        :replacements: list of (occ, repl) pairs, where occ is a term of an
+                       assert of self, substituted by a copy of repl
+        :returns: LazyScript, the occurrences are collected on first access
+        """
+        roots = {id(cmd.term): cmd for cmd in self.assert_cmd}
+        asserts = {}
+        clones = {}
+        for occ, repl in replacements:
+            # The copy of repl is detached from the parent of repl.
+            child, new = occ, copy.deepcopy(repl, {id(repl.parent): None})
+            while id(child) not in roots:
+                parent = child.parent
+                clone = clones.get(id(parent))
+                copied = clone is not None
+                if not copied:
+                    clone = clones[id(parent)] = copy.copy(parent)
+                    clone.subterms = list(parent.subterms)
+                    if parent.let_terms:
+                        clone.let_terms = list(parent.let_terms)
+                for terms, clone_terms in [
+                    (parent.subterms, clone.subterms),
+                    (parent.let_terms, clone.let_terms),
+                ]:
+                    for i, term in enumerate(terms or []):
+                        if term is child:
+                            clone_terms[i] = new
+                new.parent = clone
+
+                # The ancestors of a copied term are copied already.
+                if copied:
+                    break
+                child, new = parent, clone
             else:
-                s += c.__str__()
-        return s
+                new.parent = None
+                asserts[id(child)] = Assert(new)
+        commands = [
+            asserts.get(id(cmd.term), cmd) if isinstance(cmd, Assert) else cmd
+            for cmd in self.commands
+        ]
+        return LazyScript(commands, dict(self.global_vars))
+
+    def __str__(self):
+        return "\n".join(c.__str__() for c in self.commands)
+
+
+class LazyScript(Script):
+    """
+    Script whose free variable and operator occurrences are collected on
+    first access, e.g., of lazily parsed asserts (see LazyParser.py), whose
+    terms are then parsed, or of copy-on-write copies (see Script.overlay).
+    """
+
+    def _collect_occs(self):
+        self._free_var_occs = None
+        self._op_occs = None
+
+    @property
+    def free_var_occs(self):
+        if self._free_var_occs is None:
+            Script._collect_occs(self)
+        return self._free_var_occs
+
+    @free_var_occs.setter
+    def free_var_occs(self, occs):
+        self._free_var_occs = occs
+
+    @property
+    def op_occs(self):
+        if self._op_occs is None:
+            Script._collect_occs(self)
+        return self._op_occs
+
+    @op_occs.setter
+    def op_occs(self, occs):
+        self._op_occs = occs
 
 
 class Commands:
+    __slots__ = ("free_vars",)
+
     def __init__(self):
         self.free_vars = []
 
 
 class DeclareConst(Commands):
+    __slots__ = ("symbol", "sort")
+
     def __init__(self, symbol, sort):
         self.symbol = symbol
         self.sort = sort
@@ -193,6 +281,8 @@ class DeclareConst(Commands):
 
 
 class DeclareFun:
+    __slots__ = ("symbol", "input_sort", "output_sort")
+
     def __init__(self, symbol, input_sort, output_sort):
         self.symbol = symbol
         self.input_sort = input_sort
@@ -211,6 +301,8 @@ class DeclareFun:
 
 
 class Assert:
+    __slots__ = ("term",)
+
     def __init__(self, term):
         self.term = term
 
@@ -218,7 +310,50 @@ class Assert:
         return "(assert " + self.term.__str__() + ")"
 
 
+class LazyAssert(Assert):
+    """
+    Assert whose term is parsed from the text of the script when it is first
+    accessed (see LazyParser.py). Until then, the command is printed as it
+    occurs in the text.
+    """
+
+    __slots__ = ("source", "start", "end", "_term")
+
+    def __init__(self, source, start, end):
+        self.source = source
+        self.start = start
+        self.end = end
+        self._term = None
+
+    @property
+    def term(self):
+        if self._term is None:
+            self._term = self.source.term(self.start, self.end)
+        return self._term
+
+    @term.setter
+    def term(self, term):
+        self._term = term
+
+    def is_parsed(self):
+        return self._term is not None
+
+    # Copying or pickling the command does not parse its term.
+    def __getstate__(self):
+        return self.source, self.start, self.end, self._term
+
+    def __setstate__(self, state):
+        self.source, self.start, self.end, self._term = state
+
+    def __str__(self):
+        if self._term is None:
+            return self.source.text(self.start, self.end)
+        return "(assert " + self._term.__str__() + ")"
+
+
 class AssertSoft:
+    __slots__ = ("term", "attr")
+
     def __init__(self, term, attr):
         self.term = term
         self.attr = attr
@@ -230,6 +365,8 @@ class AssertSoft:
 
 
 class Comment:
+    __slots__ = ("txt",)
+
     def __init__(self, txt):
         self.txt = txt
 
@@ -238,6 +375,8 @@ class Comment:
 
 
 class Define:
+    __slots__ = ("term", "symbol")
+
     def __init__(self, symbol, term):
         self.term = term
         self.symbol = symbol
@@ -247,6 +386,8 @@ class Define:
 
 
 class DefineConst:
+    __slots__ = ("symbol", "sort", "term")
+
     def __init__(self, symbol, sort, term):
         self.symbol = symbol
         self.sort = sort
@@ -265,6 +406,8 @@ class DefineConst:
 
 
 class DefineFun:
+    __slots__ = ("symbol", "sorted_vars", "sort", "term")
+
     def __init__(self, symbol, sorted_vars, sort, term):
         self.symbol = symbol
         self.sorted_vars = sorted_vars
@@ -286,6 +429,8 @@ class DefineFun:
 
 
 class DefineFunRec:
+    __slots__ = ("symbol", "sorted_vars", "sort", "term")
+
     def __init__(self, symbol, sorted_vars, sort, term):
         self.symbol = symbol
         self.sorted_vars = sorted_vars
@@ -312,6 +457,8 @@ class DefineFunRec:
 
 
 class FunDecl:
+    __slots__ = ("symbol", "sorted_vars", "sort")
+
     def __init__(self, symbol, sorted_vars, sort):
         self.symbol = symbol
         self.sorted_vars = sorted_vars
@@ -325,6 +472,8 @@ class FunDecl:
 
 
 class DefineFunsRec:
+    __slots__ = ("fun_decls", "terms")
+
     def __init__(self, fun_decls, terms):
         self.fun_decls = fun_decls
         self.terms = terms
@@ -343,6 +492,8 @@ class DefineFunsRec:
 
 
 class Simplify:
+    __slots__ = ("term", "attr")
+
     def __init__(self, term, attr):
         self.term = term
         self.attr = attr
@@ -355,6 +506,8 @@ class Simplify:
 
 
 class Minimize:
+    __slots__ = ("term",)
+
     def __init__(self, term):
         self.term = term
 
@@ -363,6 +516,8 @@ class Minimize:
 
 
 class Maximize:
+    __slots__ = ("term",)
+
     def __init__(self, term):
         self.term = term
 
@@ -371,6 +526,8 @@ class Maximize:
 
 
 class Display:
+    __slots__ = ("term",)
+
     def __init__(self, term):
         self.term = term
 
@@ -379,6 +536,8 @@ class Display:
 
 
 class Eval:
+    __slots__ = ("term",)
+
     def __init__(self, term):
         self.term = term
 
@@ -387,6 +546,8 @@ class Eval:
 
 
 class PolyFactor:
+    __slots__ = ("term",)
+
     def __init__(self, term):
         self.term = term
 
@@ -395,6 +556,8 @@ class PolyFactor:
 
 
 class CheckSat:
+    __slots__ = ("terms",)
+
     def __init__(self, terms=None):
         self.terms = terms
 
@@ -409,6 +572,8 @@ class CheckSat:
 
 
 class CheckSatAssuming:
+    __slots__ = ("terms",)
+
     def __init__(self, terms):
         self.terms = terms
 
@@ -420,6 +585,8 @@ class CheckSatAssuming:
 
 
 class GetValue:
+    __slots__ = ("terms",)
+
     def __init__(self, terms):
         self.terms = terms
 
@@ -431,6 +598,8 @@ class GetValue:
 
 
 class Push:
+    __slots__ = ("terms",)
+
     def __init__(self, terms=None):
         self.terms = terms
 
@@ -445,6 +614,8 @@ class Push:
 
 
 class Pop:
+    __slots__ = ("terms",)
+
     def __init__(self, terms=None):
         self.terms = terms
 
@@ -459,6 +630,8 @@ class Pop:
 
 
 class SMTLIBCommand:
+    __slots__ = ("cmd_str",)
+
     def __init__(self, cmd_str):
         self.cmd_str = cmd_str
 
@@ -513,6 +686,25 @@ def LabeledTerm(label, subterms):
 
 
 class Term:
+    # Seeds often have hundreds of thousands of terms, slots avoid a
+    # per-term __dict__ and make copying terms cheaper.
+    __slots__ = (
+        "name",
+        "type",
+        "is_const",
+        "is_var",
+        "label",
+        "indices",
+        "quantifier",
+        "quantified_vars",
+        "var_binders",
+        "let_terms",
+        "op",
+        "subterms",
+        "is_indexed_id",
+        "parent",
+    )
+
     def __init__(
         self,
         name=None,
@@ -583,17 +775,48 @@ class Term:
 
     def _add_parent_pointer(self):
         """
-        Adds pointer from each element in subterm to expr.
+        Adds pointer from each element in subterm and let_terms to expr.
         """
         if self.subterms:
             for term in self.subterms:
                 if not isinstance(term, str):
                     term.parent = self
+        if self.let_terms:
+            for term in self.let_terms:
+                if not isinstance(term, str):
+                    term.parent = self
+
+    def __copy__(self):
+        term = Term.__new__(Term)
+        for attr in Term.__slots__:
+            setattr(term, attr, getattr(self, attr))
+        return term
 
-    def find_all(self, e, occs):
+    def __deepcopy__(self, memo):
+        term = Term.__new__(Term)
+        memo[id(self)] = term
+        for attr in Term.__slots__:
+            setattr(term, attr, copy.deepcopy(getattr(self, attr), memo))
+        return term
+
+    def find_all(self, e, occs, table=None):
         """
         Find all expressions e in self and add them to the list occs.
+
+        table:  optional TermTable, terms are then compared by their ids in
+                the table. This pays off for several searches in the same
+                (unchanged) term, a single search is cheaper without it.
         """
+        if table is not None:
+            target = table.intern(e)
+            todo = [self]
+            while todo:
+                term = todo.pop()
+                if table.intern(term) == target:
+                    occs.append(e if term is self else term)
+                elif isinstance(term, Term) and term.subterms:
+                    todo.extend(reversed(term.subterms))
+            return
         if self == e:
             return occs.append(e)
         if self.subterms:
@@ -603,13 +826,18 @@ class Term:
                 else:
                     sub.find_all(e, occs)
 
-    def substitute(self, e, repl):
+    def substitute(self, e, repl, table=None, undo_log=None):
         """
-        Substitute all expressions e in self by repl.
+        Substitute all expressions e in self by repl. The ids of the
+        occurrences in table (see find_all) are stale afterwards.
+
+        undo_log:   optional UndoLog, the substitution can then be undone
         """
         occs = []
-        self.find_all(e, occs)
+        self.find_all(e, occs, table)
         for occ in occs:
+            if undo_log is not None:
+                undo_log.save(occ)
             occ._initialize(
                 name=copy.deepcopy(repl.name),
                 type=copy.deepcopy(repl.type),
@@ -626,6 +854,7 @@ class Term:
                 is_indexed_id=copy.deepcopy(repl.is_indexed_id),
                 parent=occ.parent,
             )
+            occ._add_parent_pointer()
 
     def __eq__(self, other):
         if not isinstance(other, Term):
@@ -659,59 +888,17 @@ class Term:
         return True
 
     def __get_subterm_str__(self):
-        subs_str = ""
-        length = len(self.subterms)
-        for i in range(length):
-            sb = self.subterms[i]
-            if i == length - 1:
-                subs_str += sb.__str__()
-            else:
-                subs_str += sb.__str__() + " "
-        return subs_str
+        chunks = []
+        for i, sub in enumerate(self.subterms):
+            if i > 0:
+                chunks.append(" ")
+            write_term(sub, chunks.append)
+        return "".join(chunks)
 
     def __str__(self):
-        if self.is_const or self.is_var or self.is_indexed_id:
-            return self.name
-
-        if self.quantifier:
-            subs_str = self.__get_subterm_str__()
-            n_vars = len(self.quantified_vars[0])
-            s = (
-                "("
-                + self.quantified_vars[0][0]
-                + " "
-                + self.quantified_vars[1][0]
-                + ")"
-            )
-            if len(self.quantified_vars[0]) > 1:
-                for i in range(1, n_vars):
-                    s += (
-                        " ("
-                        + self.quantified_vars[0][i]
-                        + " "
-                        + self.quantified_vars[1][i]
-                        + ")"
-                    )
-            return "(" + self.quantifier + " (" + s + ") " + subs_str + ")"
-
-        elif self.var_binders:
-            s = "(let ("
-            for i, var in enumerate(self.var_binders):
-                s += "(" + var + " " + self.let_terms[i].__str__() + ")"
-            s += ")"
-
-            for sub in self.subterms:
-                s += " " + sub.__str__()
-            return s + ")"
-
-        elif self.label:
-            subs_str = self.__get_subterm_str__()
-            return "(! "\
-                   + subs_str + " "\
-                   + self.label[0] + " " + self.label[1] + ")"
-        else:
-            subs_str = self.__get_subterm_str__()
-            return "(" + self.op.__str__() + " " + subs_str + ")"
+        chunks = []
+        write_term(self, chunks.append)
+        return "".join(chunks)
 
     def __repr__(self):
         if self.is_const:
@@ -719,3 +906,248 @@ class Term:
 
         if self.is_var:
             return self.name + ":" + self.type
+
+
+def write_term(term, write):
+    """
+    Write the SMT-LIB representation of term in chunks by calling write on
+    each chunk. The term is traversed with an explicit stack instead of
+    recursion, i.e., deeply nested terms do not hit the recursion limit.
+    """
+    todo = [term]
+    while todo:
+        item = todo.pop()
+        if isinstance(item, str):
+            write(item)
+            continue
+        if item.is_const or item.is_var or item.is_indexed_id:
+            write(item.name)
+            continue
+
+        # The chunks and subterms following the opening chunk are pushed
+        # in reverse order.
+        todo.append(")")
+        if item.quantifier:
+            qvars, qsorts = item.quantified_vars
+            push_subterms(item.subterms, todo, " ")
+            write(
+                "(" + item.quantifier + " ("
+                + " ".join(
+                    "(" + qvars[i] + " " + qsorts[i] + ")"
+                    for i in range(len(qvars))
+                )
+                + ") "
+            )
+        elif item.var_binders:
+            push_subterms(item.subterms, todo, " ", True)
+            todo.append(")")
+            for i in range(len(item.var_binders) - 1, -1, -1):
+                todo.append(")")
+                todo.append(item.let_terms[i])
+                todo.append("(" + item.var_binders[i] + " ")
+            write("(let (")
+        elif item.label:
+            todo.append(" " + item.label[0] + " " + item.label[1])
+            push_subterms(item.subterms, todo, " ")
+            write("(! ")
+        else:
+
+            # Most operators only have constants or variables as arguments,
+            # such terms are written at once.
+            names = [
+                sub if isinstance(sub, str) else sub.name
+                for sub in item.subterms
+                if isinstance(sub, str)
+                or sub.is_const or sub.is_var or sub.is_indexed_id
+            ]
+            if len(names) == len(item.subterms):
+                todo.pop()
+                write("(" + item.op.__str__() + " " + " ".join(names) + ")")
+                continue
+            push_subterms(item.subterms, todo, " ")
+            write("(" + item.op.__str__() + " ")
+
+
+def push_subterms(subterms, todo, sep, leading=False):
+    """
+    Push subterms separated by sep onto todo in reverse order.
+    """
+    for i in range(len(subterms) - 1, -1, -1):
+        todo.append(subterms[i])
+        if i > 0 or leading:
+            todo.append(sep)
+
+
+# Attribute values which can be used as dict keys as they are.
+ATOMIC_TYPES = (str, bool, int, type(None))
+
+
+class TermTable:
+    """
+    Hash-consing table for terms. Terms are interned bottom-up by their
+    structure, i.e., the attributes compared by Term.__eq__ and the ids of
+    their subterms. Structurally equal terms get the same id, so that they
+    can be compared in O(1) and collected in sets and dicts of ids. The
+    structural hash of every interned term is cached along with it.
+
+    Terms are mutable, hence a table is a snapshot: once a term (or one of
+    its subterms) has been changed, its id is stale and a fresh table has to
+    be used. For the same reason, terms themselves are not hashable, they
+    are hashed through a table (see TermTable.hash).
+    """
+
+    FIELDS = (
+        "name",
+        "type",
+        "is_const",
+        "is_var",
+        "label",
+        "indices",
+        "quantifier",
+        "quantified_vars",
+        "op",
+        "is_indexed_id",
+    )
+    get_fields = operator.attrgetter(*FIELDS)
+
+    def __init__(self):
+        self.ids = {}
+        self.hashes = []
+        self.terms = []
+        self.memo = {}
+
+    def intern(self, term):
+        """
+        :returns: id of term (Term or str)
+        """
+        known = self.memo.get(id(term))
+        if known is not None:
+            return known[1]
+        if not isinstance(term, Term):
+            return self._add((str, term), hash(term), term)
+
+        # Intern the subterms before the terms containing them.
+        order, todo = [], [term]
+        while todo:
+            node = todo.pop()
+            if id(node) not in self.memo:
+                order.append(node)
+                for sub in node.subterms or []:
+                    if isinstance(sub, Term):
+                        todo.append(sub)
+        for node in reversed(order):
+            if id(node) not in self.memo:
+                self.memo[id(node)] = (node, self._intern_node(node))
+        return self.memo[id(term)][1]
+
+    def hash(self, term):
+        """
+        :returns: structural hash of term, equal for all terms equal to term
+        """
+        return self.hashes[self.intern(term)]
+
+    def equal(self, t1, t2):
+        return self.intern(t1) == self.intern(t2)
+
+    def _intern_node(self, term):
+        fields = tuple(
+            value if type(value) in ATOMIC_TYPES else self._freeze(value)
+            for value in TermTable.get_fields(term)
+        )
+        children, child_hashes = None, None
+        if term.subterms is not None:
+            children = tuple(
+                self.memo[id(sub)][1] if isinstance(sub, Term)
+                else self.intern(sub)
+                for sub in term.subterms
+            )
+            child_hashes = tuple(self.hashes[child] for child in children)
+        return self._add(
+            (fields, children), hash((fields, child_hashes)), term
+        )
+
+    def _add(self, key, hash_value, term):
+        term_id = self.ids.get(key)
+        if term_id is None:
+            term_id = len(self.terms)
+            self.ids[key] = term_id
+            self.hashes.append(hash_value)
+            self.terms.append(term)
+        return term_id
+
+    def _freeze(self, value):
+        """
+        Hashable representation of an attribute value, equal for values that
+        compare equal.
+        """
+        if isinstance(value, (list, tuple)):
+            return (type(value), tuple(self._freeze(v) for v in value))
+        if isinstance(value, dict):
+            return (
+                dict,
+                frozenset((k, self._freeze(v)) for k, v in value.items()),
+            )
+        if isinstance(value, Term):
+
+            # E.g., the operator of an application of a declared function.
+            return (Term, self.intern(value))
+        if getattr(value, "__hash__", None) is None:
+
+            # Sorts such as (_ BitVec 8) are compared to their string
+            # representation, other sorts by their attributes.
+            if type(value).__str__ is not object.__str__:
+                return str(value)
+            return (type(value), self._freeze(vars(value)))
+        return value
+
+
+class UndoLog:
+    """
+    Log of in-place edits of terms, e.g., by the mutators (see
+    Term.substitute). The edits are rolled back in reverse order, i.e., in
+    O(number of edits), which restores the script without re-parsing or
+    copying it. Edits of other objects kept in sync with the terms (e.g.,
+    an index of the terms) are logged with the calls undoing them.
+    """
+
+    def __init__(self):
+        self.edits = []
+
+    def __len__(self):
+        return len(self.edits)
+
+    def save(self, term, attrs=Term.__slots__):
+        """
+        Log the values of the attributes of term before changing them.
+        """
+        for attr in attrs:
+            self.edits.append((term, attr, getattr(term, attr)))
+
+    def set(self, term, attr, value):
+        self.edits.append((term, attr, getattr(term, attr)))
+        setattr(term, attr, value)
+
+    def on_rollback(self, undo, *args):
+        """
+        Log a call of undo with args, made when rolling back the log.
+        """
+        self.edits.append((undo, None, args))
+
+    def rollback(self, mark=0):
+        """
+        Undo the edits logged after mark, the length of the log at that
+        time. By default, all edits are undone.
+        """
+        edits = self.edits
+        while len(edits) > mark:
+            term, attr, value = edits.pop()
+            if attr is None:
+                term(*value)
+            else:
+                setattr(term, attr, value)
+
+    def commit(self):
+        """
+        Keep the edits, they can no longer be undone.
+        """
+        self.edits = []
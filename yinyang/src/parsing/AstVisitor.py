@@ -52,6 +52,7 @@ from yinyang.src.parsing.Ast import (
     FunDecl,
     SMTLIBCommand,
 )
+from yinyang.src.parsing.Traversal import evaluate
 from yinyang.src.parsing.Types import (
     BITVECTOR_TYPE,
     INTEGER_TYPE,
@@ -280,7 +281,7 @@ class AstVisitor(SMTLIBv2Visitor):
             qtypes.append(qtype)
 
         for t in ctx.term():
-            subterms.append(self.visitTerm(t, local_vars))
+            subterms.append((yield (t, local_vars)))
         return Quantifier(quant, (qvars, qtypes), subterms)
 
     def visitSpec_constant(self, ctx: SMTLIBv2Parser.Spec_constantContext):
@@ -317,6 +318,16 @@ class AstVisitor(SMTLIBv2Visitor):
             return ctx.getText().encode("utf-8").decode("utf-8"), REGEXP_TYPE
 
     def visitTerm(self, ctx: SMTLIBv2Parser.TermContext, local_vars):
+        """
+        Subterms are visited with an explicit stack instead of recursion (see
+        Traversal.evaluate), visit_term yields the (ctx, local_vars) pairs of
+        the subterms.
+        """
+        return evaluate(
+            (ctx, local_vars), lambda node: self.visit_term(*node)
+        )
+
+    def visit_term(self, ctx: SMTLIBv2Parser.TermContext, local_vars):
         """
         term
         : spec_constant
@@ -373,7 +384,9 @@ class AstVisitor(SMTLIBv2Visitor):
             and ctx.term()
         ):
 
-            return self.handle_quantifier(ctx, "exists", local_vars)
+            return (
+                yield from self.handle_quantifier(ctx, "exists", local_vars)
+            )
 
         if (
             len(ctx.ParOpen()) == 2
@@ -383,7 +396,9 @@ class AstVisitor(SMTLIBv2Visitor):
             and ctx.term()
         ):
 
-            return self.handle_quantifier(ctx, "forall", local_vars)
+            return (
+                yield from self.handle_quantifier(ctx, "forall", local_vars)
+            )
 
         if (
             len(ctx.ParOpen()) == 2
@@ -398,10 +413,10 @@ class AstVisitor(SMTLIBv2Visitor):
             for b in ctx.var_binding():
                 local_vars[self.visitSymbol(b.symbol())] = "Unknown"
                 var_list.append(self.visitSymbol(b.symbol()))
-                terms.append(self.visitTerm(b.term(), local_vars))
+                terms.append((yield (b.term(), local_vars)))
             subterms = []
             for sub in ctx.term():
-                subterms.append(self.visitTerm(sub, local_vars=local_vars))
+                subterms.append((yield (sub, local_vars)))
             return LetBinding(var_list, terms, subterms=subterms)
 
         if (
@@ -414,7 +429,7 @@ class AstVisitor(SMTLIBv2Visitor):
             op = self.visitQual_identifier(ctx.qual_identifier(), local_vars)
             subterms = []
             for term in ctx.term():
-                subterms.append(self.visitTerm(term, local_vars))
+                subterms.append((yield (term, local_vars)))
             return Expr(op=op, subterms=subterms)
 
         if ctx.spec_constant():
@@ -0,0 +1,664 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import re
+
+from yinyang.src.parsing.Ast import (
+    Var,
+    Const,
+    Expr,
+    Quantifier,
+    LetBinding,
+    Maximize,
+    Minimize,
+    Pop,
+    Push,
+    DeclareConst,
+    DeclareFun,
+    Define,
+    DefineFun,
+    DefineFunsRec,
+    DefineConst,
+    Script,
+    AssertSoft,
+    Assert,
+    CheckSat,
+    CheckSatAssuming,
+    Simplify,
+    Display,
+    Eval,
+    GetValue,
+    FunDecl,
+    SMTLIBCommand,
+)
+from yinyang.src.parsing.Traversal import evaluate
+from yinyang.src.parsing.Types import (
+    BITVECTOR_TYPE,
+    INTEGER_TYPE,
+    REAL_TYPE,
+    STRING_TYPE,
+    BOOLEAN_TYPE,
+    REGEXP_TYPE,
+    sort2type,
+)
+
+
+class FastParserException(Exception):
+    pass
+
+
+# Characters outside of the printable range of the SMT-LIB grammar, they may
+# not occur in string literals and quoted symbols.
+NON_PRINTABLE = r"\x00-\x08\x0b\x0c\x0e-\x1f\x7f\U00010000-\U0010ffff"
+
+# Whitespace and comments, followed by a single token: a parenthesis, a string
+# literal, a quoted symbol or an atom (numeral, symbol, keyword, ...). The
+# token is empty at the end of the input. A lone '"' or '|' is an unterminated
+# string literal or quoted symbol.
+TOKEN_REGEX = re.compile(
+    r"(?:[ \t\r\n]+|;[^\r\n]*)*"
+    r"([()]"
+    r'|"(?:[^"' + NON_PRINTABLE + r']|"")*"'
+    r"|\|[^|\\" + NON_PRINTABLE + r"]*\|"
+    r'|[^ \t\r\n()";|]+'
+    r"|[\s\S])?"
+)
+
+SYMBOL_CHARS = r"a-zA-Z+=/*%?!$\-_~&^<>@.äÄöÖüÜ"
+
+ATOM_REGEX = re.compile(
+    r"(?P<numeral>0|[1-9][0-9]*)"
+    r"|(?P<decimal>(?:0|[1-9][0-9]*)\.[0-9]+)"
+    r"|(?P<hexadecimal>#x[0-9a-fA-F]+)"
+    r"|(?P<binary>#b[01]+)"
+    r"|(?P<symbol>[" + SYMBOL_CHARS + r"][0-9" + SYMBOL_CHARS + r"]*)"
+    r"|(?P<keyword>:[" + SYMBOL_CHARS + r"][0-9" + SYMBOL_CHARS + r"]*)"
+)
+
+CONST_TYPES = {
+    "numeral": INTEGER_TYPE,
+    "decimal": REAL_TYPE,
+    "hexadecimal": INTEGER_TYPE,
+    "binary": INTEGER_TYPE,
+    "string": STRING_TYPE,
+    "regconst": REGEXP_TYPE,
+}
+
+# Words with a token of their own in the grammar which are not symbols.
+RESERVED_WORDS = {
+    "assert", "assert-soft", "simplify", "check-sat", "check-sat-assuming",
+    "check-sat-using", "labels", "minimize", "maximize", "declare-const",
+    "declare-datatype", "declare-codatatype", "declare-datatypes",
+    "declare-codatatypes", "declare-fun", "declare-sort", "define",
+    "define-fun", "define-const", "define-fun-rec", "define-funs-rec",
+    "define-sort", "display", "echo", "eval", "exit", "get-objectives",
+    "get-assertions", "get-assignment", "get-info", "get-model",
+    "block-model", "get-option", "poly/factor", "get-proof",
+    "get-unsat-assumptions", "get-unsat-core", "get-value", "pop", "push",
+    "reset", "reset-assertions", "set-info", "set-logic", "set-option",
+    "then", "and-then", "par-then", "or-else", "par-or-else", "par-or",
+    "try-for", "using-params", "!", "_", "as", "BINARY", "DECIMAL", "exists",
+    "HEXADECIMAL", "forall", "let", "match", "NUMERAL", "par",
+}
+
+REGEXP_CONSTANTS = {"re.none", "re.all", "re.allchar"}
+
+PREDEFINED_KEYWORDS = {
+    ":all-statistics", ":assertion-stack-levels", ":authors", ":category",
+    ":chainable", ":definition", ":diagnostic-output-channel",
+    ":error-behavior", ":extensions", ":funs", ":funs-description",
+    ":global-declarations", ":interactive-mode", ":language", ":left-assoc",
+    ":license", ":named", ":name", ":notes", ":pattern", ":print-success",
+    ":produce-assertions", ":produce-assignments", ":produce-models",
+    ":produce-proofs", ":produce-unsat-assumptions", ":produce-unsat-cores",
+    ":random-seed", ":reason-unknown", ":regular-output-channel",
+    ":reproducible-resource-limit", ":right-assoc", ":smt-lib-version",
+    ":sorts", ":sorts-description", ":source", ":status", ":theories",
+    ":values", ":verbosity", ":version",
+}
+
+# Commands without arguments which are kept as SMTLIBCommand.
+NULLARY_COMMANDS = {
+    "exit", "get-objectives", "get-assertions", "get-assignment",
+    "get-model", "block-model", "get-proof", "get-unsat-assumptions",
+    "get-unsat-core", "reset", "reset-assertions", "labels",
+}
+
+
+def atom_kind(atom):
+    """
+    :returns: the lexical category of an atom as the ANTLR lexer would
+              tokenize it, "invalid" if the lexer would not produce a single
+              token for it.
+    """
+    if atom[0] == '"':
+        return "string"
+    if atom[0] == "|":
+        return "symbol"
+    m = ATOM_REGEX.fullmatch(atom)
+    if not m:
+        return "invalid"
+    kind = m.lastgroup
+    if kind == "symbol":
+        if atom in RESERVED_WORDS:
+            return "reserved"
+        if atom in REGEXP_CONSTANTS:
+            return "regconst"
+    elif kind == "keyword" and atom not in PREDEFINED_KEYWORDS:
+
+        # The lexer splits ':named-x' into ':named' and 'named-x'.
+        if atom[1:] in RESERVED_WORDS or atom[1:] in REGEXP_CONSTANTS:
+            return "invalid"
+        for keyword in PREDEFINED_KEYWORDS:
+            if atom.startswith(keyword):
+                return "invalid"
+    return kind
+
+
+class FastParser:
+    """
+    Hand-written parser for SMT-LIB scripts, an alternative to the ANTLR
+    generated parser and AstVisitor. It builds the same Script and Term
+    objects as AstVisitor, including its quirks, and is many times faster.
+
+    The parser only accepts scripts that the ANTLR parser accepts without
+    errors and that AstVisitor translates without an exception. On any other
+    input it raises a FastParserException, and the ANTLR parser is used
+    instead (see Parse.py).
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.global_vars = {}
+        self.kinds = {}
+
+    def fail(self, node, msg="unsupported syntax"):
+        raise FastParserException(msg + ": " + str(node)[:80])
+
+    def kind(self, atom):
+        kind = self.kinds.get(atom)
+        if kind is None:
+            kind = self.kinds[atom] = atom_kind(atom)
+        return kind
+
+    def parse_script(self):
+        """
+        :returns: Script object of the SMT-LIB script
+        """
+        cmds = []
+        for node, start, end in self.read_commands():
+            cmds.append(self.command(node, start, end))
+        return Script(cmds, self.global_vars)
+
+    def read_commands(self):
+        """
+        Tokenize the text and group the tokens by parentheses.
+
+        :returns: list of (node, start, end) triples, one per top-level
+                  command, where node is the list of the command's atoms
+                  (str) and nested lists and start, end are the command's
+                  position in the text.
+        """
+        text = self.text
+        cmds, stack = [], []
+        node, start = None, 0
+        for m in TOKEN_REGEX.finditer(text):
+            tok = m.group(1)
+            if tok is None:
+                break
+            c = tok[0]
+            if c == "(":
+                child = []
+                if node is None:
+                    start = m.start(1)
+                else:
+                    node.append(child)
+                    stack.append(node)
+                node = child
+            elif c == ")":
+                if node is None:
+                    self.fail(tok, "unbalanced parentheses")
+                if stack:
+                    node = stack.pop()
+                else:
+                    cmds.append((node, start, m.end(1)))
+                    node = None
+            else:
+                if node is None:
+                    self.fail(tok, "token outside of a command")
+                if len(tok) == 1 and (c == '"' or c == "|"):
+                    self.fail(tok, "unterminated literal")
+                if c == "b" and tok.startswith("bv"):
+
+                    # The grammar has a token ' bv' (for '(_ bvX n)') which
+                    # is produced wherever a single space precedes 'bv'. The
+                    # space is kept to tell such atoms apart.
+                    pos = m.start(1)
+                    if text[pos - 1: pos] == " " and (
+                        pos == 1 or text[pos - 2] not in " \t\r\n"
+                    ):
+                        tok = " " + tok
+                node.append(tok)
+        if node is not None:
+            self.fail(text[start: start + 80], "unbalanced parentheses")
+        return cmds
+
+    def command(self, node, start, end):
+        if not node or not isinstance(node[0], str):
+            self.fail(node)
+        name, args = node[0], node[1:]
+        n = len(args)
+
+        if name == "assert" and n == 1:
+            return Assert(self.term(args[0], {}))
+        if name == "assert-soft" and n >= 1:
+            return AssertSoft(
+                self.term(args[0], {}), self.attributes(args[1:])
+            )
+        if name == "simplify" and n >= 1:
+            return Simplify(self.term(args[0], {}), self.attributes(args[1:]))
+        if name == "minimize" and n == 1:
+            return Minimize(self.term(args[0], {}))
+        if name == "maximize" and n == 1:
+            return Maximize(self.term(args[0], {}))
+        if name == "display" and n == 1:
+            return Display(self.term(args[0], {}))
+        if name == "eval" and n == 1:
+            return Eval(self.term(args[0], {}))
+        if name == "declare-const" and n == 2:
+            var = self.symbol(args[0])
+            self.global_vars[var] = self.sort(args[1])
+            return DeclareConst(var, sort2type(self.sort(args[1])))
+        if name == "declare-fun" and n == 3 and isinstance(args[1], list):
+            identifier = self.symbol(args[0])
+            input_sorts = " ".join([self.sort(s) for s in args[1]])
+            output_sort = self.sort(args[2])
+            self.add_to_globals(identifier, input_sorts, output_sort)
+            return DeclareFun(identifier, input_sorts, output_sort)
+        if name == "define" and n == 2:
+            return Define(self.symbol(args[0]), self.term(args[1], {}))
+        if name == "define-const" and n == 3:
+            return DefineConst(
+                self.symbol(args[0]),
+                self.sort(args[1]),
+                self.term(args[2], {})
+            )
+        if name == "define-fun" and n == 4 and isinstance(args[1], list):
+            sorted_vars = " ".join([self.sorted_var(v) for v in args[1]])
+            identifier = self.symbol(args[0])
+            self.add_to_globals(identifier, sorted_vars, self.sort(args[2]))
+            return DefineFun(
+                identifier,
+                sorted_vars,
+                self.sort(args[2]),
+                self.term(args[3], {})
+            )
+        if name == "define-funs-rec" and n == 2:
+            decls, terms = self.nonempty(args[0]), self.nonempty(args[1])
+            return DefineFunsRec(
+                [self.function_dec(d) for d in decls],
+                [self.term(t, {}) for t in terms],
+            )
+        if name == "check-sat":
+            terms = [self.term(t, {}) for t in args]
+            if len(terms) > 0:
+                return CheckSat(terms)
+            return CheckSat()
+        if name == "check-sat-assuming" and n == 1:
+            if not isinstance(args[0], list):
+                self.fail(node)
+            return CheckSatAssuming([self.term(t, {}) for t in args[0]])
+        if name == "get-value" and n == 1:
+            return GetValue([self.term(t, {}) for t in self.nonempty(args[0])])
+        if name == "push" or name == "pop":
+
+            # AstVisitor drops the numeral of push and pop.
+            if n > 1 or (n == 1 and self.kind_of(args[0]) != "numeral"):
+                self.fail(node)
+            return Push() if name == "push" else Pop()
+
+        self.check_command(name, args)
+        return SMTLIBCommand(self.text[start:end])
+
+    def check_command(self, name, args):
+        """
+        Check the syntax of commands AstVisitor keeps as plain text.
+        """
+        n = len(args)
+        if name in NULLARY_COMMANDS and n == 0:
+            return
+        if name == "set-info" or name == "set-option":
+            if len(self.attributes(args, True)) == 1:
+                return
+        elif name == "set-logic" and n == 1:
+            self.symbol(args[0])
+            return
+        elif name == "declare-sort" and n in (1, 2):
+            self.symbol(args[0])
+            if n == 1 or self.kind_of(args[1]) == "numeral":
+                return
+        elif name == "define-sort" and n == 3 and isinstance(args[1], list):
+            self.symbol(args[0])
+            for param in args[1]:
+                self.symbol(param)
+            self.sort(args[2])
+            return
+        elif name in ("declare-datatype", "declare-codatatype") and n == 2:
+            self.symbol(args[0])
+            self.datatype_dec(args[1])
+            return
+        elif name == "declare-datatypes" and n == 2:
+            for sort_dec in self.nonempty(args[0]):
+                if not isinstance(sort_dec, list) or len(sort_dec) != 2:
+                    self.fail(sort_dec)
+                self.symbol(sort_dec[0])
+                if self.kind_of(sort_dec[1]) != "numeral":
+                    self.fail(sort_dec)
+            for datatype_dec in self.nonempty(args[1]):
+                self.datatype_dec(datatype_dec)
+            return
+        elif name == "echo" and n >= 1:
+            for arg in args:
+                if self.kind_of(arg) != "string":
+                    self.symbol(arg)
+            return
+        elif name in ("get-info", "get-option") and n == 1:
+            if self.kind_of(args[0]) == "keyword":
+                return
+        self.fail([name] + args)
+
+    def datatype_dec(self, node):
+        node = self.nonempty(node)
+        if node[0] == "par":
+            if len(node) != 3:
+                self.fail(node)
+            for param in self.nonempty(node[1]):
+                self.symbol(param)
+            node = self.nonempty(node[2])
+        for constructor in node:
+            if not isinstance(constructor, list) or not constructor:
+                self.fail(constructor)
+            self.symbol(constructor[0])
+            for selector in constructor[1:]:
+                if not isinstance(selector, list) or len(selector) != 2:
+                    self.fail(selector)
+                self.symbol(selector[0])
+                self.sort(selector[1])
+
+    def nonempty(self, node):
+        if not isinstance(node, list) or not node:
+            self.fail(node)
+        return node
+
+    def kind_of(self, node):
+        return "list" if isinstance(node, list) else self.kind(node)
+
+    def add_to_globals(self, identifier, input_sorts, output_sort):
+        if len(input_sorts) == 0:
+            self.global_vars[identifier] = sort2type(output_sort)
+        else:
+            self.global_vars[identifier] = sort2type(
+                input_sorts + " " + output_sort
+            )
+
+    def symbol(self, node):
+        if isinstance(node, list) or self.kind(node) != "symbol":
+            self.fail(node, "expected symbol")
+        return node
+
+    def index(self, node):
+        if isinstance(node, list) or self.kind(node) not in (
+            "numeral", "symbol"
+        ):
+            self.fail(node, "expected index")
+        return node
+
+    def indexed_name(self, node):
+        """
+        :returns: the name of the indexed identifier (_ symbol index+)
+        """
+        if len(node) < 3 or node[0] != "_":
+            self.fail(node)
+        return (
+            "(_ " + self.symbol(node[1]) + " "
+            + " ".join([self.index(i) for i in node[2:]]) + ")"
+        )
+
+    def sort(self, node):
+        if isinstance(node, list):
+            if node and node[0] == "_":
+                name = self.indexed_name(node)
+            else:
+                if len(node) < 2:
+                    self.fail(node, "expected sort")
+                return (
+                    "(" + self.sort_identifier(node[0]) + " "
+                    + " ".join([self.sort(s) for s in node[1:]]) + ")"
+                )
+        else:
+            name = self.symbol(node)
+
+        # AstVisitor resolves sorts like identifiers of terms.
+        if name in self.global_vars:
+            self.fail(node, "sort shadowed by a variable")
+        return name
+
+    def sort_identifier(self, node):
+        if isinstance(node, list):
+            name = self.indexed_name(node)
+        else:
+            name = self.symbol(node)
+        if name in self.global_vars:
+            self.fail(node, "sort shadowed by a variable")
+        return name
+
+    def sorted_var(self, node):
+        if not isinstance(node, list) or len(node) != 2:
+            self.fail(node, "expected sorted variable")
+        return "(" + self.symbol(node[0]) + " " + self.sort(node[1]) + ")"
+
+    def function_dec(self, node):
+        if (
+            not isinstance(node, list)
+            or len(node) != 3
+            or not isinstance(node[1], list)
+        ):
+            self.fail(node, "expected function declaration")
+        sorted_vars = [self.sorted_var(v) for v in node[1]]
+        return FunDecl(self.symbol(node[0]), sorted_vars, self.sort(node[2]))
+
+    def attributes(self, nodes, optional_values=False):
+        """
+        :returns: list of (keyword, value) pairs of the attributes in nodes,
+                  values are concatenated tokens as by ANTLR's getText.
+        """
+        attrs, i = [], 0
+        while i < len(nodes):
+            keyword = nodes[i]
+            if self.kind_of(keyword) != "keyword":
+                self.fail(keyword, "expected keyword")
+            i += 1
+            if i < len(nodes) and self.kind_of(nodes[i]) != "keyword":
+                attrs.append((keyword, self.attribute_value(nodes[i])))
+                i += 1
+            elif optional_values:
+                attrs.append((keyword, None))
+            else:
+
+                # AstVisitor fails on attributes without value.
+                self.fail(keyword, "attribute without value")
+        return attrs
+
+    def attribute_value(self, node):
+        if isinstance(node, list):
+            return self.s_expr(node)
+        kind = self.kind(node)
+        if kind == "keyword" or kind == "reserved" or kind == "invalid":
+            self.fail(node, "expected attribute value")
+        return node
+
+    def s_expr(self, node):
+        if not isinstance(node, list):
+            if self.kind(node) in ("reserved", "invalid"):
+                self.fail(node, "expected s-expression")
+            return node
+        if node and node[0] == "_":
+            self.bitvector_const(node)
+            return "(" + "".join(node) + ")"
+        return "(" + "".join([self.s_expr(n) for n in node]) + ")"
+
+    def bitvector_const(self, node):
+        """
+        Match a bit-vector constant (_ bvX n) with the ' bv' token.
+
+        :returns: X, n
+        """
+        if (
+            len(node) != 3
+            or not isinstance(node[1], str)
+            or not node[1].startswith(" bv")
+            or self.kind(node[1][3:]) != "numeral"
+            or self.kind_of(node[2]) != "numeral"
+        ):
+            self.fail(node)
+        return node[1][3:], node[2]
+
+    def term(self, node, local_vars):
+        """
+        :returns: term of the s-expression node. Nested terms are built with
+                  an explicit stack instead of recursion (see
+                  Traversal.evaluate).
+        """
+        if not isinstance(node, list):
+            return self.atom_term(node, local_vars)
+        return evaluate((node, local_vars), self.term_step)
+
+    def term_step(self, item):
+        node, local_vars = item
+        if not isinstance(node, list):
+            return self.atom_term(node, local_vars)
+        return self.compound_term(node, local_vars)
+
+    def atom_term(self, node, local_vars):
+        kind = self.kind(node)
+        if kind == "symbol":
+            if node == "true" or node == "false":
+                return Const(name=node, type=BOOLEAN_TYPE)
+            return self.identifier(node, node, local_vars)
+        if kind not in CONST_TYPES:
+            self.fail(node, "expected term")
+        return Const(name=node, type=CONST_TYPES[kind])
+
+    def compound_term(self, node, local_vars):
+        """
+        Generator building the term of the list node, yields the (node,
+        local_vars) pairs of the nested terms it needs.
+        """
+        if len(node) < 2:
+            self.fail(node, "expected term")
+        head = node[0]
+
+        if isinstance(head, list):
+            op = self.identifier(head, self.indexed_name(head), local_vars)
+            subterms = yield from self.subterms(node, local_vars)
+            return Expr(op=op, subterms=subterms)
+
+        if head == "_":
+            if (
+                len(node) == 3
+                and isinstance(node[1], str)
+                and node[1].startswith(" bv")
+            ):
+                X, n = self.bitvector_const(node)
+                return Const(
+                    name="(_ bv" + X + " " + n + ")",
+                    type=BITVECTOR_TYPE(int(n))
+                )
+            if len(node) == 3 and self.kind_of(node[2]) == "numeral":
+                bitwidth = self.symbol(node[1]).strip("bv")
+                return Const(name="(_ bv" + bitwidth + " " + node[2] + ")")
+            return self.identifier(node, self.indexed_name(node), local_vars)
+
+        if head == "forall" or head == "exists":
+            if len(node) != 3:
+                self.fail(node)
+            qvars, qtypes = [], []
+            for sorted_var in self.nonempty(node[1]):
+                if not isinstance(sorted_var, list) or len(sorted_var) != 2:
+                    self.fail(sorted_var, "expected sorted variable")
+                qvar = self.symbol(sorted_var[0])
+                qtype = self.sort(sorted_var[1])
+                local_vars[qvar] = qtype
+                qvars.append(qvar)
+                qtypes.append(qtype)
+            body = yield (node[2], local_vars)
+            return Quantifier(head, (qvars, qtypes), [body])
+
+        if head == "let":
+            if len(node) != 3:
+                self.fail(node)
+            terms = []
+            var_list = []
+            for binding in self.nonempty(node[1]):
+                if not isinstance(binding, list) or len(binding) != 2:
+                    self.fail(binding, "expected variable binding")
+                var = self.symbol(binding[0])
+                local_vars[var] = "Unknown"
+                var_list.append(var)
+                terms.append((yield (binding[1], local_vars)))
+            body = yield (node[2], local_vars)
+            return LetBinding(var_list, terms, subterms=[body])
+
+        op = self.identifier(head, self.symbol(head), local_vars)
+        subterms = yield from self.subterms(node, local_vars)
+        return Expr(op=op, subterms=subterms)
+
+    def subterms(self, node, local_vars):
+        """
+        Generator building the subterms of node. Atoms are handled right
+        away, only nested lists are yielded.
+        """
+        subterms = []
+        for t in node[1:]:
+            if isinstance(t, list):
+                subterms.append((yield (t, local_vars)))
+            else:
+                subterms.append(self.atom_term(t, local_vars))
+        return subterms
+
+    def identifier(self, node, name, local_vars):
+        """
+        :returns: Var if the identifier is a local or global variable,
+                  otherwise its name
+        """
+        is_indexed_id = isinstance(node, list)
+        if name in local_vars:
+            return Var(
+                name=name, type=local_vars[name], is_indexed_id=is_indexed_id
+            )
+        if name in self.global_vars:
+            return Var(
+                name=name,
+                type=self.global_vars[name],
+                is_indexed_id=is_indexed_id
+            )
+        return name
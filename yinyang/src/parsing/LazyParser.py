@@ -0,0 +1,283 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import re
+
+from antlr4.CommonTokenStream import CommonTokenStream
+from antlr4.InputStream import InputStream
+
+from yinyang.src.parsing.Ast import Assert, LazyAssert, LazyScript
+from yinyang.src.parsing.AstVisitor import AstVisitor
+from yinyang.src.parsing.FastParser import FastParser, FastParserException
+from yinyang.src.parsing.SMTLIBv2Lexer import SMTLIBv2Lexer
+from yinyang.src.parsing.SMTLIBv2Parser import SMTLIBv2Parser
+
+# Commands removed by prepare_seed, identified by their head symbol.
+DROPPED_COMMANDS = {
+    b"set-info", b"set-logic", b"get-model", b"get-assertions",
+    b"get-proof", b"get-unsat-assumptions", b"get-unsat-core",
+    b"get-value", b"echo", b"simplify",
+}
+
+# Parentheses and the characters starting string literals, quoted symbols
+# and comments, everything in between is skipped when splitting a script.
+SPLIT_REGEX = re.compile(rb'[()";|]')
+
+HEAD_REGEX = re.compile(rb'\([ \t\r\n]*([^ \t\r\n()";|]*)')
+
+COMMENT_END_REGEX = re.compile(rb"[\r\n]|$")
+
+
+def command_regex(depth):
+    """
+    :returns: regex matching a command nested up to depth without string
+              literals, quoted symbols and comments
+    """
+    inner = rb'[^()";|]*'
+    for _ in range(depth - 1):
+        inner = rb'(?:[^()";|]|\(' + inner + rb'\))*'
+    return re.compile(rb"\(" + inner + rb"\)")
+
+
+# Most commands are matched at once, the others are split by the loop over
+# SPLIT_REGEX matches.
+COMMAND_REGEX = command_regex(16)
+
+
+def split_commands(data):
+    """
+    Split an SMT-LIB script into its top-level commands without tokenizing
+    them, only parentheses, string literals, quoted symbols and comments are
+    recognized.
+
+    :data: SMT-LIB script (bytes-like, e.g., a memory map)
+    :returns: list of (head, start, end) triples, one per command, where
+              head is the command's first symbol (bytes) and start, end its
+              position in data
+    """
+    cmds = []
+    depth, start, pos = 0, 0, 0
+    search = SPLIT_REGEX.search
+    while True:
+        m = search(data, pos)
+        if m is None:
+            break
+        c, pos = m.group(), m.end()
+
+        # Only whitespace and comments may occur between commands.
+        if depth == 0 and data[start: m.start()].strip():
+            raise FastParserException("token outside of a command")
+        if c == b"(":
+            if depth == 0:
+                start = m.start()
+                cmd = COMMAND_REGEX.match(data, start)
+                if cmd is not None:
+                    pos = cmd.end()
+                    head = HEAD_REGEX.match(data, start).group(1)
+                    cmds.append((head, start, pos))
+                    start = pos
+                    continue
+            depth += 1
+        elif c == b")":
+            depth -= 1
+            if depth == 0:
+                head = HEAD_REGEX.match(data, start).group(1)
+                cmds.append((head, start, pos))
+                start = pos
+            elif depth < 0:
+                raise FastParserException("unbalanced parentheses")
+        elif c == b";":
+            pos = COMMENT_END_REGEX.search(data, pos).start()
+            if depth == 0:
+                start = pos
+        elif depth == 0:
+            raise FastParserException("token outside of a command")
+        elif c == b'"':
+
+            # Quotes within string literals are escaped by doubling them.
+            end = data.find(b'"', pos)
+            while end != -1 and data[end + 1: end + 2] == b'"':
+                end = data.find(b'"', end + 2)
+            if end == -1:
+                raise FastParserException("unterminated literal")
+            pos = end + 1
+        else:
+            end = data.find(b"|", pos)
+            if end == -1:
+                raise FastParserException("unterminated literal")
+            pos = end + 1
+    if depth != 0 or data[start:].strip():
+        raise FastParserException("unbalanced parentheses")
+    return cmds
+
+
+class GlobalsLog(dict):
+    """
+    Global variables of a script which also logs each declaration with the
+    position of the declaring command, see GlobalsView.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.declarations = {}
+        self.position = 0
+
+    def __setitem__(self, name, type):
+        super().__setitem__(name, type)
+        self.declarations.setdefault(name, []).append((self.position, type))
+
+
+class GlobalsView:
+    """
+    Read-only view of the global variables declared before a position of the
+    script, i.e., the global variables the parser had seen when reaching it.
+    """
+
+    __slots__ = ("declarations", "position")
+
+    def __init__(self, declarations, position):
+        self.declarations = declarations
+        self.position = position
+
+    def get(self, name, default=None):
+        for position, type in reversed(self.declarations.get(name, ())):
+            if position < self.position:
+                return type
+        return default
+
+    def __contains__(self, name):
+        return self.get(name, GlobalsView) is not GlobalsView
+
+    def __getitem__(self, name):
+        type = self.get(name, GlobalsView)
+        if type is GlobalsView:
+            raise KeyError(name)
+        return type
+
+    def to_dict(self):
+        return {
+            name: self[name] for name in self.declarations if name in self
+        }
+
+
+class LazySource:
+    """
+    The text of a lazily parsed script, from which the LazyAssert commands
+    parse their terms. It is not changed after loading, so copies of a
+    script share it.
+    """
+
+    def __init__(self, data, declarations):
+        self.data = data
+        self.declarations = declarations
+        self.kinds = {}
+
+    def __deepcopy__(self, memo):
+        return self
+
+    # A memory-mapped text (see MmapStream.map_file) is pickled as bytes.
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        if not isinstance(self.data, bytes):
+            state["data"] = self.data[:]
+        return state
+
+    def text(self, start, end):
+        return self.data[start:end].decode("utf8")
+
+    def term(self, start, end):
+        """
+        :returns: term of the assert command at start, end. Asserts the
+                  hand-written parser does not handle are parsed with the
+                  ANTLR parser.
+        """
+        text = self.text(start, end)
+        parser = FastParser(text)
+        parser.global_vars = GlobalsView(self.declarations, start)
+        parser.kinds = self.kinds
+        try:
+            cmds = parser.read_commands()
+            if len(cmds) != 1:
+                parser.fail(text)
+            cmd = parser.command(*cmds[0])
+            if not isinstance(cmd, Assert):
+                parser.fail(text)
+            return cmd.term
+        except FastParserException:
+            return antlr_term(text, parser.global_vars.to_dict())
+
+
+def antlr_term(text, global_vars):
+    """
+    :returns: term of the assert command text parsed with the ANTLR parser
+    """
+    lexer = SMTLIBv2Lexer(InputStream(text))
+    lexer.removeErrorListeners()
+    parser = SMTLIBv2Parser(CommonTokenStream(lexer))
+    parser.removeErrorListeners()
+    vis = AstVisitor()
+    vis.global_vars = global_vars
+    script = vis.visitStart(parser.start())
+    if len(script.commands) != 1 or not isinstance(
+        script.commands[0], Assert
+    ):
+        raise FastParserException("expected assert: " + text[:80])
+    return script.commands[0].term
+
+
+def generate_ast_lazy(data, prep_seed=True):
+    """
+    Same as generate_ast_fast but parsing the terms of assert commands only
+    when they are accessed (see LazyAssert). The script is first split into
+    its commands, with prep_seed the commands removed by prepare_seed are
+    dropped by their head symbol, without parsing them. The other commands
+    are parsed right away.
+
+    :data: SMT-LIB script (bytes or a memory map of a file, which the script
+           keeps using)
+    :returns: same as generate_ast_fast
+    """
+    global_vars = GlobalsLog()
+    source = LazySource(data, global_vars.declarations)
+    parser = FastParser("")
+    parser.global_vars = global_vars
+    parser.kinds = source.kinds
+
+    split = split_commands(data)
+    if len(split) == 0:
+        return None
+
+    cmds = []
+    for head, start, end in split:
+        if prep_seed and head in DROPPED_COMMANDS:
+            continue
+        if head == b"assert":
+            cmds.append(LazyAssert(source, start, end))
+            continue
+        parser.text = source.text(start, end)
+        global_vars.position = start
+        nodes = parser.read_commands()
+        if len(nodes) != 1:
+            parser.fail(parser.text)
+        cmds.append(parser.command(*nodes[0]))
+    global_vars = dict(global_vars)
+    return LazyScript(cmds, global_vars), global_vars
@@ -0,0 +1,103 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import re
+import mmap
+
+from antlr4.FileStream import FileStream
+from antlr4.InputStream import InputStream
+
+NON_ASCII_REGEX = re.compile(rb"[^\x00-\x7f]")
+
+
+def map_file(fn):
+    """
+    Map the file fn into memory instead of reading it. The file must not be
+    changed while the map is in use.
+
+    :returns: read-only mmap of the file, None if the file is empty (which
+              cannot be mapped)
+    """
+    with open(fn, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def read_text(fn):
+    """
+    :returns: content of the UTF-8 encoded file fn, decoded from a memory
+              map, i.e., without an intermediate copy of the file's bytes
+    """
+    data = map_file(fn)
+    if data is None:
+        return ""
+    try:
+        with memoryview(data) as view:
+            return str(view, "utf8")
+    finally:
+        data.close()
+
+
+class MmapStream(InputStream):
+    """
+    ANTLR input stream of an ASCII file backed by a memory map. ANTLR's
+    FileStream keeps the content of a file as a string and as a list of its
+    code points, i.e., about ten bytes per character, whereas a map only
+    uses the (shared, evictable) page cache. In an ASCII file, the
+    characters are the bytes, so the map can replace the list of code
+    points.
+    """
+
+    def __init__(self, data, fn):
+        self.name = fn
+        self.strdata = None
+        self.data = data
+        self._index = 0
+        self._size = len(data)
+
+    def getText(self, start, stop):
+        if stop >= self._size:
+            stop = self._size - 1
+        if start >= self._size:
+            return ""
+        return self.data[start: stop + 1].decode("ascii")
+
+    def close(self):
+        self.data.close()
+
+    def __str__(self):
+        return self.data[:].decode("ascii")
+
+
+def open_stream(fn):
+    """
+    :returns: MmapStream of the file fn, a FileStream if the file is empty
+              or not ASCII. Close the MmapStream after parsing.
+    """
+    data = map_file(fn)
+    if data is None or NON_ASCII_REGEX.search(data):
+        if data is not None:
+            data.close()
+        return FileStream(fn, encoding="utf8")
+    return MmapStream(data, fn)
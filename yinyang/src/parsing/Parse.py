@@ -20,23 +20,39 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import re
 import sys
-import traceback
 import logging
+import warnings
+import traceback
 
 from antlr4.error.ErrorListener import ErrorListener
 
 from yinyang.src.parsing.SMTLIBv2Lexer import SMTLIBv2Lexer
 from yinyang.src.parsing.SMTLIBv2Parser import SMTLIBv2Parser
-from yinyang.src.parsing.TimeoutDecorator import exit_after
 from yinyang.src.parsing.AstVisitor import AstVisitor
+from yinyang.src.parsing.Ast import GetValue, Simplify, SMTLIBCommand
+from yinyang.src.parsing.FastParser import FastParser
+from yinyang.src.parsing.LazyParser import generate_ast_lazy
+from yinyang.src.parsing.MmapStream import (
+    MmapStream,
+    map_file,
+    open_stream,
+    read_text,
+)
 
 from antlr4.CommonTokenStream import CommonTokenStream
-from antlr4.FileStream import FileStream
 from antlr4.InputStream import InputStream
 
 sys.setrecursionlimit(100000)
 
+# Parser backends: "fast" is the hand-written parser of FastParser.py, it
+# falls back to the ANTLR parser on scripts it does not handle. "lazy" splits
+# the script into commands and parses the asserts on demand (LazyParser.py),
+# it falls back to "fast". "antlr" only uses the ANTLR parser.
+BACKENDS = ["fast", "lazy", "antlr"]
+DEFAULT_BACKEND = "fast"
+
 
 class ErrorListener(ErrorListener):
     def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
@@ -44,6 +60,34 @@ class ErrorListener(ErrorListener):
                       % (line, column), flush=True)
 
 
+# Commands removed by prepare_seed.
+DROPPED_COMMANDS = {
+    "set-info", "set-logic", "get-model", "get-assertions", "get-proof",
+    "get-unsat-assumptions", "get-unsat-core", "get-value", "echo",
+    "simplify",
+}
+
+HEAD_REGEX = re.compile(r'[ \t\r\n]*\([ \t\r\n]*([^ \t\r\n()";|]*)')
+
+
+def is_dropped_text_command(cmd):
+    m = HEAD_REGEX.match(cmd.cmd_str)
+    return m is not None and m.group(1) in DROPPED_COMMANDS
+
+
+def drop_command(cmd):
+    return True
+
+
+# The filters of prepare_seed by command class. A filter returns True if the
+# command is removed, commands of other classes are kept.
+DROP_FILTERS = {
+    GetValue: drop_command,
+    Simplify: drop_command,
+    SMTLIBCommand: is_dropped_text_command,
+}
+
+
 def prepare_seed(formula):
     """
     Prepare seed script for fuzzing. Remove set-logic, set-info and other
@@ -58,32 +102,15 @@ def prepare_seed(formula):
     soundness issues being ignored, e.g. if the error occurred after a faulty
     check-sat result. Hence, we remove all output-producing SMT-LIB commands
     from the script.
+
+    The commands are recognized by their class (see DROP_FILTERS) and
+    commands kept as text by their head symbol, i.e., commands are not
+    printed and asserts are never removed.
     """
     new_cmds = []
     for cmd in formula.commands:
-        if "set-info" in cmd.__str__():
-            continue
-        if "set-logic" in cmd.__str__():
-            continue
-
-        # Ignore output-producing commands to make sure the detection logic
-        # won't be mislead
-        #
-        if "get-model" in cmd.__str__():
-            continue
-        if "get-assertions" in cmd.__str__():
-            continue
-        if "get-proof" in cmd.__str__():
-            continue
-        if "get-unsat-assumptions" in cmd.__str__():
-            continue
-        if "get-unsat-core" in cmd.__str__():
-            continue
-        if "get-value" in cmd.__str__():
-            continue
-        if "echo" in cmd.__str__():
-            continue
-        if "simplify" in cmd.__str__():
+        drop = DROP_FILTERS.get(type(cmd))
+        if drop is not None and drop(cmd):
             continue
         new_cmds.append(cmd)
 
@@ -110,42 +137,97 @@ def generate_ast(stream, prep_seed=True):
     return prepare_seed(formula) if prep_seed else formula, vis.global_vars
 
 
-def parse_filestream(fn, timeout_limit):
-    @exit_after(timeout_limit)
-    def _parse_filestream(fn):
-        fstream = FileStream(fn, encoding="utf8")
-        ast, globs = generate_ast(fstream)
-        return ast, globs
+def generate_ast_fast(text, prep_seed=True):
+    """
+    Same as generate_ast but using the hand-written parser.
+
+    :text: SMT-LIB script (str)
+    :returns: same as generate_ast, raises an exception if the fast parser
+              does not handle the script
+    """
+    parser = FastParser(text)
+    formula = parser.parse_script()
 
-    return _parse_filestream(fn)
+    if len(formula.commands) == 0:
+        return None
 
+    return prepare_seed(formula) if prep_seed else formula, parser.global_vars
 
-def parse_inputstream(s, timeout_limit):
-    @exit_after(timeout_limit)
-    def _parse_inputstream(s):
-        istream = InputStream(s)
-        ast, globs = generate_ast(istream)
-        return ast, globs
 
-    return _parse_inputstream(s)
+def try_fast_parser(text, lazy=False):
+    """
+    :text: SMT-LIB script, bytes if lazy
+    :returns: result of generate_ast_fast (generate_ast_lazy if lazy) or None
+              if the fast parser failed
+    """
+    try:
+        if lazy:
+            return generate_ast_lazy(text)
+        return generate_ast_fast(text)
+    except MemoryError:
+        raise
+    except Exception as e:
+        logging.debug("Fast parser failed, using ANTLR: " + str(e))
+        return None
 
 
-def parse(parse_fct, arg, timeout_limit, silent=True):
+def parse_filestream(fn, backend="antlr"):
+    """
+    Parse the file fn. The file is memory-mapped rather than read: the lazy
+    backend parses from the map, the fast backend decodes the map, and the
+    ANTLR lexer reads ASCII files from the map (see MmapStream.py).
+    """
+    if backend == "lazy":
+        data = map_file(fn) or b""
+        result = try_fast_parser(data, lazy=True)
+        if result:
+            return result
+        if data:
+            data.close()
+        backend = "fast"
+    if backend == "fast":
+        result = try_fast_parser(read_text(fn))
+        if result:
+            return result
+    stream = open_stream(fn)
+    try:
+        ast, globs = generate_ast(stream)
+    finally:
+        if isinstance(stream, MmapStream):
+            stream.close()
+    return ast, globs
+
+
+def parse_inputstream(s, backend="antlr"):
+    if backend == "lazy":
+        result = try_fast_parser(s.encode("utf8"), lazy=True)
+        if result:
+            return result
+        backend = "fast"
+    if backend == "fast":
+        result = try_fast_parser(s)
+        if result:
+            return result
+    istream = InputStream(s)
+    ast, globs = generate_ast(istream)
+    return ast, globs
+
+
+def parse(parse_fct, arg, silent=True, backend="antlr"):
     """
     Parser helper function.
 
     :parse_fct: function to parse stream.
     :arg: first argument to parse_fct.
-    :returns: Script object representing AST of SMT-LIB file. None if timeout
-              or crash occurred.
+    :backend: one of BACKENDS.
+    :returns: Script object representing AST of SMT-LIB file. None if a crash
+              occurred.
     """
     script = None
     globs = None
 
     try:
-        script, globs = parse_fct(arg, timeout_limit)
-    except KeyboardInterrupt:
-        print("Parser timed out or was interrupted.")
+        script, globs = parse_fct(arg, backend)
     except Exception as e:
         if not silent:
             print("Error generating the AST.")
@@ -154,27 +236,49 @@ def parse(parse_fct, arg, timeout_limit, silent=True):
     return script, globs
 
 
-def parse_file(fn, timeout_limit=30, silent=True):
+def warn_timeout_limit(timeout_limit):
+    """
+    The parser functions used to take a time limit as their second argument,
+    which is now accepted but ignored.
+    """
+    if timeout_limit is not None:
+        warnings.warn(
+            "timeout_limit is ignored, use ParseService to parse with a time"
+            " limit",
+            DeprecationWarning,
+            stacklevel=3,
+        )
+
+
+def parse_file(fn, timeout_limit=None, silent=True, backend=DEFAULT_BACKEND):
     """
-    Parse SMT-LIB file.
+    Parse SMT-LIB file in the calling process, without a time or memory
+    limit. Use ParseService to parse seeds which may be pathological.
 
     :fn: path to SMT-LIB file.
+    :timeout_limit: deprecated and ignored.
     :silent: if silent=True the parser will withhold stacktrace from user
              on crash.
-    :returns: Script object representing AST of SMT-LIB file. None if timeout
-              or crash occurred.
+    :backend: one of BACKENDS.
+    :returns: Script object representing AST of SMT-LIB file. None if a crash
+              occurred.
     """
-    return parse(parse_filestream, fn, timeout_limit, silent)
+    warn_timeout_limit(timeout_limit)
+    return parse(parse_filestream, fn, silent, backend)
 
 
-def parse_str(s, timeout_limit=30, silent=True):
+def parse_str(s, timeout_limit=None, silent=True, backend=DEFAULT_BACKEND):
     """
-    Parse SMT-LIB from string.
+    Parse SMT-LIB from string in the calling process, without a time or
+    memory limit.
 
     :fn: path to SMT-LIB file.
+    :timeout_limit: deprecated and ignored.
     :silent: if silent=True the parser will withhold stacktrace from user
              on crash.
-    :returns: Script object representing AST of SMT-LIB file. None if timeout
-              or crash occurred.
+    :backend: one of BACKENDS.
+    :returns: Script object representing AST of SMT-LIB file. None if a crash
+              occurred.
     """
-    return parse(parse_inputstream, s, timeout_limit, silent)
+    warn_timeout_limit(timeout_limit)
+    return parse(parse_inputstream, s, silent, backend)
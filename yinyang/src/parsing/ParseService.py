@@ -0,0 +1,305 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import sys
+import time
+import pickle
+import struct
+import logging
+import resource
+import selectors
+import threading
+import subprocess
+
+from yinyang.src.parsing.Parse import (
+    DEFAULT_BACKEND,
+    parse_filestream,
+    parse_inputstream,
+)
+
+HEADER = struct.Struct("<Q")
+
+# Time granted to a parser process for starting up, i.e., importing the
+# parser, which is not accounted to the parse timeout of the first seed.
+STARTUP_TIMEOUT = 60
+
+# Stack size of the thread parsing the seeds in a parser process. The parser
+# and pickle recurse along the depth of the terms, with the default stack size
+# deep terms would crash the parser process instead of raising RecursionError.
+STACK_SIZE = 512 * 1024 * 1024
+
+# Root of the yinyang package, added to the path of the parser processes.
+PACKAGE_ROOT = os.path.dirname(
+    os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+)
+
+
+def read_message(stream):
+    """
+    Read a length-prefixed message from a blocking stream.
+
+    :returns: the unpickled message or None on EOF
+    """
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    return pickle.loads(stream.read(HEADER.unpack(header)[0]))
+
+
+def write_message(stream, data):
+    stream.write(HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+def vm_size():
+    """
+    :returns: current size of the address space of the process in bytes, 0
+              if unknown
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def set_limits(timeout_limit, memory_limit):
+    """
+    Limit the memory the parser process may allocate and the CPU time it may
+    spend on the next request. The limits are relative to the current usage,
+    i.e., each seed gets the same budget. The CPU limit is only a backstop,
+    e.g., if the fuzzer died, the timeout is enforced by the ParseService.
+    """
+    if memory_limit:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        soft = vm_size() + memory_limit
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+    if timeout_limit:
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        soft = int(usage.ru_utime + usage.ru_stime + timeout_limit) + 1
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def serve():
+    """
+    Main loop of a parser process. Reads parse requests from stdin and
+    writes the pickled results to stdout until stdin is closed. The process
+    exits after running out of memory, as the parser may be left in an
+    inconsistent state.
+    """
+    threading.stack_size(STACK_SIZE)
+    thread = threading.Thread(target=_serve)
+    thread.start()
+    thread.join()
+
+
+def _serve():
+    stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+
+    # Keep output of the parser from interfering with the responses.
+    sys.stdout = sys.stderr
+    write_message(stdout, pickle.dumps("ready"))
+
+    while True:
+        request = read_message(stdin)
+        if request is None:
+            break
+        kind, arg, backend, timeout_limit, memory_limit = request
+        set_limits(timeout_limit, memory_limit)
+        try:
+            if kind == "file":
+                response = ("ok", parse_filestream(arg, backend))
+            else:
+                response = ("ok", parse_inputstream(arg, backend))
+        except MemoryError:
+            response = ("memory", None)
+        except Exception as e:
+            response = ("error", str(e))
+
+        try:
+            data = pickle.dumps(response, protocol=pickle.HIGHEST_PROTOCOL)
+        except MemoryError:
+            response = ("memory", None)
+            data = pickle.dumps(response)
+        except (pickle.PicklingError, RecursionError) as e:
+            response = ("error", "cannot transfer AST: " + str(e))
+            data = pickle.dumps(response)
+        write_message(stdout, data)
+        if response[0] == "memory":
+            break
+
+
+class ParseService:
+    """
+    Parses seeds in a separate parser process with a time and memory budget
+    per seed. If the parser exceeds a budget or crashes, the parser process
+    is killed and restarted for the next seed, the caller only sees a failed
+    parse. Unlike a timer interrupting the main thread, this works from any
+    thread or process and never affects the caller.
+
+    The parser process is started on the first request and reused for the
+    following ones. Requests of several threads to the same service are
+    processed one after another, use one service per thread to parse seeds
+    concurrently.
+
+    :timeout_limit: wall-clock time limit per seed in seconds (None = none)
+    :memory_limit: maximal number of bytes the parser may allocate per seed
+                   (None = no limit)
+    :backend: one of Parse.BACKENDS
+    """
+
+    def __init__(
+        self, timeout_limit=30, memory_limit=None, backend=DEFAULT_BACKEND
+    ):
+        self.timeout_limit = timeout_limit
+        self.memory_limit = memory_limit
+        self.backend = backend
+        self.process = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [PACKAGE_ROOT, env.get("PYTHONPATH")])
+        )
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "yinyang.src.parsing.ParseService"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+        )
+        if self._receive(STARTUP_TIMEOUT) != "ready":
+            self.stop()
+            raise RuntimeError("parser process could not be started")
+
+    def stop(self):
+        if not self.process:
+            return
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        self.process.stdin.close()
+        self.process.stdout.close()
+        self.process = None
+
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def parse_file(self, fn, silent=True):
+        """
+        Parse SMT-LIB file.
+
+        :returns: same as Parse.parse_file. (None, None) if the parser failed,
+                  timed out or ran out of memory.
+        """
+        return self._request("file", fn, silent)
+
+    def parse_str(self, s, silent=True):
+        """
+        Parse SMT-LIB from string.
+
+        :returns: same as Parse.parse_str. (None, None) if the parser failed,
+                  timed out or ran out of memory.
+        """
+        return self._request("str", s, silent)
+
+    def _request(self, kind, arg, silent):
+        with self.lock:
+            if not self.alive():
+                self.stop()
+                self.start()
+            request = (
+                kind, arg, self.backend, self.timeout_limit, self.memory_limit
+            )
+            try:
+                write_message(self.process.stdin, pickle.dumps(request))
+                response = self._receive(self.timeout_limit)
+            except BrokenPipeError:
+                response = None
+
+            if response == "timeout":
+                message = "Parser timed out."
+            elif response is None:
+                message = "Parser process died."
+            elif response[0] == "memory":
+                message = "Parser ran out of memory."
+            elif response[0] == "error":
+                message = "Error generating the AST.\n" + response[1]
+            else:
+                return response[1]
+
+            logging.debug(message)
+            if not silent:
+                print(message, flush=True)
+            if response is None or response[0] != "error":
+                self.stop()
+            return None, None
+
+    def _receive(self, timeout):
+        """
+        Read a message of the parser process.
+
+        :returns: the unpickled message, "timeout" if the parser did not
+                  respond within timeout seconds, and None if the parser
+                  process terminated
+        """
+        stdout = self.process.stdout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        data, size = bytearray(), None
+
+        with selectors.DefaultSelector() as selector:
+            selector.register(stdout, selectors.EVENT_READ)
+            while size is None or len(data) < HEADER.size + size:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return "timeout"
+                if not selector.select(remaining):
+                    continue
+                chunk = os.read(stdout.fileno(), 65536)
+                if not chunk:
+                    return None
+                data += chunk
+                if size is None and len(data) >= HEADER.size:
+                    size = HEADER.unpack(data[: HEADER.size])[0]
+
+        try:
+            return pickle.loads(data[HEADER.size:])
+        except Exception:
+            return None
+
+    def __del__(self):
+        self.stop()
+
+
+if __name__ == "__main__":
+    serve()
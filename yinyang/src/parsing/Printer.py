@@ -0,0 +1,72 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from yinyang.src.parsing.Ast import Assert, write_term
+
+# Number of characters collected before they are written to the stream.
+BUFFER_SIZE = 65536
+
+
+def write_commands(script, write):
+    """
+    Write the SMT-LIB representation of script (the same as
+    Script.__str__) in chunks by calling write on each chunk. Asserts are
+    serialized term by term, i.e., not built as one string.
+    """
+    for i, cmd in enumerate(script.commands):
+        if i > 0:
+            write("\n")
+        if isinstance(cmd, Assert):
+            write("(assert ")
+            write_term(cmd.term, write)
+            write(")")
+        else:
+            write(cmd.__str__())
+
+
+def write_script(script, stream, buffer_size=BUFFER_SIZE):
+    """
+    Write the SMT-LIB representation of script to stream, e.g., a file or
+    pipe opened in text mode, in blocks of about buffer_size characters.
+    """
+    chunks, size = [], 0
+
+    def write(chunk):
+        nonlocal chunks, size
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            stream.write("".join(chunks))
+            chunks, size = [], 0
+
+    write_commands(script, write)
+    if chunks:
+        stream.write("".join(chunks))
+
+
+def script_to_str(script):
+    """
+    :returns: SMT-LIB representation of script, the same as Script.__str__
+    """
+    chunks = []
+    write_commands(script, chunks.append)
+    return "".join(chunks)
@@ -0,0 +1,138 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import zlib
+import pickle
+import hashlib
+import logging
+import tempfile
+
+from yinyang.src.parsing.Parse import parse_file, DEFAULT_BACKEND
+from yinyang.src.parsing.MmapStream import map_file
+
+# Version of the cache entry format, to be increased whenever the way
+# entries are stored changes.
+CACHE_FORMAT = 1
+
+# Sources determining the ASTs produced for a seed. Cache entries produced by
+# other versions of these files are not used.
+SCHEMA_SOURCES = [
+    "SMTLIBv2Lexer.py",
+    "SMTLIBv2Parser.py",
+    "AstVisitor.py",
+    "FastParser.py",
+    "LazyParser.py",
+    "Ast.py",
+    "Parse.py",
+    "Types.py",
+]
+
+_schema_tag = None
+
+
+def schema_tag():
+    """
+    :returns: tag identifying the cache format and the parser and AST
+              sources, i.e., it changes if the grammar or the AST schema
+              change.
+    """
+    global _schema_tag
+    if _schema_tag is None:
+        digest = hashlib.sha256(str(CACHE_FORMAT).encode())
+        folder = os.path.dirname(os.path.abspath(__file__))
+        for source in SCHEMA_SOURCES:
+            with open(os.path.join(folder, source), "rb") as f:
+                digest.update(f.read())
+        _schema_tag = digest.hexdigest()[:16]
+    return _schema_tag
+
+
+class SeedCache:
+    """
+    Persistent cache of parsed seeds. Entries are keyed by the hash of the
+    seed's content and the parser backend and stored in a subfolder named by
+    `schema_tag()`, so that entries of other parser or AST versions are never
+    loaded. Each entry is the pickled and compressed pair (script,
+    global_vars) as returned by `parse_file`.
+
+    :folder: path to the cache folder
+    :service: ParseService parsing the seeds on a cache miss (None = parse
+              in the calling process)
+    """
+
+    def __init__(self, folder, service=None):
+        self.folder = os.path.join(folder, schema_tag())
+        self.service = service
+        self.backend = service.backend if service else DEFAULT_BACKEND
+        os.makedirs(self.folder, exist_ok=True)
+
+    def entry(self, content):
+        digest = hashlib.sha256(content).hexdigest()
+        return os.path.join(
+            self.folder, self.backend + "-" + digest + ".pickle"
+        )
+
+    def parse_file(self, fn, silent=True):
+        """
+        Drop-in replacement of `parse_file` loading the AST of the seed fn
+        from the cache. On a cache miss, the seed is parsed and the AST added
+        to the cache.
+        """
+        data = map_file(fn)
+        if data is None:
+            entry = self.entry(b"")
+        else:
+            with data:
+                entry = self.entry(data)
+
+        try:
+            with open(entry, "rb") as f:
+                return pickle.loads(zlib.decompress(f.read()))
+        except FileNotFoundError:
+            pass
+        except Exception:
+            logging.debug("Ignoring invalid cache entry " + entry)
+
+        if self.service:
+            script, globs = self.service.parse_file(fn, silent)
+        else:
+            script, globs = parse_file(fn, silent=silent)
+        if script:
+            self.store(entry, (script, globs))
+        return script, globs
+
+    def store(self, entry, value):
+        """
+        Write the entry to a temporary file first and move it in place, as
+        several fuzzer processes may share the cache.
+        """
+        fd, tmp = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            with os.fdopen(fd, "wb") as f:
+                f.write(zlib.compress(data, 1))
+            os.replace(tmp, entry)
+        except (OSError, pickle.PicklingError, RecursionError):
+            logging.debug("Could not add " + entry + " to the seed cache")
+            if os.path.exists(tmp):
+                os.remove(tmp)
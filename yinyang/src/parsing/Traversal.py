@@ -0,0 +1,136 @@
+# MIT License
+#
+# Copyright (c) [2020 - 2021] The yinyang authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from types import GeneratorType
+
+
+def subterms(term):
+    """
+    :returns: the subterms of term, empty for strings and leaves
+    """
+    if not isinstance(term, str) and term.subterms:
+        return term.subterms
+    return ()
+
+
+def let_and_subterms(term):
+    """
+    :returns: the bound terms of a let binding followed by its subterms, the
+              subterms for other terms
+    """
+    if not isinstance(term, str) and term.let_terms:
+        return list(term.let_terms) + list(term.subterms or ())
+    return subterms(term)
+
+
+def visit(term, enter, children=subterms):
+    """
+    Pre-order traversal of term. The children of a node are visited from
+    left to right. Like the other traversals of this module, it uses an
+    explicit stack instead of recursion, i.e., the depth of the terms is only
+    bounded by the available memory.
+
+    :enter: called on each node, the children of the node are skipped if
+            enter returns False
+    :children: function returning the children of a node
+    """
+    todo = [term]
+    while todo:
+        node = todo.pop()
+        if enter(node) is False:
+            continue
+        todo.extend(reversed(children(node)))
+
+
+def preorder(term, children=subterms):
+    """
+    :returns: generator of the nodes of term in pre-order
+    """
+    todo = [term]
+    while todo:
+        node = todo.pop()
+        yield node
+        todo.extend(reversed(children(node)))
+
+
+def postorder(term, children=subterms):
+    """
+    :returns: generator of the nodes of term in post-order, i.e., each node
+              follows its children
+    """
+    todo = [(term, False)]
+    while todo:
+        node, expanded = todo.pop()
+        if expanded:
+            yield node
+            continue
+        todo.append((node, True))
+        for child in reversed(children(node)):
+            todo.append((child, False))
+
+
+def evaluate(root, step, leave=None):
+    """
+    Evaluate a recursive function without recursion. The function is given
+    by step, which is called on a node and returns either the result for
+    the node or a generator. The generator yields the nodes whose results
+    it needs, receives each result from the yield, and finally returns the
+    result for the node. That is, a recursive call
+
+        result = f(child)
+
+    becomes
+
+        result = yield child
+
+    Exceptions propagate out of evaluate right away. The generators waiting
+    for the failing node are closed, i.e., they may clean up in finally
+    blocks but cannot catch the exception.
+
+    :leave: called with each node whose generator finished and its result
+    :returns: result for root
+    """
+    gen = step(root)
+    if type(gen) is not GeneratorType:
+        return gen
+
+    # The generator on top of the stack and its node are kept in gen and
+    # node, the stack holds the generators waiting for a result.
+    stack, node, value = [], root, None
+    while True:
+        try:
+            child = gen.send(value)
+        except StopIteration as stop:
+            value = stop.value
+            if leave is not None:
+                leave(node, value)
+            if not stack:
+                return value
+            gen, node = stack.pop()
+            continue
+
+        result = step(child)
+        if type(result) is GeneratorType:
+            stack.append((gen, node))
+            gen, node, value = result, child, None
+        else:
+            value = result
@@ -20,20 +20,16 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-import sys
-
-sys.setrecursionlimit(100000)
+from types import GeneratorType
+from functools import lru_cache, partial
 
 from yinyang.src.parsing.Types import (
     sort2type,
     # Types
     BOOLEAN_TYPE, REAL_TYPE, INTEGER_TYPE, ROUNDINGMODE_TYPE, STRING_TYPE,
     REGEXP_TYPE, UNKNOWN, ARRAY_TYPE, BITVECTOR_TYPE, FP_TYPE,
-    # Operator lists
-    CORE_OPS, NUMERICAL_OPS, REAL_OPS, INT_OPS, REAL_INTS, STRING_OPS,
-    ARRAY_OPS, BV_OPS, FP_OPS,
     # Operators
-    NOT, AND, OR, XOR, IMPLIES, ITE, EQ, UNARY_MINUS, MINUS, PLUS, MULTIPLY,
+    NOT, AND, OR, XOR, IMPLIES, ITE, EQUAL, DISTINCT, MINUS, PLUS, MULTIPLY,
     GT, GTE, LT, LTE, DIV, MOD, ABS, REAL_DIV, TO_REAL, TO_INT, IS_INT,
     CONCAT, STRLEN, LEXORD, REFLEX_CLOS, STR_PREFIXOF, STR_SUFFIXOF,
     STR_CONTAINS, RE_NONE, RE_ALL, RE_ALLCHAR, STR_IN_RE, RE_COMP, RE_KLENE,
@@ -50,6 +46,7 @@ from yinyang.src.parsing.Types import (
 )
 
 from yinyang.src.parsing.Ast import Assert
+from yinyang.src.parsing.Traversal import evaluate
 
 
 class Context:
@@ -96,7 +93,7 @@ class UnknownOperator(Exception):
 
 def typecheck_not(expr, ctxt=[]):
     """(not Bool Bool)"""
-    typ = typecheck_expr(expr.subterms[0], ctxt)
+    typ = yield expr.subterms[0]
     if typ != BOOLEAN_TYPE:
         raise TypeCheckError(expr, expr.subterms[0], typ, BOOLEAN_TYPE)
     return BOOLEAN_TYPE
@@ -106,12 +103,12 @@ def typecheck_unary_minus(expr, ctxt=[]):
     """(- Int Int)
     (- Real Real)
     """
-    typ = typecheck_expr(expr.subterms[0], ctxt)
+    typ = yield expr.subterms[0]
     if typ not in [INTEGER_TYPE, REAL_TYPE]:
         raise TypeCheckError(
             expr, expr.subterms[0], [INTEGER_TYPE, REAL_TYPE], typ
         )
-    return typecheck_expr(expr.subterms[0], ctxt)
+    return (yield expr.subterms[0])
 
 
 def typecheck_nary_numeral_ret(expr, ctxt=[]):
@@ -123,13 +120,13 @@ def typecheck_nary_numeral_ret(expr, ctxt=[]):
     (* Real Real Real :left-assoc)
     (/ Real Real Real :left-assoc)
     """
-    typ = typecheck_expr(expr.subterms[0], ctxt)
+    typ = yield expr.subterms[0]
     if typ not in [INTEGER_TYPE, REAL_TYPE]:
         raise TypeCheckError(
             expr, expr.subterms[0], [INTEGER_TYPE, REAL_TYPE], typ
         )
     for term in expr.subterms[1:]:
-        t = typecheck_expr(term, ctxt)
+        t = yield term
         if t not in [INTEGER_TYPE, REAL_TYPE]:
             raise TypeCheckError(expr, term, typ, t)
     return typ
@@ -141,7 +138,7 @@ def typecheck_nary_int_ret(expr, ctxt=[]):
     (abs Int Int)
     """
     for term in expr.subterms:
-        t = typecheck_expr(term, ctxt)
+        t = yield term
         if t != INTEGER_TYPE:
             raise TypeCheckError(expr, term, INTEGER_TYPE, t)
     return INTEGER_TYPE
@@ -159,9 +156,9 @@ def typecheck_eq(expr, ctxt=[]):
     """(par (A) (= A A Bool :chainable))
     (par (A) (distinct A A Bool :pairwise))
     """
-    typ = typecheck_expr(expr.subterms[0], ctxt)
+    typ = yield expr.subterms[0]
     for term in expr.subterms[1:]:
-        t = typecheck_expr(term, ctxt)
+        t = yield term
         if t != typ:
             if not (is_subtype(t, typ) or is_subtype(typ, t)):
                 raise TypeCheckError(expr, term, typ, t)
@@ -170,17 +167,17 @@ def typecheck_eq(expr, ctxt=[]):
 
 def typecheck_ite(expr, ctxt=[]):
     """(par (A) (ite Bool A A A))"""
-    typ = typecheck_expr(expr.subterms[0], ctxt)
-    if typecheck_expr(expr.subterms[0], ctxt) != BOOLEAN_TYPE:
-        t = typecheck_expr(expr.subterms[1], ctxt)
+    typ = yield expr.subterms[0]
+    if (yield expr.subterms[0]) != BOOLEAN_TYPE:
+        t = yield expr.subterms[1]
         if not (is_subtype(t, typ) or is_subtype(typ, t)):
             raise TypeCheckError(expr, expr.subterms[0], typ, BOOLEAN_TYPE)
-    t1 = typecheck_expr(expr.subterms[1], ctxt)
-    t2 = typecheck_expr(expr.subterms[2], ctxt)
+    t1 = yield expr.subterms[1]
+    t2 = yield expr.subterms[2]
     if t1 != t2:
         if not (is_subtype(t1, t2) or is_subtype(t2, t1)):
             raise TypeCheckError(expr, expr.subterms[2], t1, t2)
-    return typecheck_expr(expr.subterms[1], ctxt)
+    return (yield expr.subterms[1])
 
 
 def typecheck_nary_bool(expr, ctxt=[]):
@@ -190,7 +187,7 @@ def typecheck_nary_bool(expr, ctxt=[]):
     (xor Bool Bool Bool :left-assoc)
     """
     for term in expr.subterms:
-        typ = typecheck_expr(term, ctxt)
+        typ = yield term
         if typ != BOOLEAN_TYPE:
             raise TypeCheckError(expr, term, BOOLEAN_TYPE, typ)
     return BOOLEAN_TYPE
@@ -207,14 +204,14 @@ def typecheck_comp_ops(expr, ctxt):
     (>= Real Real Bool :chainable)
     (>  Real Real Bool :chainable)
     """
-    typ = typecheck_expr(expr.subterms[0], ctxt)
+    typ = yield expr.subterms[0]
     if typ not in [INTEGER_TYPE, REAL_TYPE]:
         raise TypeCheckError(
             expr, expr.subterms[0], [INTEGER_TYPE, REAL_TYPE], typ
         )
 
     for term in expr.subterms[1:]:
-        t = typecheck_expr(term, ctxt)
+        t = yield term
         if t not in [INTEGER_TYPE, REAL_TYPE]:
             raise TypeCheckError(expr, term, [INTEGER_TYPE, REAL_TYPE], t)
     return BOOLEAN_TYPE
@@ -222,7 +219,7 @@ def typecheck_comp_ops(expr, ctxt):
 
 def typecheck_to_real(expr, ctxt):
     """(to_real Int Real)"""
-    t = typecheck_expr(expr, ctxt)
+    t = yield expr.subterms[0]
     if t != INTEGER_TYPE:
         raise TypeCheckError(expr, expr, INTEGER_TYPE, t)
     return REAL_TYPE
@@ -230,16 +227,16 @@ def typecheck_to_real(expr, ctxt):
 
 def typecheck_to_int(expr, ctxt):
     """(to_int Real Int)"""
-    t = typecheck_expr(expr, ctxt)
-    if t != REAL_TYPE or t != INTEGER_TYPE:
+    t = yield expr.subterms[0]
+    if t not in [REAL_TYPE, INTEGER_TYPE]:
         raise TypeCheckError(expr, expr, REAL_TYPE, t)
     return INTEGER_TYPE
 
 
 def typecheck_is_int(expr, ctxt):
     """(is_int Real Bool)"""
-    t = typecheck_expr(expr, ctxt)
-    if t != REAL_TYPE or t != INTEGER_TYPE:
+    t = yield expr.subterms[0]
+    if t not in [REAL_TYPE, INTEGER_TYPE]:
         raise TypeCheckError(expr, expr, REAL_TYPE, t)
     return BOOLEAN_TYPE
 
@@ -247,7 +244,7 @@ def typecheck_is_int(expr, ctxt):
 def typecheck_real_div(expr, ctxt):
     """(/ Real Real Real :left-assoc)"""
     for term in expr.subterms:
-        t = typecheck_expr(term, ctxt)
+        t = yield term
         if t not in [REAL_TYPE, INTEGER_TYPE]:
             raise TypeCheckError(expr, expr, REAL_TYPE, t)
     return REAL_TYPE
@@ -256,7 +253,7 @@ def typecheck_real_div(expr, ctxt):
 def typecheck_string_concat(expr, ctxt):
     """(str.++ String String String :left-assoc)"""
     for term in expr.subterms:
-        t = typecheck_expr(term, ctxt)
+        t = yield term
         if t != STRING_TYPE:
             raise TypeCheckError(expr, expr, STRING_TYPE, t)
     return STRING_TYPE
@@ -264,7 +261,7 @@ def typecheck_string_concat(expr, ctxt):
 
 def typecheck_strlen(expr, ctxt):
     """(str.len String Int)"""
-    t = typecheck_expr(expr.subterms[0], ctxt)
+    t = yield expr.subterms[0]
     if t != STRING_TYPE:
         raise TypeCheckError(expr, expr, STRING_TYPE, t)
     return INTEGER_TYPE
@@ -278,7 +275,7 @@ def typecheck_nary_string_rt_bool(expr, ctxt):
     (str.contains String String Bool)
     """
     for term in expr.subterms:
-        t = typecheck_expr(term, ctxt)
+        t = yield term
         if t != STRING_TYPE:
             raise TypeCheckError(expr, expr, STRING_TYPE, t)
     return BOOLEAN_TYPE
@@ -287,7 +284,7 @@ def typecheck_nary_string_rt_bool(expr, ctxt):
 def typecheck_str_to_re(expr, ctxt):
     """(str.to_re String RegLan)"""
     arg = expr.subterms[0]
-    t = typecheck_expr(arg, ctxt)
+    t = yield arg
     if t != STRING_TYPE:
         raise TypeCheckError(expr, expr, STRING_TYPE, t)
     return REGEXP_TYPE
@@ -304,8 +301,8 @@ def typecheck_regex_consts(expr, ctxt):
 
 def typecheck_str_in_re(expr, ctxt):
     """(str.in_re String RegLan Bool)"""
-    s = typecheck_expr(expr.subterms[0], ctxt)
-    t = typecheck_expr(expr.subterms[1], ctxt)
+    s = yield expr.subterms[0]
+    t = yield expr.subterms[1]
 
     if s != STRING_TYPE:
         raise TypeCheckError(expr, expr, STRING_TYPE, t)
@@ -322,7 +319,7 @@ def typecheck_regex_unary(expr, ctxt):
     (re.opt RegLan RegLan)
     (re.+ RegLan RegLan)
     """
-    t = typecheck_expr(expr, ctxt)
+    t = yield expr.subterms[0]
     if t != REGEXP_TYPE:
         raise TypeCheckError(expr, expr, REGEXP_TYPE, t)
     return REGEXP_TYPE
@@ -336,7 +333,7 @@ def typecheck_regex_binary(expr, ctxt):
     (re.inter RegLan RegLan RegLan :left-assoc)
     """
     for term in expr.subterms:
-        t = typecheck_expr(term, ctxt)
+        t = yield term
         if t != REGEXP_TYPE:
             raise TypeCheckError(expr, term, REGEXP_TYPE, t)
     return REGEXP_TYPE
@@ -346,8 +343,8 @@ def typecheck_str_at(expr, ctxt):
     """
     (str.at String Int String)
     """
-    t1 = typecheck_expr(expr.subterms[0], ctxt)
-    t2 = typecheck_expr(expr.subterms[1], ctxt)
+    t1 = yield expr.subterms[0]
+    t2 = yield expr.subterms[1]
     if t1 != STRING_TYPE:
         raise TypeCheckError(expr, expr, STRING_TYPE, t1)
     if t2 != INTEGER_TYPE:
@@ -359,9 +356,9 @@ def typecheck_substr(expr, ctxt):
     """
     (str.substr String Int Int String)
     """
-    t1 = typecheck_expr(expr.subterms[0], ctxt)
-    t2 = typecheck_expr(expr.subterms[1], ctxt)
-    t3 = typecheck_expr(expr.subterms[2], ctxt)
+    t1 = yield expr.subterms[0]
+    t2 = yield expr.subterms[1]
+    t3 = yield expr.subterms[2]
     if t1 != STRING_TYPE or t2 != INTEGER_TYPE or t3 != INTEGER_TYPE:
         raise TypeCheckError(
             expr, expr, [STRING_TYPE, INTEGER_TYPE, INTEGER_TYPE], [t1, t2, t3]
@@ -371,9 +368,9 @@ def typecheck_substr(expr, ctxt):
 
 def typecheck_index_of(expr, ctxt):
     """(str.indexof String String Int Int)"""
-    t1 = typecheck_expr(expr.subterms[0], ctxt)
-    t2 = typecheck_expr(expr.subterms[1], ctxt)
-    t3 = typecheck_expr(expr.subterms[2], ctxt)
+    t1 = yield expr.subterms[0]
+    t2 = yield expr.subterms[1]
+    t3 = yield expr.subterms[2]
     if t1 != STRING_TYPE or t2 != STRING_TYPE or t3 != INTEGER_TYPE:
         raise TypeCheckError(
             expr, expr, [STRING_TYPE, STRING_TYPE, INTEGER_TYPE], [t1, t2, t3]
@@ -386,9 +383,9 @@ def typecheck_replace(expr, ctxt):
     (str.replace String String String String)
     (str.replace_all String String String String)
     """
-    t1 = typecheck_expr(expr.subterms[0], ctxt)
-    t2 = typecheck_expr(expr.subterms[1], ctxt)
-    t3 = typecheck_expr(expr.subterms[2], ctxt)
+    t1 = yield expr.subterms[0]
+    t2 = yield expr.subterms[1]
+    t3 = yield expr.subterms[2]
     if t1 != STRING_TYPE or t2 != STRING_TYPE or t3 != STRING_TYPE:
         raise TypeCheckError(
             expr, expr, [STRING_TYPE, STRING_TYPE, STRING_TYPE], [t1, t2, t3]
@@ -401,13 +398,13 @@ def typecheck_replace_re(expr, ctxt):
     (str.replace_re String RegLan String String)
     (str.replace_re_all String RegLan String String)
     """
-    t1 = typecheck_expr(expr.subterms[0], ctxt)
-    t2 = typecheck_expr(expr.subterms[1], ctxt)
-    t3 = typecheck_expr(expr.subterms[2], ctxt)
+    t1 = yield expr.subterms[0]
+    t2 = yield expr.subterms[1]
+    t3 = yield expr.subterms[2]
     if (
-        typecheck_expr(expr.subterms[0], ctxt) != STRING_TYPE
-        or typecheck_expr(expr.subterms[1], ctxt) != REGEXP_TYPE
-        or typecheck_expr(expr.subterms[2], ctxt) != STRING_TYPE
+        (yield expr.subterms[0]) != STRING_TYPE
+        or (yield expr.subterms[1]) != REGEXP_TYPE
+        or (yield expr.subterms[2]) != STRING_TYPE
     ):
         raise TypeCheckError(
             expr, expr, [STRING_TYPE, STRING_TYPE, STRING_TYPE], [t1, t2, t3]
@@ -419,8 +416,8 @@ def typecheck_re_range(expr, ctxt):
     """
     (re.range String String RegLan)
     """
-    t1 = typecheck_expr(expr.subterms[0], ctxt)
-    t2 = typecheck_expr(expr.subterms[1], ctxt)
+    t1 = yield expr.subterms[0]
+    t2 = yield expr.subterms[1]
 
     if t1 != STRING_TYPE or t2 != STRING_TYPE:
         raise TypeCheckError(expr, expr, [STRING_TYPE, STRING_TYPE], [t1, t2])
@@ -432,7 +429,7 @@ def typecheck_str_to_int(expr, ctxt):
     (str.to_code String Int)
     (str.to_int String Int)
     """
-    t = typecheck_expr(expr.subterms[0], ctxt)
+    t = yield expr.subterms[0]
 
     if t != STRING_TYPE:
         raise TypeCheckError(expr, expr, STRING_TYPE, t)
@@ -443,7 +440,7 @@ def typecheck_is_digit(expr, ctxt):
     """
     (str.is_digit String Bool)
     """
-    t = typecheck_expr(expr.subterms[0], ctxt)
+    t = yield expr.subterms[0]
     if t != STRING_TYPE:
         raise TypeCheckError(expr, expr, BOOLEAN_TYPE, t)
     return BOOLEAN_TYPE
@@ -454,59 +451,20 @@ def typecheck_int_to_string(expr, ctxt):
     (str.from_code Int String)
     (str.from_int Int String)
     """
-    t = typecheck_expr(expr.subterms[0], ctxt)
+    t = yield expr.subterms[0]
     if t != INTEGER_TYPE:
         raise TypeCheckError(expr, expr, INTEGER_TYPE, t)
     return STRING_TYPE
 
 
-def typecheck_string_ops(expr, ctxt):
-    if expr.op == CONCAT:
-        return typecheck_string_concat(expr, ctxt)
-    if expr.op == STRLEN:
-        return typecheck_strlen(expr, ctxt)
-    if expr.op in [
-            LEXORD, REFLEX_CLOS, STR_PREFIXOF, STR_SUFFIXOF, STR_CONTAINS
-    ]:
-        return typecheck_nary_string_rt_bool(expr, ctxt)
-    if expr.op in [RE_NONE, RE_ALL, RE_ALLCHAR]:
-        return typecheck_regex_consts(expr, ctxt)
-    if expr.op == STR_IN_RE:
-        return typecheck_str_in_re(expr, ctxt)
-    if expr.op in [RE_KLENE, RE_COMP, RE_OPT, RE_PLUS]:
-        return typecheck_regex_binary(expr, ctxt)
-    if expr.op in [RE_DIFF, RE_CONCAT, RE_UNION, RE_INTER]:
-        return typecheck_regex_binary(expr, ctxt)
-    if expr.op == STR_AT:
-        return typecheck_str_at(expr, ctxt)
-    if expr.op == STR_SUBSTR:
-        return typecheck_substr(expr, ctxt)
-    if expr.op == STR_INDEXOF:
-        return typecheck_index_of(expr, ctxt)
-    if expr.op in [STR_REPLACE, STR_REPLACE_ALL]:
-        return typecheck_replace(expr, ctxt)
-    if expr.op in [STR_REPLACE_RE, STR_REPLACE_RE_ALL]:
-        return typecheck_replace(expr, ctxt)
-    if expr.op in [STR_TO_CODE, STR_TO_INT]:
-        return typecheck_str_to_int(expr, ctxt)
-    if expr.op == STR_TO_RE:
-        return typecheck_str_to_re(expr, ctxt)
-    if expr.op in [STR_FROM_CODE, STR_FROM_INT]:
-        return typecheck_int_to_string(expr, ctxt)
-    if expr.op == STR_IS_DIGIT:
-        return typecheck_is_digit(expr, ctxt)
-    if expr.op == RE_RANGE:
-        return typecheck_re_range(expr, ctxt)
-
-
 def typecheck_select(expr, ctxt):
     """
     (select (Array X Y) X Y)
     """
-    array_type = typecheck_expr(expr.subterms[0], ctxt)
+    array_type = yield expr.subterms[0]
     if isinstance(array_type, ARRAY_TYPE):
         raise TypeCheckError(expr, expr, ARRAY_TYPE, array_type)
-    x_type = typecheck_expr(expr.subterms[1], ctxt)
+    x_type = yield expr.subterms[1]
     if x_type != array_type.index_type:
         raise TypeCheckError(expr, expr, array_type.index_type, x_type)
     return array_type.payload_type
@@ -516,11 +474,11 @@ def typecheck_store(expr, ctxt):
     """
     (store (Array X Y) X Y (Array X Y)))
     """
-    array_type = typecheck_expr(expr.subterms[0], ctxt)
+    array_type = yield expr.subterms[0]
     if isinstance(array_type, ARRAY_TYPE):
         raise TypeCheckError(expr, expr, ARRAY_TYPE, array_type)
-    x_type = typecheck_expr(expr.subterms[1], ctxt)
-    y_type = typecheck_expr(expr.subterms[2], ctxt)
+    x_type = yield expr.subterms[1]
+    y_type = yield expr.subterms[2]
     if x_type != array_type.index_type and y_type != array_type.payload_type:
         raise TypeCheckError(
             expr,
@@ -531,20 +489,13 @@ def typecheck_store(expr, ctxt):
     return array_type
 
 
-def typecheck_array_ops(expr, ctxt):
-    if expr.op == SELECT:
-        return typecheck_select(expr, ctxt)
-    if expr.op == STORE:
-        return typecheck_store(expr, ctxt)
-
-
 def typecheck_bv_concat(expr, ctxt):
     """
     (concat (_ BitVec i) (_ BitVec j) (_ BitVec m))
     """
     arg1, arg2 = expr.subterms[0], expr.subterms[1]
-    t1 = typecheck_expr(expr.subterms[0], ctxt)
-    t2 = typecheck_expr(expr.subterms[1], ctxt)
+    t1 = yield expr.subterms[0]
+    t2 = yield expr.subterms[1]
     if not isinstance(t1, BITVECTOR_TYPE) or\
        not isinstance(t2, BITVECTOR_TYPE):
         raise TypeCheckError(
@@ -559,7 +510,7 @@ def typecheck_bv_unary(expr, ctxt):
     (op1 (_ BitVec m) (_ BitVec m))
     """
     arg = expr.subterms[0]
-    t = typecheck_expr(expr.subterms[0], ctxt)
+    t = yield expr.subterms[0]
     if not isinstance(t, BITVECTOR_TYPE):
         raise TypeCheckError(expr, arg, BITVECTOR_TYPE, t)
     return t
@@ -570,8 +521,8 @@ def typecheck_bv_binary(expr, ctxt):
     (op2 (_ BitVec m) (_ BitVec m) (_ BitVec m))
     """
     arg1, _ = expr.subterms[0], expr.subterms[1]
-    t1 = typecheck_expr(expr.subterms[0], ctxt)
-    t2 = typecheck_expr(expr.subterms[1], ctxt)
+    t1 = yield expr.subterms[0]
+    t2 = yield expr.subterms[1]
     if not isinstance(t1, BITVECTOR_TYPE) or\
        not isinstance(t2, BITVECTOR_TYPE):
         expected = "[" + str(BITVECTOR_TYPE) + "," + str(BITVECTOR_TYPE) + "]"
@@ -587,8 +538,8 @@ def typecheck_binary_bool_rt(expr, ctxt):
     (bvslt (_ BitVec m) (_ BitVec m) Bool)
     """
     arg1, arg2 = expr.subterms[0], expr.subterms[1]
-    t1 = typecheck_expr(expr.subterms[0], ctxt)
-    t2 = typecheck_expr(expr.subterms[1], ctxt)
+    t1 = yield expr.subterms[0]
+    t2 = yield expr.subterms[1]
 
     if not isinstance(arg1, BITVECTOR_TYPE) or\
        not isinstance(arg2, BITVECTOR_TYPE):
@@ -598,40 +549,16 @@ def typecheck_binary_bool_rt(expr, ctxt):
     return BOOLEAN_TYPE
 
 
-def typecheck_bv_ops(expr, ctxt):
-    if expr.op == BV_CONCAT:
-        return typecheck_bv_concat(expr, ctxt)
-    if expr.op in [BVNOT, BVNEG]:
-        return typecheck_bv_unary(expr, ctxt)
-    if expr.op in [
-        BVAND,
-        BVOR,
-        BVXOR,
-        BVADD,
-        BVSUB,
-        BVMUL,
-        BVUDIV,
-        BVUREM,
-        BVSHL,
-        BVLSHR,
-        BVASHR,
-        BVSDIV,
-    ]:
-        return typecheck_bv_binary(expr, ctxt)
-    if expr.op in [BVULT, BVULE, BVSLT, BVSGT]:
-        return typecheck_binary_bool_rt(expr, ctxt)
-
-
 def typecheck_fp_unary(expr, ctxt):
     """
     (fp.abs (_ FloatingPoint eb sb) (_ FloatingPoint eb sb))
     (fp.neg (_ FloatingPoint eb sb) (_ FloatingPoint eb sb))
     """
     arg = expr.subterms[0]
-    t = typecheck_expr(expr.subterms[0], ctxt)
+    t = yield expr.subterms[0]
     if not isinstance(t, FP_TYPE):
         raise TypeCheckError(expr, arg, FP_TYPE, t)
-    return typecheck_expr(expr.subterms[0], ctxt)
+    return (yield expr.subterms[0])
 
 
 def typecheck_fp_binary_arith(expr, ctxt):
@@ -651,15 +578,15 @@ def typecheck_fp_binary_arith(expr, ctxt):
     arg1 = expr.subterms[0]
     arg2 = expr.subterms[1]
     arg3 = expr.subterms[2]
-    t1 = typecheck_expr(arg1, ctxt)
+    t1 = yield arg1
     if t1 != ROUNDINGMODE_TYPE:
         raise TypeCheckError(expr, arg1, ROUNDINGMODE_TYPE, t1)
 
-    t1 = typecheck_expr(arg2, ctxt)
-    t2 = typecheck_expr(arg3, ctxt)
+    t1 = yield arg2
+    t2 = yield arg3
     if not isinstance(t1, FP_TYPE) or not isinstance(t2, FP_TYPE):
         raise TypeCheckError(expr, [arg2, arg3], [FP_TYPE, FP_TYPE])
-    return typecheck_expr(arg2, ctxt)
+    return (yield arg2)
 
 
 def typecheck_fp_unary_bool_rt(expr, ctxt):
@@ -673,7 +600,7 @@ def typecheck_fp_unary_bool_rt(expr, ctxt):
     (fp.isPositive (_ FloatingPoint eb sb) Bool)
     """
     arg = expr.subterms[0]
-    typ = typecheck_expr(arg, ctxt)
+    typ = yield arg
     if not isinstance(typ, FP_TYPE):
         raise TypeCheckError(expr, arg, FP_TYPE, typ)
     return BOOLEAN_TYPE
@@ -689,8 +616,8 @@ def typecheck_fp_comparison(expr, ctxt):
     """
     arg1 = expr.subterms[0]
     arg2 = expr.subterms[1]
-    typ1 = typecheck_expr(arg1, ctxt)
-    typ2 = typecheck_expr(arg2, ctxt)
+    typ1 = yield arg1
+    typ2 = yield arg2
     if not isinstance(typ1, FP_TYPE) or not isinstance(typ2, FP_TYPE):
         args = "[" + arg1.__str__() + "," + arg2.__str__() + "]"
         expected = "[" + str(FP_TYPE) + "," + str(FP_TYPE) + "]"
@@ -706,11 +633,11 @@ def typecheck_fp_minmax(expr, ctxt):
     """ # noqa E501
     arg1 = expr.subterms[0]
     arg2 = expr.subterms[1]
-    if not isinstance(typecheck_expr(arg1, ctxt), FP_TYPE) or not isinstance(
-        typecheck_expr(arg2, ctxt), FP_TYPE
+    if not isinstance((yield arg1), FP_TYPE) or not isinstance(
+        (yield arg2), FP_TYPE
     ):
         raise TypeCheckError(expr)
-    return typecheck_expr(arg1, ctxt)
+    return (yield arg1)
 
 
 def typecheck_fp_fma(expr, ctxt):
@@ -721,43 +648,12 @@ def typecheck_fp_fma(expr, ctxt):
     arg2 = expr.subterms[1]
     arg3 = expr.subterms[2]
     if (
-        not isinstance(typecheck_expr(arg1, ctxt), FP_TYPE)
-        or not isinstance(typecheck_expr(arg2, ctxt), FP_TYPE)
-        or not isinstance(typecheck_expr(arg3, ctxt), FP_TYPE)
+        not isinstance((yield arg1), FP_TYPE)
+        or not isinstance((yield arg2), FP_TYPE)
+        or not isinstance((yield arg3), FP_TYPE)
     ):
         raise TypeCheckError(expr)
-    return typecheck_expr(arg1, ctxt)
-
-
-def typecheck_fp_ops(expr, ctxt):
-    if expr.op in [FP_ABS, FP_NEG]:
-        return typecheck_fp_unary(expr, ctxt)
-    if expr.op in [
-        FP_ADD,
-        FP_SUB,
-        FP_MUL,
-        FP_DIV,
-        FP_SQRT,
-        FP_REM,
-        FP_ROUND_TO_INTEGRAL,
-    ]:
-        return typecheck_fp_binary_arith(expr, ctxt)
-    if expr.op in [
-        FP_NORMAL,
-        FP_ISSUBNORMAL,
-        FP_IS_ZERO,
-        FP_ISINFINITE,
-        FP_ISNAN,
-        FP_ISNEGATIVE,
-        FP_ISPOSITIVE,
-    ]:
-        return typecheck_fp_unary_bool_rt(expr, ctxt)
-    if expr.op in [FP_LEQ, FP_LT, FP_GEQ, FP_GT, FP_EQ]:
-        return typecheck_fp_comparison(expr, ctxt)
-    if expr.op in [FP_MIN, FP_MAX]:
-        return typecheck_fp_minmax(expr, ctxt)
-    if expr.op == FP_FMA:
-        return typecheck_fp_fma(expr, ctxt)
+    return (yield arg1)
 
 
 def typecheck_quantifiers(expr, ctxt):
@@ -766,62 +662,23 @@ def typecheck_quantifiers(expr, ctxt):
     for i in range(len(vars)):
         var, type = vars[i], types[i]
         ctxt.add_to_locals(var, type)
-    t = typecheck_expr(expr.subterms[0], ctxt)
+    t = yield expr.subterms[0]
     if t != BOOLEAN_TYPE:
         raise TypeCheckError(expr, expr.subterms[0], BOOLEAN_TYPE, t)
     return BOOLEAN_TYPE
 
 
-def typecheck_core(expr, ctxt):
-    if expr.op == NOT:
-        return typecheck_not(expr, ctxt)
-    if expr.op in [AND, OR, XOR, IMPLIES]:
-        return typecheck_nary_bool(expr, ctxt)
-    if expr.op == ITE:
-        return typecheck_ite(expr, ctxt)
-    if expr.op in EQ:
-        return typecheck_eq(expr, ctxt)
-
-
-def typecheck_numeral(expr, ctxt):
-    if expr.op == UNARY_MINUS and len(expr.subterms) == 1:
-        return typecheck_unary_minus(expr, ctxt)
-    if expr.op in [MINUS, PLUS, MULTIPLY]:
-        return typecheck_nary_numeral_ret(expr, ctxt)
-    if expr.op in [GT, GTE, LT, LTE]:
-        return typecheck_comp_ops(expr, ctxt)
-
-
-def typecheck_int_ops(expr, ctxt):
-    if expr.op in [DIV, MOD, ABS]:
-        return typecheck_nary_int_ret(expr, ctxt)
-
-
-def typecheck_real_ops(expr, ctxt):
-    if expr.op == REAL_DIV:
-        return typecheck_real_div(expr, ctxt)
-
-
-def typecheck_real_ints_ops(expr, ctxt):
-    if expr.op == TO_REAL:
-        return typecheck_to_real(expr, ctxt)
-    if expr.op == TO_INT:
-        return typecheck_to_int(expr, ctxt)
-    if expr.op == IS_INT:
-        return typecheck_is_int(expr, ctxt)
-
-
 def typecheck_let_expression(expr, ctxt):
     n_var_binders = len(expr.var_binders)
     for i in range(n_var_binders):
         var = expr.var_binders[i]
-        t = typecheck_expr(expr.let_terms[i], ctxt)
+        t = yield expr.let_terms[i]
         ctxt.add_to_locals(var, t)
-    return typecheck_expr(expr.subterms[0], ctxt)
+    return (yield expr.subterms[0])
 
 
 def typecheck_label(expr, ctxt):
-    return typecheck_expr(expr.subterms[0], ctxt)
+    return (yield expr.subterms[0])
 
 
 def typecheck_to_fp_unsigned(expr, ctxt):
@@ -829,8 +686,8 @@ def typecheck_to_fp_unsigned(expr, ctxt):
     ((_ to_fp_unsigned eb sb) RoundingMode (_ BitVec m) (_ FloatingPoint eb sb))
     """  # noqa: 501
     eb, sb = int(expr.op.split(" ")[2]), int(expr.op.split(" ")[3].strip(")"))
-    t1 = typecheck_expr(expr.subterms[0], ctxt)
-    t2 = typecheck_expr(expr.subterms[1], ctxt)
+    t1 = yield expr.subterms[0]
+    t2 = yield expr.subterms[1]
     if not isinstance(t1, ROUNDINGMODE_TYPE)\
        or isinstance(t2, BITVECTOR_TYPE):
         raise TypeCheckError(expr)
@@ -847,13 +704,13 @@ def typecheck_to_fp(expr, ctxt):
     eb, sb = int(expr.op.split(" ")[2]), int(expr.op.split(" ")[3].strip(")"))
     if len(expr.subterms) == 1:
         bv = expr.subterms[0]
-        t = typecheck_expr(expr.subterms[0], ctxt)
+        t = yield expr.subterms[0]
         if not isinstance(t, BITVECTOR_TYPE):
             raise TypeCheckError(expr, bv, BITVECTOR_TYPE, t)
 
     if len(expr.subterms) == 2:
-        t1 = typecheck_expr(expr.subterms[0], ctxt)
-        t2 = typecheck_expr(expr.subterms[1], ctxt)
+        t1 = yield expr.subterms[0]
+        t2 = yield expr.subterms[1]
         if (
             not (isinstance(t1, ROUNDINGMODE_TYPE) and isinstance(t2, FP_TYPE))
             or not (isinstance(t1, ROUNDINGMODE_TYPE) and t2 == REAL_TYPE)
@@ -867,19 +724,180 @@ def typecheck_to_fp(expr, ctxt):
     return FP_TYPE(eb, sb)
 
 
+def typecheck_minus(expr, ctxt):
+    if len(expr.subterms) == 1:
+        return typecheck_unary_minus(expr, ctxt)
+    return typecheck_nary_numeral_ret(expr, ctxt)
+
+
+# Typing function of each operator symbol.
+OPERATORS = {
+    # Core ops
+    NOT: typecheck_not,
+    AND: typecheck_nary_bool,
+    OR: typecheck_nary_bool,
+    XOR: typecheck_nary_bool,
+    IMPLIES: typecheck_nary_bool,
+    ITE: typecheck_ite,
+    EQUAL: typecheck_eq,
+    DISTINCT: typecheck_eq,
+    # Numerical ops
+    MINUS: typecheck_minus,
+    PLUS: typecheck_nary_numeral_ret,
+    MULTIPLY: typecheck_nary_numeral_ret,
+    GT: typecheck_comp_ops,
+    GTE: typecheck_comp_ops,
+    LT: typecheck_comp_ops,
+    LTE: typecheck_comp_ops,
+    DIV: typecheck_nary_int_ret,
+    MOD: typecheck_nary_int_ret,
+    ABS: typecheck_nary_int_ret,
+    REAL_DIV: typecheck_real_div,
+    TO_REAL: typecheck_to_real,
+    TO_INT: typecheck_to_int,
+    IS_INT: typecheck_is_int,
+    # String ops
+    CONCAT: typecheck_string_concat,
+    STRLEN: typecheck_strlen,
+    LEXORD: typecheck_nary_string_rt_bool,
+    REFLEX_CLOS: typecheck_nary_string_rt_bool,
+    STR_PREFIXOF: typecheck_nary_string_rt_bool,
+    STR_SUFFIXOF: typecheck_nary_string_rt_bool,
+    STR_CONTAINS: typecheck_nary_string_rt_bool,
+    RE_NONE: typecheck_regex_consts,
+    RE_ALL: typecheck_regex_consts,
+    RE_ALLCHAR: typecheck_regex_consts,
+    STR_IN_RE: typecheck_str_in_re,
+    RE_KLENE: typecheck_regex_binary,
+    RE_COMP: typecheck_regex_binary,
+    RE_OPT: typecheck_regex_binary,
+    RE_PLUS: typecheck_regex_binary,
+    RE_DIFF: typecheck_regex_binary,
+    RE_CONCAT: typecheck_regex_binary,
+    RE_UNION: typecheck_regex_binary,
+    RE_INTER: typecheck_regex_binary,
+    STR_AT: typecheck_str_at,
+    STR_SUBSTR: typecheck_substr,
+    STR_INDEXOF: typecheck_index_of,
+    STR_REPLACE: typecheck_replace,
+    STR_REPLACE_ALL: typecheck_replace,
+    STR_REPLACE_RE: typecheck_replace,
+    STR_REPLACE_RE_ALL: typecheck_replace,
+    STR_TO_CODE: typecheck_str_to_int,
+    STR_TO_INT: typecheck_str_to_int,
+    STR_TO_RE: typecheck_str_to_re,
+    STR_FROM_CODE: typecheck_int_to_string,
+    STR_FROM_INT: typecheck_int_to_string,
+    STR_IS_DIGIT: typecheck_is_digit,
+    RE_RANGE: typecheck_re_range,
+    # Array ops
+    SELECT: typecheck_select,
+    STORE: typecheck_store,
+    # Bitvector ops
+    BV_CONCAT: typecheck_bv_concat,
+    BVNOT: typecheck_bv_unary,
+    BVNEG: typecheck_bv_unary,
+    BVAND: typecheck_bv_binary,
+    BVOR: typecheck_bv_binary,
+    BVXOR: typecheck_bv_binary,
+    BVADD: typecheck_bv_binary,
+    BVSUB: typecheck_bv_binary,
+    BVMUL: typecheck_bv_binary,
+    BVUDIV: typecheck_bv_binary,
+    BVUREM: typecheck_bv_binary,
+    BVSHL: typecheck_bv_binary,
+    BVLSHR: typecheck_bv_binary,
+    BVASHR: typecheck_bv_binary,
+    BVSDIV: typecheck_bv_binary,
+    BVULT: typecheck_binary_bool_rt,
+    BVULE: typecheck_binary_bool_rt,
+    BVSLT: typecheck_binary_bool_rt,
+    BVSGT: typecheck_binary_bool_rt,
+    # Floating point ops
+    FP_ABS: typecheck_fp_unary,
+    FP_NEG: typecheck_fp_unary,
+    FP_ADD: typecheck_fp_binary_arith,
+    FP_SUB: typecheck_fp_binary_arith,
+    FP_MUL: typecheck_fp_binary_arith,
+    FP_DIV: typecheck_fp_binary_arith,
+    FP_SQRT: typecheck_fp_binary_arith,
+    FP_REM: typecheck_fp_binary_arith,
+    FP_ROUND_TO_INTEGRAL: typecheck_fp_binary_arith,
+    FP_NORMAL: typecheck_fp_unary_bool_rt,
+    FP_ISSUBNORMAL: typecheck_fp_unary_bool_rt,
+    FP_IS_ZERO: typecheck_fp_unary_bool_rt,
+    FP_ISINFINITE: typecheck_fp_unary_bool_rt,
+    FP_ISNAN: typecheck_fp_unary_bool_rt,
+    FP_ISNEGATIVE: typecheck_fp_unary_bool_rt,
+    FP_ISPOSITIVE: typecheck_fp_unary_bool_rt,
+    FP_LEQ: typecheck_fp_comparison,
+    FP_LT: typecheck_fp_comparison,
+    FP_GEQ: typecheck_fp_comparison,
+    FP_GT: typecheck_fp_comparison,
+    FP_EQ: typecheck_fp_comparison,
+    FP_MIN: typecheck_fp_minmax,
+    FP_MAX: typecheck_fp_minmax,
+    FP_FMA: typecheck_fp_fma,
+}
+
+# Typing function of each indexed operator, e.g., (_ extract i j), by the
+# symbol following the underscore.
+INDEXED_OPERATORS = {
+    TO_FP: typecheck_to_fp,
+    TO_FP_UNSIGNED: typecheck_to_fp_unsigned,
+    BV_EXTRACT.split(" ")[1]: typecheck_bv_unary,
+    BV_ZERO_EXTEND.split(" ")[1]: typecheck_bv_unary,
+    BV_SIGN_EXTEND.split(" ")[1]: typecheck_bv_unary,
+}
+
+
+# The cache is bounded, as declared functions and indexed operators with
+# arbitrary indices are looked up as well.
+@lru_cache(maxsize=1024)
+def resolve_op(op):
+    """
+    :returns: typing function of the operator op or None, e.g., for
+              operators declared in the script. The indexed operators are
+              resolved once per index.
+    """
+    f = OPERATORS.get(op)
+    if f is None and op.startswith("(_ "):
+        f = INDEXED_OPERATORS.get(op.split(" ")[1])
+    return f
+
+
 def annotate(f, expr, ctxt):
     """
     f: function argument
     expr: expression
     ctxt: context
-    :returns: type of expr
+    :returns: type of expr or, if f needs the types of subterms, a generator
+              returning the type of expr (annotated by set_type)
     """
     t = f(expr, ctxt)
+    if isinstance(t, GeneratorType):
+        return t
     expr.type = t
     return t
 
 
+def set_type(expr, t):
+    expr.type = t
+
+
 def typecheck_expr(expr, ctxt=Context({}, {})):
+    """
+    :returns: type of expr. The typing functions yield the subterms they need
+              the types of, which are typechecked with an explicit stack
+              instead of recursion (see Traversal.evaluate).
+    """
+    return evaluate(expr, partial(typecheck_term, ctxt=ctxt), set_type)
+
+
+def typecheck_term(expr, ctxt):
+    """
+    :returns: type of expr or a generator typechecking expr
+    """
     if expr.is_const:
         return expr.type
     if expr.is_var or expr.is_indexed_id:
@@ -891,39 +909,12 @@ def typecheck_expr(expr, ctxt=Context({}, {})):
             return ctxt.globals[expr.name]
         return UNKNOWN
     elif expr.op:
-        if expr.op in CORE_OPS:
-            return annotate(typecheck_core, expr, ctxt)
-        if expr.op in NUMERICAL_OPS:
-            return annotate(typecheck_numeral, expr, ctxt)
-        if expr.op in INT_OPS:
-            return annotate(typecheck_int_ops, expr, ctxt)
-        if expr.op in REAL_OPS:
-            return annotate(typecheck_real_ops, expr, ctxt)
-        if expr.op in REAL_INTS:
-            return annotate(typecheck_real_ints_ops, expr, ctxt)
-        if expr.op in STRING_OPS:
-            return annotate(typecheck_string_ops, expr, ctxt)
-        if expr.op in ARRAY_OPS:
-            return annotate(typecheck_array_ops, expr, ctxt)
-        if expr.op in FP_OPS:
-            return annotate(typecheck_fp_ops, expr, ctxt)
-        if expr.op in BV_OPS:
-            return annotate(typecheck_bv_ops, expr, ctxt)
-
-        # FP infix ops
-        if TO_FP in expr.op:
-            return annotate(typecheck_to_fp, expr, ctxt)
-
-        if TO_FP_UNSIGNED in expr.op:
-            return annotate(typecheck_to_fp_unsigned, expr, ctxt)
-
-        # BV infix ops
-        if (
-            BV_EXTRACT in expr.op
-            or BV_ZERO_EXTEND in expr.op
-            or BV_SIGN_EXTEND in expr.op
-        ):
-            return annotate(typecheck_bv_unary, expr, ctxt)
+
+        # Applications of declared functions have a term as operator.
+        if isinstance(expr.op, str):
+            f = resolve_op(expr.op)
+            if f:
+                return annotate(f, expr, ctxt)
 
         key = expr.op.__str__()
         if key in ctxt.globals:
@@ -941,6 +932,34 @@ def typecheck_expr(expr, ctxt=Context({}, {})):
     return UNKNOWN
 
 
+def retypecheck(term, ctxt):
+    """
+    Typecheck term after a mutation changed it in place (e.g. by
+    Term.substitute) and re-annotate its ancestors along the parent chain.
+    Only the terms on the path from the root to term are typechecked, the
+    other subterms keep their types. The local variables are bound again on
+    the way down from the root.
+
+    :ctxt: context returned by typecheck
+    :returns: type of the root of term. Raises TypeCheckError if the mutant
+              is ill-typed, the types on the path may then be partially
+              updated.
+    """
+    path = []
+    while term is not None:
+        path.append(term)
+        term = term.parent
+    on_path = set(map(id, path))
+    local_ctxt = Context(ctxt.globals, {})
+
+    def step(expr):
+        if id(expr) in on_path or expr.type is None:
+            return typecheck_term(expr, local_ctxt)
+        return expr.type
+
+    return evaluate(path[-1], step, set_type)
+
+
 def typecheck(formula, glob):
     """
     :formula: Script object representing formula